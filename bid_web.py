@@ -7,10 +7,11 @@ from os import _exit
 from time import sleep
 
 from pywebio import start_server
-from pywebio.input import checkbox
+from pywebio.input import checkbox, input, input_group
 from pywebio.output import *
 from pywebio.session import eval_js, run_js
 
+from module.bid_search import BID_SEARCH
 from module.log import logger, queue_handler
 from module.task_manager import WebBreak
 from module.utils import save_json
@@ -105,6 +106,23 @@ class BidWeb:
         toast("结束程序")  # 弹窗
         _exit(0)  # 结束进程
 
+    def search(self, _):
+        """ 检索历史招标项目, 结果显示在 search scope
+        """
+        data = input_group("检索招标项目", [
+            input("关键词", name="keyword"),
+            input("网站", name="site", placeholder="zzlh"),
+            input("类型", name="type"),
+            input("开始日期", name="date_start", placeholder="2023-01-01"),
+            input("结束日期", name="date_end", placeholder="2023-01-31"),
+        ])
+        result = BID_SEARCH.search(**data)
+        with use_scope("search", clear=True):
+            put_text(f"{len(result)} result")
+            put_table([[site, category, put_link(name, url), date, type]
+                       for site, category, name, date, url, type in result],
+                      header=["网站", "分类", "标题", "日期", "类型"])
+
     def main(self):
         from bid_run import bidTaskManager
         # root_scope = use_scope("ROOT")
@@ -114,8 +132,10 @@ class BidWeb:
             put_buttons(["start"], onclick=self.start_button, scope="button"),
             put_buttons(["stop"], onclick=self.stop_button, scope="button"),
             put_buttons(["exit"], onclick=self.exit, scope="button"),
-            put_buttons(["滚动日志"], onclick=self.stroll_switch, scope="button")]
+            put_buttons(["滚动日志"], onclick=self.stroll_switch, scope="button"),
+            put_buttons(["检索"], onclick=self.search, scope="button")]
             )
+        put_scope(name="search")
 
         put_row([
         put_scrollable([
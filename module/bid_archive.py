@@ -0,0 +1,238 @@
+"""
+招标项目列式归档
+写入的项目先保存在内存中, 行数达到 BufferRows, 距上次写入超过 FlushInterval, 或任务运行结束 (Task.run_end) 时
+按 month 和 site 分区写入 parquet 文件:
+    {Folder}/month=2023-07/site=zzlh/{time}.parquet
+每次写入都会在分区中增加一个小文件, 写入后分区中的文件数超过 MaxFiles, 或分区的月份已结束且有多个文件时,
+将分区中的文件合并为一个:
+    1. 合并的结果写入临时文件 _compact.tmp (_ 开头的文件 dataset 读取时忽略)
+    2. 写入 _compact.json, 记录要替换的文件和要删除的文件
+    3. 临时文件改名为最后一个文件, 删除其他文件, 最后删除 _compact.json
+中断后 _compact.json 仍存在时, 下次合并, 写入或读取该分区前先完成第 3 步, 不会出现重复的项目;
+没有 _compact.json 时临时文件未写完, 直接删除
+导出时用 pyarrow.dataset 按分区和日期过滤, 流式写入 openpyxl write_only 工作簿
+
+依赖 pyarrow, 未安装时不归档
+
+config.json 中 Config.Archive 可选配置:
+    Switch (bool): 是否归档
+    Folder (str): 归档文件夹, 默认为 {DataFolder}/archive
+    MaxFiles (int): 每个分区的文件数上限, 超过时合并, 默认为 8
+    BufferRows (int): 内存中的项目数达到该值时写入, 默认为 5000
+    FlushInterval (int): 距上次写入超过该秒数时写入, 默认为 600
+
+命令行导出 excel:
+    python -m module.bid_archive -d 开始日期 [结束日期] [-s 网站 ...] [-m]
+合并所有分区:
+    python -m module.bid_archive -c
+"""
+import argparse
+import json
+import os
+import time
+from glob import glob
+
+from module.config import CONFIG
+from module.log import logger
+from module.utils import date_days, date_now_s, deep_get
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+COLUMNS = ("site", "category", "name", "date", "url", "type", "match")
+FILE_COLUMNS = COLUMNS[1:]  # site 保存在分区路径中
+EXCEL_TITLE = ["网站", "分类", "标题", "日期", "URL", "类型", "匹配词"]
+EXCEL_WIDTH = [8, 16, 95, 20, 10, 16, 20]
+MAX_FILES = 8
+BUFFER_ROWS = 5000
+FLUSH_INTERVAL = 600
+COMPACT_TEMP = "_compact.tmp"
+COMPACT_MANIFEST = "_compact.json"
+
+
+def _schema():
+    return pa.schema([(k, pa.string()) for k in FILE_COLUMNS[:-1]]
+                     + [("match", pa.list_(pa.string()))])
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([("month", pa.string()), ("site", pa.string())]),
+                           flavor="hive")
+
+
+class BidArchive:
+    def __init__(self, folder=None, config: dict = None):
+        config = config if config is not None else deep_get(CONFIG.config, "Archive", {})
+        self.folder = folder or config.get("Folder") or f"{CONFIG.DATA_FOLDER}/archive"
+        self.enable = config.get("Switch", True)
+        self.max_files = config.get("MaxFiles") or MAX_FILES
+        self.buffer_rows = config.get("BufferRows") or BUFFER_ROWS
+        self.flush_interval = config.get("FlushInterval") or FLUSH_INTERVAL
+        if self.enable and pa is None:
+            logger.warning("pyarrow is not installed, bid archive is disabled")
+            self.enable = False
+        self.rows = {}  # {(month, site): {column: [value, ...]}}
+        self.row_count = 0
+        self.flush_time = time.time()
+
+    def add(self, site, category, bid_info: dict, match: list = None):
+        """ 将一个项目加入内存, 达到 buffer_rows 或 flush_interval 时写入 """
+        if not self.enable:
+            return
+        key = (bid_info["date"][:7], site)
+        if key not in self.rows:
+            self.rows[key] = {k: [] for k in FILE_COLUMNS}
+        columns = self.rows[key]
+        columns["category"].append(category)
+        for k in ("name", "date", "url", "type"):
+            columns[k].append(bid_info[k])
+        columns["match"].append(match or [])
+        self.row_count += 1
+        if self.row_count >= self.buffer_rows or time.time() - self.flush_time >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """ 每个分区写入一个 parquet 文件, 需要时合并分区, 在 add 和 Task.run_end 中调用
+        """
+        self.flush_time = time.time()
+        if not self.rows:
+            return
+        name = f"{date_now_s(format='%Y_%m_%d-%H_%M_%S_%f')}.parquet"
+        this_month = date_days(format="day")[:7]
+        for (month, site), columns in self.rows.items():
+            path = f"{self.folder}/month={month}/site={site}"
+            os.makedirs(path, exist_ok=True)
+            self._recover(path)
+            table = pa.Table.from_pydict(columns, schema=_schema())
+            pq.write_table(table, f"{path}/{name}")
+            logger.info(f"archive {table.num_rows} bid to {path}/{name}")
+            files = len(glob(f"{path}/*.parquet"))
+            if files > self.max_files or (month < this_month and files > 1):
+                self.compact_partition(path)
+        self.rows.clear()
+        self.row_count = 0
+
+    def compact_partition(self, path: str) -> int:
+        """ 将分区中的 parquet 文件按写入顺序合并为一个文件
+        Returns:
+            (int): 合并的文件数
+        """
+        self._recover(path)
+        files = sorted(glob(f"{path}/*.parquet"))
+        if len(files) < 2:
+            return 0
+        table = pa.concat_tables([pq.read_table(file, schema=_schema()) for file in files])
+        temp, manifest = f"{path}/{COMPACT_TEMP}", f"{path}/{COMPACT_MANIFEST}"
+        pq.write_table(table, temp)
+        # 与最后一个文件同名, 之后写入的文件仍然排在后面
+        with open(f"{manifest}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"target": os.path.basename(files[-1]),
+                       "remove": [os.path.basename(file) for file in files[:-1]]}, f)
+        os.replace(f"{manifest}.tmp", manifest)
+        self._finish_compact(path)
+        logger.info(f"compact {len(files)} files in {path}, {table.num_rows} bid")
+        return len(files)
+
+    @staticmethod
+    def _finish_compact(path: str):
+        """ 按 _compact.json 替换和删除文件, 每一步都可以重复执行 """
+        temp, manifest = f"{path}/{COMPACT_TEMP}", f"{path}/{COMPACT_MANIFEST}"
+        with open(manifest, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        if os.path.exists(temp):
+            os.replace(temp, f"{path}/{plan['target']}")
+        for name in plan["remove"]:
+            try:
+                os.remove(f"{path}/{name}")
+            except FileNotFoundError:
+                pass
+        os.remove(manifest)
+
+    def _recover(self, path: str):
+        """ 完成分区中中断的合并, 见模块说明 """
+        if os.path.exists(f"{path}/{COMPACT_MANIFEST}"):
+            logger.warning(f"finish interrupted compact in {path}")
+            self._finish_compact(path)
+        for file in (f"{path}/{COMPACT_TEMP}", f"{path}/{COMPACT_MANIFEST}.tmp"):
+            if os.path.exists(file):
+                os.remove(file)
+
+    def compact(self):
+        """ 合并所有文件数大于1的分区 """
+        for path in sorted(glob(f"{self.folder}/month=*/site=*")):
+            self.compact_partition(path)
+
+    def read(self, date_start, date_end, site: list = None, match_only=False):
+        """ 按日期范围读取归档, 返回 pyarrow.RecordBatch 迭代器
+        Args:
+            date_start (str): 开始日期, 如 2023-07-01
+            date_end (str): 结束日期, 包含当天
+            site (list): 网站名, 为空时读取所有网站
+            match_only (bool): 只读取匹配到关键词的项目
+        """
+        if pa is None:
+            raise ImportError("bid archive need pyarrow")
+        for manifest in glob(f"{self.folder}/month=*/site=*/{COMPACT_MANIFEST}"):
+            self._recover(os.path.dirname(manifest))
+        dataset = ds.dataset(self.folder, format="parquet", partitioning=_partitioning())
+        month = ds.field("month")
+        expr = (month >= date_start[:7]) & (month <= date_end[:7]) \
+            & (ds.field("date") >= date_start) & (ds.field("date") <= f"{date_end} 99")
+        if site:
+            expr = expr & ds.field("site").isin(site)
+        if match_only:
+            expr = expr & (pc.list_value_length(ds.field("match")) > 0)
+        return dataset.to_batches(columns=list(COLUMNS), filter=expr)
+
+    def to_excel(self, file, date_start, date_end, site: list = None, match_only=False):
+        """ 将归档导出为 excel, 使用 write_only 工作簿逐行写入, 内存占用与行数无关
+        """
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for idx, width in enumerate(EXCEL_WIDTH):
+            sheet.column_dimensions[chr(ord("A") + idx)].width = width
+        sheet.freeze_panes = "A2"
+        sheet.append(EXCEL_TITLE)
+        count = 0
+        for batch in self.read(date_start, date_end, site, match_only):
+            columns = batch.to_pydict()
+            columns["match"] = [",".join(m) for m in columns["match"]]
+            for row in zip(*(columns[k] for k in COLUMNS)):
+                sheet.append(row)
+            count += batch.num_rows
+        workbook.save(file)
+        logger.info(f"export {count} bid to {file}")
+        return count
+
+
+BID_ARCHIVE = BidArchive()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="导出归档的招标项目到 excel")
+    parser.add_argument("-d", "--date", nargs="+", default=[date_days(format="day")],
+                        help="开始日期 [结束日期]")
+    parser.add_argument("-s", "--site", nargs="+", default=None)
+    parser.add_argument("-m", "--match", action="store_true", help="只导出匹配到关键词的项目")
+    parser.add_argument("-o", "--output", default="")
+    parser.add_argument("-c", "--compact", action="store_true", help="合并所有分区中的文件")
+    args = parser.parse_args(argv)
+
+    if args.compact:
+        BID_ARCHIVE.compact()
+        return
+    date_start = args.date[0]
+    date_end = args.date[1] if len(args.date) > 1 else date_start
+    file = args.output or f"{CONFIG.DATA_FOLDER}/bid_archive_{date_start}_{date_end}.xlsx"
+    BID_ARCHIVE.to_excel(file, date_start, date_end, args.site, args.match)
+
+
+if __name__ == "__main__":
+    main()
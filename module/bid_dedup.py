@@ -0,0 +1,123 @@
+"""
+招标项目去重
+以规范化后的项目url为key, 已写入过的项目保存在 sqlite 文件中, 内存中使用布隆过滤器,
+布隆过滤器判断不存在的url一定是新项目, 只有判断可能存在时才查询 sqlite
+导入模块时不打开 sqlite, 第一次调用 is_new 时才删除过期记录并读取到布隆过滤器中
+
+config.json 中 Config.Dedup 可选配置:
+    Capacity (int): 布隆过滤器容量
+    ErrorRate (float): 布隆过滤器误判率
+    KeepDays (int): 超过该天数的记录在第一次使用时删除, 保证文件大小有上限
+"""
+import sqlite3
+from datetime import datetime, timedelta
+from hashlib import blake2b
+from math import ceil, log
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from module.config import CONFIG
+from module.log import logger
+from module.utils import create_folder, deep_get
+
+CAPACITY = 1000000
+ERROR_RATE = 0.001
+KEEP_DAYS = 180
+
+
+class BloomFilter:
+    def __init__(self, capacity=CAPACITY, error_rate=ERROR_RATE):
+        self.size = ceil(-capacity * log(error_rate) / log(2) ** 2)  # bit 数
+        self.hash_num = max(1, round(self.size / capacity * log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _index(self, key: str):
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_num):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for idx in self._index(key):
+            self.bits[idx >> 3] |= 1 << (idx & 7)
+
+    def __contains__(self, key: str):
+        for idx in self._index(key):
+            if not self.bits[idx >> 3] & (1 << (idx & 7)):
+                return False
+        return True
+
+
+def normalize_url(url: str) -> str:
+    """ 去掉协议, fragment, 空的参数, host转为小写并对参数排序,
+    使 http/https 或参数顺序不同的同一项目得到相同的key
+    """
+    url = url.strip()
+    if not url:
+        return ""
+    split = urlsplit(url)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(split.query) if v))
+    key = f"{split.netloc.lower()}{split.path}"
+    return f"{key}?{query}" if query else key
+
+
+class BidDedup:
+    def __init__(self, file=None, config: dict = None):
+        config = config if config is not None else deep_get(CONFIG.config, "Dedup", {})
+        self.file = file or f"{CONFIG.DATA_FOLDER}/bid_dedup.db"
+        self.keep_days = config.get("KeepDays") or KEEP_DAYS
+        self.capacity = config.get("Capacity") or CAPACITY
+        self.error_rate = config.get("ErrorRate") or ERROR_RATE
+        self.bloom: BloomFilter = None
+        self.db: sqlite3.Connection = None
+
+    def _open(self):
+        """ 打开 sqlite, 删除超过 keep_days 的记录, 并将剩余的记录加入布隆过滤器
+        """
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        create_folder(self.file)
+        self.db = sqlite3.connect(self.file)
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen "
+                        "(url TEXT PRIMARY KEY, day TEXT) WITHOUT ROWID")
+        day = (datetime.now() - timedelta(days=self.keep_days)).strftime("%Y-%m-%d")
+        self.db.execute("DELETE FROM seen WHERE day < ?", (day,))
+        self.db.commit()
+        count = 0
+        for url, in self.db.execute("SELECT url FROM seen"):
+            self.bloom.add(url)
+            count += 1
+        logger.info(f"BidDedup load {count} url from {self.file}")
+
+    def is_new(self, url: str, day: str = "") -> bool:
+        """ 判断url是否第一次出现, 第一次出现时记录该url
+        Args:
+            url (str): 项目url
+            day (str): 项目日期, 用于删除过期记录
+        """
+        key = normalize_url(url)
+        if not key:
+            return True
+        if self.db is None:
+            self._open()
+        if key in self.bloom and \
+                self.db.execute("SELECT 1 FROM seen WHERE url = ?", (key,)).fetchone():
+            return False
+        self.bloom.add(key)
+        day = day[:10] or datetime.now().strftime("%Y-%m-%d")
+        self.db.execute("INSERT OR IGNORE INTO seen VALUES (?, ?)", (key, day))
+        return True
+
+    def commit(self):
+        if self.db is not None:
+            self.db.commit()
+
+    def close(self):
+        if self.db is None:
+            return
+        self.db.commit()
+        self.db.close()
+        self.db = None
+        logger.info("BidDedup closed")
+
+
+BID_DEDUP = BidDedup()
@@ -0,0 +1,175 @@
+"""
+招标信息数据文件
+所有任务共用一个 BidFile 对象 BID_FILE, 写入的行先保存在内存缓冲区,
+缓冲区行数或距上次写入文件的时间超过阈值时一次性写入, 文件在程序运行期间保持打开
+CONFIG.save 保存运行状态之前会写入 BID_FILE 的缓冲区, 程序中断后不会跳过未写入的项目
+
+config.json 中 Config.DataFile 可选配置:
+    BufferLines (int): 缓冲区最大行数
+    FlushInterval (int): 距上次写入文件超过该秒数时写入
+    Fsync (bool): 写入文件后是否调用 os.fsync
+    Record (bool): 是否同时写入二进制记录文件 bid_dayrecord_{day}.bin, 见 module/bid_record.py
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from io import TextIOWrapper
+
+from module.bid_record import BidRecordWriter, encode_record
+from module.config import CONFIG
+from module.log import logger
+from module.utils import create_folder, deep_get
+
+BUFFER_LINES = 500  # 缓冲区最大行数
+FLUSH_INTERVAL = 10  # 距上次写入超过10秒时写入文件
+FSYNC = False
+RECORD = True
+
+
+class BidFile:
+    """
+    list: bid_list_{name}.txt 和 bid_daylist_{day}.txt
+    match: bid_match_{name}.txt 和 bid_daymatch_{day}.txt
+    record: bid_dayrecord_{day}.bin
+    """
+    day: str = ""
+    day_end: float = 0  # 当天24点的时间戳, 超过时切换 day 文件
+
+    def __init__(self, folder=None, config: dict = None):
+        config = config if config is not None else deep_get(CONFIG.config, "DataFile", {})
+        self.folder = folder or CONFIG.DATA_FOLDER
+        self.buffer_lines = config.get("BufferLines") or BUFFER_LINES
+        self.flush_interval = config.get("FlushInterval") or FLUSH_INTERVAL
+        self.fsync = config.get("Fsync", FSYNC)
+        self.record = config.get("Record", RECORD)
+        self.buffer = {}  # {path: [line, ...]}
+        self.buffer_len = 0
+        self.files = {}  # {path: TextIOWrapper}
+        self.records = []  # [(site, record), ...]
+        self.record_writer: BidRecordWriter = None
+        self.day_path = {}  # {"list": path, "match": path, "record": path}
+        self.flush_time = time.time()
+        logger.info(f"BidFile folder: {self.folder}, buffer lines: {self.buffer_lines}, "
+                    f"flush interval: {self.flush_interval}, fsync: {self.fsync}")
+
+    def write(self, name, key, data: str, now: float = None):
+        """ 将一行数据写入缓冲区
+        Args:
+            name (str): 任务名
+            key (str): list 或 match
+            data (str): 一行数据
+        """
+        self.write_lines(name, key, [data], now)
+
+    def write_lines(self, name, key, lines: list, now: float = None):
+        """ 将多行数据一起写入缓冲区, 与逐行调用 write 相同
+        """
+        if not lines:
+            return
+        now = now or time.time()
+        if now >= self.day_end:
+            self._day_change(now)
+        data = [(line.replace("\n", "") if "\n" in line else line) + "\n" for line in lines]
+        for path in (f"{self.folder}/bid_{key}_{name}.txt", self.day_path[key]):
+            if path in self.buffer:
+                self.buffer[path].extend(data)
+            else:
+                self.buffer[path] = data.copy()
+        self.buffer_len += len(data)
+        self._check_flush(now)
+
+    def write_record(self, name, category, bid_info: dict, match: list = None, now: float = None):
+        """ 将一个项目写入记录文件的缓冲区, 与 write 共用缓冲区行数和写入时间
+        """
+        if not self.record:
+            return
+        now = now or time.time()
+        if now >= self.day_end:
+            self._day_change(now)
+        self.records.append((name, encode_record(name, category, bid_info, match, now)))
+        self.buffer_len += 1
+        self._check_flush(now)
+
+    def write_records(self, name, category, bids: list, matches: list, now: float = None):
+        """ 将多个项目一起写入记录文件的缓冲区
+        Args:
+            bids (list): [BidObj, ...]
+            matches (list): 每个项目的匹配词
+        """
+        if not self.record or not bids:
+            return
+        now = now or time.time()
+        if now >= self.day_end:
+            self._day_change(now)
+        self.records.extend((name, encode_record(name, category, bid, match, now))
+                            for bid, match in zip(bids, matches))
+        self.buffer_len += len(bids)
+        self._check_flush(now)
+
+    def _check_flush(self, now: float):
+        if self.buffer_len >= self.buffer_lines or \
+                now - self.flush_time >= self.flush_interval:
+            self.flush(now)
+
+    def flush(self, now: float = None):
+        """ 将缓冲区写入文件, 每个文件只调用一次 write
+        """
+        for path, lines in self.buffer.items():
+            f = self._open(path)
+            f.write("".join(lines))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        if self.records:
+            if self.record_writer is None:
+                create_folder(self.day_path["record"])
+                self.record_writer = BidRecordWriter(self.day_path["record"])
+            self.record_writer.write(self.records)
+            self.record_writer.flush(self.fsync)
+            self.records.clear()
+        self.buffer.clear()
+        self.buffer_len = 0
+        self.flush_time = now or time.time()
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f: TextIOWrapper
+            f.close()
+        self.files.clear()
+        if self.record_writer is not None:
+            self.record_writer.close()
+            self.record_writer = None
+        logger.info("BidFile closed")
+
+    def _open(self, path) -> TextIOWrapper:
+        if path not in self.files:
+            create_folder(path)
+            self.files[path] = open(path, "a", encoding="utf-8")
+            logger.info(f"open {path}")
+        return self.files[path]
+
+    def _day_change(self, now: float):
+        """ 日期变化时先写入旧日期的缓冲区, 再关闭旧的 day 文件
+        """
+        today = datetime.fromtimestamp(now)
+        day = today.strftime("%Y-%m-%d")
+        if self.day and self.day != day:
+            logger.info(f"BidFile day change: {self.day} -> {day}")
+            self.flush(now)
+            for path in self.day_path.values():
+                if path in self.files:
+                    self.files.pop(path).close()
+            if self.record_writer is not None:
+                self.record_writer.close()
+                self.record_writer = None
+        self.day = day
+        self.day_end = (today.replace(hour=0, minute=0, second=0, microsecond=0)
+                        + timedelta(days=1)).timestamp()
+        for key in ("list", "match"):
+            self.day_path[key] = f"{self.folder}/bid_day{key}_{day}.txt"
+        self.day_path["record"] = f"{self.folder}/bid_dayrecord_{day}.bin"
+
+
+BID_FILE = BidFile()
+CONFIG.save_hooks.append(BID_FILE.flush)
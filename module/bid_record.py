@@ -0,0 +1,205 @@
+"""
+招标项目二进制记录文件
+bid_daylist 的 "; " 分隔格式在标题含有 "; " 时无法正确拆分, 记录文件中每个字段带有长度, 不需要拆分字符串
+
+记录格式 (小端):
+    总长度 uint32, 写入时间 uint32, 7个字段的长度 uint32, 各字段的 utf-8 字节
+    字段: site, category, name, date, url, type, match (匹配词以 "," 连接)
+索引文件 {file}.idx, 每条记录一项: 记录位置 uint64, crc32(site) uint32, 项目日期 uint32 (如 20230706, 无法识别时为 0)
+
+    with BidRecordReader("./data/bid_dayrecord_2023-07-06.bin") as reader:
+        for record in reader.records(site="zzlh", date="2023-07-06"):
+            record.name, record.match
+        reader.field(0, NAME)  # 只解码第0条记录的标题
+"""
+import mmap
+import os
+import re
+import struct
+from array import array
+from collections import namedtuple
+from zlib import crc32
+
+FIELDS = ("site", "category", "name", "date", "url", "type", "match")
+SITE, CATEGORY, NAME, DATE, URL, TYPE, MATCH = range(len(FIELDS))
+HEAD = struct.Struct(f"<II{len(FIELDS)}I")
+INDEX = struct.Struct("<QII")
+_DATE = re.compile(rb"(\d{4})-(\d{1,2})-(\d{1,2})")
+
+BidRecord = namedtuple("BidRecord", ("time",) + FIELDS)
+
+
+def site_hash(site: str) -> int:
+    return crc32(site.encode("utf-8"))
+
+
+def day_number(date: str or bytes) -> int:
+    """ "2023-07-06" 或 "2023-7-6 12:00" 转为 20230706, 无法识别时为 0 """
+    if isinstance(date, str):
+        date = date.encode("utf-8")
+    match = _DATE.match(date)
+    if not match:
+        return 0
+    year, month, day = match.groups()
+    return int(year) * 10000 + int(month) * 100 + int(day)
+
+
+def index_key(record: bytes or mmap.mmap, offset=0) -> tuple:
+    """ 由记录的 bytes 得到索引中的 (crc32(site), 项目日期) """
+    head = HEAD.unpack_from(record, offset)
+    start = offset + HEAD.size
+    date = start + sum(head[2: 2 + DATE])
+    return crc32(record[start: start + head[2 + SITE]]), day_number(record[date: date + head[2 + DATE]])
+
+
+def encode_record(site, category, bid_info: dict, match: list = None, time=0) -> bytes:
+    fields = [str(v or "").encode("utf-8") for v in (
+        site, category, bid_info["name"], bid_info["date"], bid_info["url"], bid_info["type"],
+        ",".join(match or []))]
+    lengths = [len(f) for f in fields]
+    return HEAD.pack(HEAD.size + sum(lengths), int(time), *lengths) + b"".join(fields)
+
+
+class BidRecordWriter:
+    """ 追加写入记录文件和索引文件, write 之后需要 flush
+    打开已有的文件时先删除写入中断的记录, 并补全索引, 之后追加的记录才能被读取
+    """
+    def __init__(self, file):
+        self.file = file
+        self.index_file = f"{file}.idx"
+        if os.path.exists(file):
+            self._repair()
+        self.data = open(file, "ab")
+        self.index = open(self.index_file, "ab")
+        self.offset = self.data.seek(0, os.SEEK_END)
+
+    def write(self, records: list):
+        """
+        Args:
+            records (list): [(site, encode_record(...)), ...]
+        """
+        index = []
+        for _, record in records:
+            index.append(INDEX.pack(self.offset, *index_key(record)))
+            self.offset += len(record)
+        self.data.write(b"".join(record for _, record in records))
+        self.index.write(b"".join(index))
+
+    def flush(self, fsync=False):
+        # 先写入记录再写入索引, 索引缺少的记录在读取时补全
+        for f in (self.data, self.index):
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+    def close(self):
+        self.flush()
+        self.data.close()
+        self.index.close()
+
+    def _repair(self):
+        with BidRecordReader(self.file) as reader:
+            end, size = reader.end, reader.size
+            index = b"".join(INDEX.pack(*entry) for entry in zip(reader.offset, reader.site, reader.date))
+        if end < size:
+            os.truncate(self.file, end)
+        if not os.path.exists(self.index_file) or os.path.getsize(self.index_file) != len(index):
+            with open(self.index_file, "wb") as f:
+                f.write(index)
+
+
+class BidRecordReader:
+    """ 使用 mmap 读取记录文件, 按索引定位记录, 每个字段可以单独解码 """
+    def __init__(self, file):
+        self.file = file
+        self._f = open(file, "rb")
+        self.size = os.fstat(self._f.fileno()).st_size
+        self.mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.offset = array("Q")
+        self.site = array("L")
+        self.date = array("L")
+        self.end = 0  # 最后一条完整记录的结尾
+        self._load_index(f"{file}.idx")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.offset)
+
+    def __getitem__(self, idx) -> BidRecord:
+        return self.record(idx)
+
+    def __iter__(self):
+        return self.records()
+
+    def head(self, idx) -> tuple:
+        """ 第 idx 条记录的 (总长度, 写入时间, 字段长度...) """
+        return HEAD.unpack_from(self.mm, self.offset[idx])
+
+    def field(self, idx, key) -> str:
+        """ 只解码第 idx 条记录的一个字段, key 为 SITE, NAME 等 """
+        head = self.head(idx)
+        start = self.offset[idx] + HEAD.size + sum(head[2: 2 + key])
+        return str(self.mm[start: start + head[2 + key]], "utf-8")
+
+    def record(self, idx) -> BidRecord:
+        head = self.head(idx)
+        view = memoryview(self.mm)
+        pos = self.offset[idx] + HEAD.size
+        fields = []
+        for length in head[2:]:
+            fields.append(str(view[pos: pos + length], "utf-8"))
+            pos += length
+        return BidRecord(head[1], *fields)
+
+    def records(self, site: str = None, match_only=False, date: str = None):
+        """ 按顺序返回记录, site 或 date 不为空时由索引跳过其他网站或其他日期的记录
+        Args:
+            date (str): 项目日期, 如 2023-07-06
+        """
+        key = site_hash(site) if site else None
+        day = day_number(date) if date else None
+        for idx in range(len(self)):
+            if key is not None and self.site[idx] != key:
+                continue
+            if day is not None and self.date[idx] != day:
+                continue
+            if match_only and not self.head(idx)[2 + MATCH]:
+                continue
+            record = self.record(idx)
+            if site and record.site != site:  # crc32 冲突
+                continue
+            yield record
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self._f.close()
+
+    def _load_index(self, index_file):
+        """ 读取索引, 丢弃超出文件的项, 未写入索引的记录从数据文件补全 """
+        if os.path.exists(index_file):
+            with open(index_file, "rb") as f:
+                data = f.read()
+            data = data[: len(data) // INDEX.size * INDEX.size]
+            for offset, site, date in INDEX.iter_unpack(data):
+                if offset + HEAD.size > self.size or offset + HEAD.unpack_from(self.mm, offset)[0] > self.size:
+                    break
+                self.offset.append(offset)
+                self.site.append(site)
+                self.date.append(date)
+        pos = self.offset[-1] + self.head(-1)[0] if self.offset else 0
+        while pos + HEAD.size <= self.size:
+            head = HEAD.unpack_from(self.mm, pos)
+            if head[0] < HEAD.size or pos + head[0] > self.size:  # 写入中断的记录
+                break
+            site, date = index_key(self.mm, pos)
+            self.offset.append(pos)
+            self.site.append(site)
+            self.date.append(date)
+            pos += head[0]
+        self.end = pos
@@ -0,0 +1,204 @@
+"""
+历史招标项目全文检索
+项目在写入 bid_list 时同时写入 sqlite, 标题拆分为相邻两个字的词组(bigram)后存入 FTS5 索引,
+检索时关键词同样拆分为 bigram 并作为短语查询, 等价于标题包含该关键词
+同一网址同一天的项目只保存一次 (唯一索引 bid_url_day), 重复导入同一个文件不会增加项目
+单个字的关键词无法使用 bigram 索引, 按日期倒序逐行比较标题, 找到 limit 条后停止,
+结果少于 limit 条时会扫描整个 bid 表 (可以用网站或日期范围缩小)
+连接可以在多个线程中使用 (任务线程写入, 网页线程检索), 每次操作都由 lock 保护
+数据库在第一次写入或检索时才打开, 只导入模块不会创建数据库文件
+
+命令行:
+    python -m module.bid_search 关键词 [-s 网站] [-t 类型] [-d 开始日期 [结束日期]] [-n 条数]
+    python -m module.bid_search -i   从 ./data/bid_list_*.txt 导入历史项目
+"""
+import argparse
+import os
+import sqlite3
+import threading
+from glob import glob
+
+from module.config import CONFIG
+from module.log import logger
+from module.utils import create_folder, normalize_match
+
+SEARCH_LIMIT = 100
+
+
+def title_grams(title: str) -> str:
+    """ 标题转为以空格分隔的 bigram, 如 "降噪耳机" -> "降噪 噪耳 耳机"
+    """
+    title = "".join(normalize_match(title).split())
+    if len(title) < 2:
+        return title
+    return " ".join(title[i: i + 2] for i in range(len(title) - 1))
+
+
+def _match_query(keyword: str) -> str:
+    grams = title_grams(keyword).replace('"', '""')
+    return f'"{grams}"'
+
+
+class BidSearch:
+    def __init__(self, file=None):
+        self.file = file or f"{CONFIG.DATA_FOLDER}/bid_search.db"
+        self.lock = threading.Lock()
+        self.db: sqlite3.Connection = None
+
+    def _open(self):
+        """ 打开 sqlite, 创建表和索引, 由调用者持有 lock """
+        create_folder(self.file)
+        self.db = sqlite3.connect(self.file, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS bid (
+                id INTEGER PRIMARY KEY,
+                site TEXT, category TEXT, name TEXT, date TEXT, url TEXT, type TEXT);
+            CREATE INDEX IF NOT EXISTS bid_date ON bid (date);
+            CREATE INDEX IF NOT EXISTS bid_site_date ON bid (site, date);
+            CREATE VIRTUAL TABLE IF NOT EXISTS bid_fts USING fts5(grams, content='');
+        """)
+        self._unique_index()
+
+    def _unique_index(self):
+        """ 创建 (url, 日期) 的唯一索引, 旧的数据库中先删除重复的项目, 只保留最早写入的 """
+        if self.db.execute("SELECT 1 FROM sqlite_master WHERE name = 'bid_url_day'").fetchone():
+            return
+        duplicate = self.db.execute(
+            "SELECT id, name FROM bid WHERE id NOT IN "
+            "(SELECT min(id) FROM bid GROUP BY url, substr(date, 1, 10))").fetchall()
+        # content='' 的 FTS 表删除时需要传入原来的内容
+        self.db.executemany("INSERT INTO bid_fts (bid_fts, rowid, grams) VALUES ('delete', ?, ?)",
+                            [(idx, title_grams(name)) for idx, name in duplicate])
+        self.db.executemany("DELETE FROM bid WHERE id = ?", [(idx,) for idx, _ in duplicate])
+        self.db.execute("CREATE UNIQUE INDEX bid_url_day ON bid (url, substr(date, 1, 10))")
+        self.db.commit()
+        if duplicate:
+            logger.info(f"remove {len(duplicate)} duplicate bid from {self.file}")
+
+    def add(self, site, category, bid_info: dict) -> bool:
+        """ 写入一个项目, 在 commit 后可被检索
+        Args:
+            site (str): 网站名, 如 zzlh
+            category (str): bid task 名, 如 货物
+            bid_info (dict): Bid.bid_info
+        Returns:
+            (bool): 是否写入, 同一网址同一天的项目已存在时为 False
+        """
+        with self.lock:
+            return self._add(site, category, bid_info)
+
+    def _add(self, site, category, bid_info: dict) -> bool:
+        if self.db is None:
+            self._open()
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO bid (site, category, name, date, url, type) VALUES (?, ?, ?, ?, ?, ?)",
+            (site, category, bid_info["name"], bid_info["date"], bid_info["url"], bid_info["type"]))
+        if not cursor.rowcount:
+            return False
+        self.db.execute("INSERT INTO bid_fts (rowid, grams) VALUES (?, ?)",
+                        (cursor.lastrowid, title_grams(bid_info["name"])))
+        return True
+
+    def search(self, keyword="", site="", type="", date_start="", date_end="",
+               limit=SEARCH_LIMIT) -> list:
+        """ 按关键词, 网站, 类型, 日期范围检索, 按日期倒序返回
+        关键词只有一个字时不使用 FTS 索引, 按日期索引倒序比较标题, 见模块说明
+        Returns:
+            (list): [(site, category, name, date, url, type), ...]
+        """
+        where, params = [], []
+        keyword = "".join(keyword.split())
+        if len(keyword) >= 2:
+            # CROSS JOIN 保证先查 FTS 索引再按主键取项目, 而不是按日期索引遍历 bid 表
+            sql = "SELECT b.site, b.category, b.name, b.date, b.url, b.type " \
+                  "FROM (SELECT rowid AS id FROM bid_fts WHERE bid_fts MATCH ?) f " \
+                  "CROSS JOIN bid b ON b.id = f.id"
+            params.append(_match_query(keyword))
+        else:
+            sql = "SELECT b.site, b.category, b.name, b.date, b.url, b.type FROM bid b"
+            if keyword:  # 单个字无法使用 bigram 索引, 按日期倒序扫描到 limit 条为止
+                where.append("instr(upper(b.name), ?)")
+                params.append(keyword.upper())
+        for column, value in (("b.site", site), ("b.type", type)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if date_start:
+            where.append("b.date >= ?")
+            params.append(date_start)
+        if date_end:
+            where.append("b.date <= ?")
+            params.append(f"{date_end} 99")  # 包含结束日期当天带时间的项目
+        if where:
+            sql = f"{sql} WHERE {' AND '.join(where)}"
+        sql = f"{sql} ORDER BY b.date DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            if self.db is None:
+                self._open()
+            return self.db.execute(sql, params).fetchall()
+
+    def import_list_file(self, file: str) -> int:
+        """ 导入 bid_list_{site}.txt, 跳过 start at 行, 已有的项目跳过, 可以重复导入
+        Returns:
+            count (int): 新导入的项目数
+        """
+        site = os.path.basename(file)[len("bid_list_"): -len(".txt")]
+        count = skip = 0
+        with open(file, "r", encoding="utf-8") as f, self.lock:
+            for line in f:
+                line = line.rstrip("\n").split("; ")
+                if len(line) < 4:
+                    continue
+                bid_info = {"name": "; ".join(line[:-3]), "date": line[-3],
+                            "url": line[-2], "type": line[-1]}
+                if self._add(site, "", bid_info):
+                    count += 1
+                else:
+                    skip += 1
+            if self.db is not None:
+                self.db.commit()
+        logger.info(f"import {count} bid from {file}, skip {skip} existing")
+        return count
+
+    def commit(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.commit()
+
+    def close(self):
+        with self.lock:
+            if self.db is None:
+                return
+            self.db.commit()
+            self.db.close()
+            self.db = None
+        logger.info("BidSearch closed")
+
+
+BID_SEARCH = BidSearch()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检索历史招标项目")
+    parser.add_argument("keyword", nargs="?", default="")
+    parser.add_argument("-s", "--site", default="")
+    parser.add_argument("-t", "--type", default="")
+    parser.add_argument("-d", "--date", nargs="+", default=[], help="开始日期 [结束日期]")
+    parser.add_argument("-n", "--limit", type=int, default=SEARCH_LIMIT)
+    parser.add_argument("-i", "--import_file", action="store_true",
+                        help=f"导入 {CONFIG.DATA_FOLDER}/bid_list_*.txt")
+    args = parser.parse_args(argv)
+
+    if args.import_file:
+        for file in glob(f"{CONFIG.DATA_FOLDER}/bid_list_*.txt"):
+            BID_SEARCH.import_list_file(file)
+    date_start, date_end = (args.date + ["", ""])[:2]
+    result = BID_SEARCH.search(args.keyword, args.site, args.type, date_start, date_end, args.limit)
+    for row in result:
+        print("; ".join(row))
+    print(f"{len(result)} result")
+
+
+if __name__ == "__main__":
+    main()
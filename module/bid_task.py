@@ -1,16 +1,19 @@
 from copy import deepcopy
 from datetime import datetime, timedelta
+from operator import attrgetter, itemgetter
 
 from module.config import CONFIG
-from module.utils import date_days, time_difference
+from module.utils import DAY_SECONDS, KeyPath, date_days, date_key, normalize_name, time_difference
 from module.web_brows import *
 
 
 class StopBid:
     date: datetime
+    date_key: int  # date 的 date_key, 每个项目只需要比较整数
 
     def __init__(self, bid: dict = None) -> None:
-        self.name = bid["name"]
+        # 之前保存的名称可能没有经过 normalize_name, 与解析得到的名称比较前先转换
+        self.name = normalize_name(bid["name"])
         self.date_str = bid["date"]
         self.url = bid["url"]
         self.date_init()
@@ -33,20 +36,21 @@ class StopBid:
             end_day = 0
             logger.info(f"end_rule: {self.date_str} is beyond 6 days")
             self.date_str = date_6
+        self.date_key = date_key(self.date_str) - end_day * DAY_SECONDS
         self.date = datetime.strptime(self.date_str, "%Y-%m-%d %H:%M:%S") - \
                     timedelta(days=end_day)
 
-    def bid_is_end(self, bid_prj: dict):
+    def bid_is_end(self, bid_prj: BidObj):
         """ 判断当前项目是否符合结束条件
         Args:
-            bid_prj (<class> Bid): 当前Bid对象, 保存项目信息
+            bid_prj (BidObj): 当前项目信息
         """
         # 名称和Url都相同时停止
-        if bid_prj["name"] == self.name \
-                and bid_prj["url"] == self.url:
+        if bid_prj.name == self.name \
+                and bid_prj.url == self.url:
             return True
         # 超出时间限制时停止
-        if self._date_is_end(bid_prj["date"]):
+        if self._date_is_end(bid_prj.date):
             return True
         return False
 
@@ -55,37 +59,40 @@ class StopBid:
         判断爬到的项目日期是否比end_date减一天还晚
         仅作为保证不会因为找不到相同项目而爬到死循环的措施
         """
-        if len(date) > 10:
-            date_format = "%Y-%m-%d %H:%M:%S"
-        else:
-            date_format = "%Y-%m-%d"
-        date = datetime.strptime(date, date_format)
-        return date < self.date
+        return date_key(date) < self.date_key
 
 
 class BidTask:
     interrupt = False
     newest = False
     start = True
-    first_bid: list = None
+    first_bid: tuple = None
 
     def __init__(self, name) -> None:
         self.name = name
+        self.paths = {}  # {key: KeyPath}, 每页都要读写的键只分割一次
         settings = CONFIG.get_task(name)
         self.state = settings["state"]
         self.stop_bid = StopBid(settings["stopBid"])
         self.set_task("stopBid.date", self.stop_bid.date_str)
         self.interrupt_url = settings["interruptUrl"]
-        self.interrupt_bid = settings["interruptBid"]
+        self.interrupt_bid = dict(settings["interruptBid"])
+        self.interrupt_bid["name"] = normalize_name(self.interrupt_bid["name"])
         self.get_state()
         logger.info(f"newestBid: {self.get_task('newestBid')}")
         logger.info(f"stopBid: {self.stop_bid}")
 
+    def task_path(self, key="") -> KeyPath:
+        path = self.paths.get(key)
+        if path is None:
+            path = self.paths[key] = CONFIG.task_path(f"{self.name}.{key}")
+        return path
+
     def set_task(self, key, data):
-        CONFIG.set_task(f"{self.name}.{key}", data)
+        self.task_path(key).set(CONFIG.record, data)
 
     def get_task(self, key=""):
-        return CONFIG.get_task(f"{self.name}.{key}")
+        return self.task_path(key).get(CONFIG.record)
 
     def get_state(self):
         if self.state in ["complete", ""]:
@@ -101,7 +108,7 @@ class BidTask:
                     f"interrupt: {self.interrupt}, "
                     f"start: {self.start}")
 
-    def bid_is_start(self, bid_info: dict):
+    def bid_is_start(self, bid_info: BidObj):
         """判断条件为: name, date, url 三个信息必须全部符合, 符合返回True 并
         将 self.state 置为 True, 若有一个不符合则返回 False .
         仅在 interrupt状态下执行
@@ -125,7 +132,7 @@ class BidTask:
         self.start = True
         return True
 
-    def complete(self, bid_info: dict = None):
+    def complete(self, bid_info: BidObj = None):
         """ 完成任务后, newestBid 设为 stopBid, 清除 newestBid 和 interruptBid
         将 BidTask.state 设为 "complete"
         """
@@ -217,10 +224,10 @@ class BidTask:
         else:
             logger.info("not start")
 
-    def compare_last_first(self, idx, bid_info: dict):
+    def compare_last_first(self, idx, bid_info: BidObj):
         """ 比较每页第一个项目信息是否与上一页第一个完全相等, 若相等返回True
         """
-        info = tuple(bid_info.values())
+        info = bid_info.values()
         if info == self.first_bid:
             logger.info(f"open out of pages, bid is end")
             return True
@@ -229,7 +236,36 @@ class BidTask:
             logger.info(f"first bid: {info}")
         return False
 
-    def bid_judge(self, bid_info: dict, idx: int):
+    def judge_page(self, bids: list) -> tuple:
+        """ 一次判断一页的项目, 结果与逐个调用 bid_judge 和 bid_is_start 相同
+        Args:
+            bids (list): [(tag 序号, BidObj), ...], 解析失败的 tag 不在其中
+        Returns:
+            (int, int): 需要写入的项目为 bids[start: end], end < len(bids) 时 bids[end] 为结束的项目
+        """
+        objs = list(map(itemgetter(1), bids))
+        has_first = bool(bids) and bids[0][0] == 0
+        end, first_bid = find_stop(objs, self.stop_bid.name, self.stop_bid.url,
+                                   self.stop_bid.date_key, self.first_bid, has_first)
+        if first_bid != self.first_bid:
+            self.first_bid = first_bid
+            logger.info(f"first bid: {first_bid}")
+        if end and not self.newest:
+            self.save_newest_and_interrupt(bids[0][1])
+        start = 0
+        if not self.start:
+            pos = find_start(objs, self.interrupt_bid, end)
+            if pos is None:
+                start = end
+            else:
+                start = pos + 1
+                self.start = True
+                logger.info(f"bid is start, start at {objs[pos].name}")
+        if end < len(bids):
+            self.complete(bids[end][1])
+        return start, end
+
+    def bid_judge(self, bid_info: BidObj, idx: int):
         if self.compare_last_first(idx, bid_info) or self.stop_bid.bid_is_end(bid_info):
             self.complete(bid_info)
             return True
@@ -238,6 +274,81 @@ class BidTask:
         return False
 
 
+_get_name = attrgetter("name")
+_get_date = attrgetter("date")
+
+
+def _index(seq: list, value, start: int, end: int) -> int:
+    """ seq[start: end] 中 value 的位置, 没有时返回 end """
+    try:
+        return seq.index(value, start, end)
+    except ValueError:
+        return end
+
+
+def _find_bid(bids: list, names: list, info: tuple, start: int, end: int) -> int:
+    """ bids[start: end] 中 values() 与 info 相同的位置, 先用名称查找, 没有时返回 end """
+    pos = _index(names, info[0], start, end)
+    while pos < end and bids[pos].values() != info:
+        pos = _index(names, info[0], pos + 1, end)
+    return pos
+
+
+def find_stop(bids: list, stop_name: str, stop_url: str, stop_key: int,
+              first_bid: tuple = None, has_first=True) -> tuple:
+    """ 找到一页中第一个结束的项目, 条件与 BidTask.compare_last_first 和 StopBid.bid_is_end 相同:
+        1. 与上一页 (或本页) 第一个项目完全相同
+        2. 名称和 url 都与 stopBid 相同
+        3. 日期早于 stopBid
+    在名称和日期的 list 上用 list.index 查找, 日期按第一次出现的顺序, 相同的日期只比较一次
+    Args:
+        bids (list): 本页的 BidObj
+        stop_key (int): StopBid.date_key
+        first_bid (tuple): 上一页第一个项目的 values()
+        has_first (bool): bids[0] 是否为页面中的第0个 tag, 是时作为新的 first_bid
+    Returns:
+        (int, tuple): 结束的位置, 没有结束时为 len(bids); 新的 first_bid
+    """
+    end = len(bids)
+    if not end:
+        return end, first_bid
+    names = list(map(_get_name, bids))
+    if first_bid is not None:
+        # 本页第0个项目之后的项目与新的 first_bid 比较
+        last = 1 if has_first else end
+        pos = _find_bid(bids, names, first_bid, 0, last)
+        if pos < last:
+            end = pos
+    pos = _index(names, stop_name, 0, end)
+    while pos < end and bids[pos].url != stop_url:
+        pos = _index(names, stop_name, pos + 1, end)
+    end = pos
+    dates = list(map(_get_date, bids[:end]))
+    for date in dict.fromkeys(dates):
+        if date_key(date) < stop_key:
+            end = dates.index(date)
+            break
+    if has_first and end:
+        first_bid = bids[0].values()
+        end = _find_bid(bids, names, first_bid, 1, end)
+    return end, first_bid
+
+
+def find_start(bids: list, interrupt_bid: dict, end: int = None) -> int or None:
+    """ interrupt 状态下 name, date, url 都与 interruptBid 相同的项目位置, 与 BidTask.bid_is_start 相同
+    interruptBid 有空的字段或没有找到时返回 None
+    """
+    name, date, url = (interrupt_bid.get(key) for key in ("name", "date", "url"))
+    if not (name and date and url):
+        return None
+    end = len(bids) if end is None else end
+    names = list(map(_get_name, bids[:end]))
+    pos = _index(names, name, 0, end)
+    while pos < end and (bids[pos].date != date or bids[pos].url != url):
+        pos = _index(names, name, pos + 1, end)
+    return pos if pos < end else None
+
+
 def _bid_to_dict(bid_prj=None):
     if isinstance(bid_prj, list):
         return {
@@ -245,7 +356,7 @@ def _bid_to_dict(bid_prj=None):
             "date": bid_prj[1],
             "url": bid_prj[2]
         }
-    elif isinstance(bid_prj, dict):
+    elif isinstance(bid_prj, (dict, BidObj)):
         return {key: bid_prj[key] for key in ("name", "date", "url")}
     else:
         return {key: "" for key in ("name", "date", "url")}
@@ -4,14 +4,18 @@ import sys
 from shutil import copyfile
 
 from module.log import logger
-from module.utils import (date_now_s, deep_get, deep_set, init_re, jsdump,
-                          save_json, cookie_str_to_dict, create_folder)
+from module.utils import (FileWatcher, KeyPath, date_now_s, deep_get, init_re, jsdump,
+                          key_path, save_json, cookie_str_to_dict, create_folder)
 
 
 # file
 RECORD_FILE = "./bid_settings/bid_settings.json"
 CONFIG_FILE = "./bid_settings/config.json"
 
+# 运行中修改 bid_settings.json 后重新读取的网站规则, 其他部分为运行状态, 以内存中的为准
+RULE_KEYS = ("task", "BidTag", "Bid", "OpenConfig.html_cut", "OpenConfig.li_tag")
+RELOAD_INTERVAL = 5
+
 pyw_name = os.path.splitext(os.path.basename(sys.argv[0]))[0]  # 入口程序所在的文件,去掉.py和文件夹前缀
 
 # ensure in bid_run.py directory
@@ -55,6 +59,14 @@ class Config(object):
         if self.creatNewJsonFile:
             self.set_new_json()
 
+        # config.json 中 Config.HotReload 可选配置: Switch (bool), Interval (int)
+        reload = deep_get(self.config, "HotReload", {})
+        self.hot_reload = reload.get("Switch", True)
+        self.reload_interval = reload.get("Interval") or RELOAD_INTERVAL
+        self.record_watcher = FileWatcher([self.record_file], self.reload_interval)
+        self.rules_version = {}  # {网站: 规则重新读取的次数}
+        self.save_hooks = []  # save 之前调用, 如 BID_FILE.flush
+
         logger.info(f"{config} test switch is {test}")
 
     @property
@@ -66,26 +78,66 @@ class Config(object):
         self.record_file = f"{os.path.splitext(self.record_file)[0]}{date}.json"
 
     def save(self):
+        # 先写入缓冲区中的项目, 保存的 newestBid, interruptBid 不能超前于已写入文件的项目
+        for hook in self.save_hooks:
+            hook()
+        self.check_reload(force=True)  # 先合并文件中修改的规则, 避免被覆盖
         save_json(self.record, self.record_file, logger=logger)
+        self.record_watcher.update()
+
+    def check_reload(self, force=False) -> list:
+        """ bid_settings.json 在程序外被修改时, 读取各网站 RULE_KEYS 中的规则替换到 self.record
+        Args:
+            force (bool): 不等待 interval, 立即检查
+        Returns:
+            (list): 规则有变化的网站, 对应的 rules_version 加1
+        """
+        if not self.hot_reload:
+            return []
+        if force:
+            self.record_watcher.check_time = 0
+        if not self.record_watcher.changed():
+            return []
+        try:
+            record = load_json(self.record_file)
+        except (OSError, ValueError) as e:  # 文件正在写入
+            logger.warning(f"reload {self.record_file} failed: {e}")
+            return []
+        self.record_watcher.update()
+        changed = []
+        for name in self.taskList:
+            for key in RULE_KEYS:
+                path = key_path(f"{name}.{key}")
+                rule = path.get(record)
+                if rule is not None and rule != path.get(self.record):
+                    path.set(self.record, rule)
+                    if name not in changed:
+                        changed.append(name)
+        for name in changed:
+            self.rules_version[name] = self.rules_version.get(name, 0) + 1
+            logger.info(f"reload {name} rules from {self.record_file}, version {self.rules_version[name]}")
+        return changed
 
     def reload(self):
         self = Config()
 
-    def set_task(self, key, data):
+    def task_path(self, key="") -> KeyPath:
+        """ 当前网站中 key 的路径, 可以保存下来重复使用 """
         if self.name:
             key = f"{self.name}.{key}" if key else self.name
-        self.set_(key, data)
+        return key_path(key)
+
+    def set_task(self, key, data):
+        self.task_path(key).set(self.record, data)
 
     def get_task(self, key=""):
-        if self.name:
-            key = f"{self.name}.{key}" if key else self.name
-        return self.get_(key)
+        return self.task_path(key).get(self.record)
 
     def set_(self, key, data):
-        deep_set(self.record, key, data)
+        key_path(key).set(self.record, data)
 
     def get_(self, key):
-        return deep_get(self.record, key)
+        return key_path(key).get(self.record)
 
     @property
     def task(self):
@@ -0,0 +1,200 @@
+"""
+出错页面快照
+列表页面裁剪或解析出错时保存页面, 用于之后检查规则, 由 ListWebResponse.save_response 调用
+    1. save 只将页面放入队列, 由后台线程生成文件名, 压缩和写入, 队列已满时丢弃, 不阻塞任务
+    2. 按页面内容的哈希去重, 相同的页面只保存一次, 再次出错时只更新该快照的修改时间
+    3. 文件夹中快照的总大小超过 MaxMB 时删除最久未使用的快照 (LRU), 不删除文件夹中的其他文件
+
+快照文件名: {url 文件名}{时间}_{extra}_{哈希}.html.gz, 使用 zstd 时为 .html.zst
+安装 zstandard 时可以使用 zstd 压缩, 否则使用 gzip, 用 read_snapshot 读取
+
+config.json 中 Config.ErrorSnapshot 可选配置:
+    Folder (str): 默认的文件夹, 默认为 ./html_error
+    MaxMB (int): 每个文件夹中快照的总大小上限 (MB), 默认为 50
+    Compress (str): gzip, zstd 或 none, 默认为 gzip
+    QueueSize (int): 队列中最多等待的快照数, 默认为 16
+"""
+import gzip
+import hashlib
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from module.config import CONFIG
+from module.log import logger
+from module.utils import date_now_s, deep_get, url_to_filename
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FOLDER = "./html_error"
+MAX_MB = 50
+QUEUE_SIZE = 16
+SUFFIX = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+_SNAPSHOT_NAME = re.compile(r"_([0-9a-f]{16})\.html(\.gz|\.zst)?$")
+
+
+def snapshot_name(url: str or dict, extra="", save_date=True) -> str:
+    """ 与原来 save_response 的文件名相同, 不含文件夹
+    Args:
+        url (str, dict): 网址, 或含有 url 和 form 的 dict
+    """
+    if isinstance(url, dict):
+        data = url["form"] if "form" in url else ""
+        full_url = url["url"]
+    else:
+        full_url = url
+    name_list = url_to_filename(full_url).split(".")
+    # 添加额外名称
+    if isinstance(url, dict) and data:
+        name_list[-2] = f"{name_list[-2]}_{urlencode(data)}"
+    elif isinstance(url, dict) and data is None:
+        name_list[-2] = f"{name_list[-2]}_form={data}"
+    if save_date:
+        name_list[-2] = f"{name_list[-2]}{date_now_s(True)}"
+    if extra:
+        name_list[-2] = f"{name_list[-2]}_{extra}"
+    return ".".join(name_list)
+
+
+def read_snapshot(file: str) -> bytes:
+    """ 读取快照, 按后缀解压 """
+    with open(file, "rb") as f:
+        data = f.read()
+    if file.endswith(".gz"):
+        return gzip.decompress(data)
+    if file.endswith(".zst"):
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def _to_bytes(rps) -> bytes:
+    if isinstance(rps, bytes):
+        return rps
+    if isinstance(rps, (bytearray, memoryview)):
+        return bytes(rps)
+    return str(rps).encode("utf-8")  # str 或 BeautifulSoup
+
+
+class ErrorSnapshot:
+    def __init__(self, config: dict = None):
+        config = config if config is not None else deep_get(CONFIG.config, "ErrorSnapshot", {})
+        self.folder = config.get("Folder") or FOLDER
+        self.max_bytes = (config.get("MaxMB") or MAX_MB) * 2 ** 20
+        self.compress = (config.get("Compress") or "gzip").lower()
+        if self.compress == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, error snapshot use gzip")
+            self.compress = "gzip"
+        if self.compress not in SUFFIX:
+            logger.warning(f"unknown error snapshot compress {self.compress}, use gzip")
+            self.compress = "gzip"
+        self.queue = queue.Queue(config.get("QueueSize") or QUEUE_SIZE)
+        self.thread: threading.Thread = None
+        self.lock = threading.Lock()
+        self.files = {}  # 每个文件夹中的快照 {folder: OrderedDict({path: (hash, size)})}, 按使用时间排序
+        self.hashes = {}  # {folder: {hash: path}}
+        self.size = {}  # {folder: 快照总大小}
+
+    def save(self, rps, url="test.html", extra="", save_date=True, folder=None) -> bool:
+        """ 将页面放入队列, 返回是否放入, 队列已满时丢弃
+        Args:
+            rps (bytes, str): 页面
+            url (str, dict): 网址, 用于生成文件名
+        """
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="ErrorSnapshot", daemon=True)
+                self.thread.start()
+        try:
+            self.queue.put_nowait((rps, url, extra, save_date, folder or self.folder))
+        except queue.Full:
+            logger.warning(f"error snapshot queue is full, drop {url}")
+            return False
+        return True
+
+    def _run(self):
+        while 1:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                logger.error(f"save error snapshot failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _load(self, folder: str):
+        """ 读取文件夹中已有的快照, 按修改时间排序 """
+        files = []
+        if os.path.isdir(folder):
+            for entry in os.scandir(folder):
+                match = _SNAPSHOT_NAME.search(entry.name)
+                if match and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.path, match.group(1), stat.st_size))
+        files.sort()
+        self.files[folder] = OrderedDict((path, (h, size)) for _, path, h, size in files)
+        self.hashes[folder] = {h: path for _, path, h, _ in files}
+        self.size[folder] = sum(size for *_, size in files)
+
+    def _write(self, rps, url, extra, save_date, folder):
+        folder = folder.rstrip("/")
+        if folder not in self.files:
+            self._load(folder)
+        files, hashes = self.files[folder], self.hashes[folder]
+        data = _to_bytes(rps)
+        digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+        same = hashes.get(digest)
+        if same in files:
+            os.utime(same)
+            files.move_to_end(same)
+            logger.info(f"error snapshot is the same as {same}")
+            return
+        name = snapshot_name(url, extra, save_date)
+        path = f"{folder}/{name[:-len('.html')] if name.endswith('.html') else name}" \
+               f"_{digest}.html{SUFFIX[self.compress]}"
+        if self.compress == "gzip":
+            data = gzip.compress(data, 6)
+        elif self.compress == "zstd":
+            data = zstandard.ZstdCompressor(level=3).compress(data)
+        os.makedirs(folder, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        files[path] = (digest, len(data))
+        hashes[digest] = path
+        self.size[folder] += len(data)
+        logger.info(f"save html as {path}")
+        self._evict(folder)
+
+    def _evict(self, folder: str):
+        files, hashes = self.files[folder], self.hashes[folder]
+        while self.size[folder] > self.max_bytes and len(files) > 1:
+            path, (digest, size) = files.popitem(last=False)
+            hashes.pop(digest, None)
+            self.size[folder] -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            logger.info(f"remove error snapshot {path}")
+
+    def flush(self):
+        """ 等待队列中的快照写入 """
+        if self.thread is not None:
+            self.queue.join()
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+            logger.info("ErrorSnapshot closed")
+
+
+ERROR_SNAPSHOT = ErrorSnapshot()
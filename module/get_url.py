@@ -1,16 +1,19 @@
 """
 url打开模块
 打开网页, 保存html源码
+response 保存为 bytes, 编码在每次打开时由 Content-Type 或 <meta charset> 得到, 都没有时为 utf-8,
+HtmlCut 直接在 bytes 上裁剪, 只解码裁剪的部分, 需要整个页面的 str 时才解码 request.response
 """
+import codecs
 import re
 import traceback
-from urllib.parse import urlencode
 
 import requests
 import requests.utils as requtils
 from requests.exceptions import ReadTimeout
 from bs4 import BeautifulSoup as btfs
 
+from module.error_snapshot import ERROR_SNAPSHOT
 from module.exception import *
 from module.log import logger
 from module.utils import *
@@ -27,13 +30,35 @@ NO_SYSTEM_PROXIES = {"http": None, "https": None}
 packet_capture = False  # 抓包开关
 system_proxies = False  # 是否系统代理
 TIMEOUT = 16
+DEFAULT_ENCODING = "utf-8"
+# HtmlCut 可以直接在 bytes 上查找的编码, 其他编码的多字节字符中可能含有 ascii 字节
+BYTES_CUT_ENCODINGS = ("utf-8", "ascii")
+_HEADER_CHARSET = re.compile(r"charset=[\"']?([\w\-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w\-]+)", re.I)
+
+
+def detect_encoding(headers: dict, content: bytes, default=DEFAULT_ENCODING) -> str:
+    """ 由 Content-Type 或页面开头的 <meta charset> 得到编码, 都没有或无法识别时返回 default
+    """
+    charset = _HEADER_CHARSET.search(headers.get("Content-Type", ""))
+    if charset:
+        charset = charset.group(1)
+    else:
+        charset = _META_CHARSET.search(content[:4096])
+        charset = charset and charset.group(1).decode("ascii")
+    try:
+        return codecs.lookup(charset).name if charset else default
+    except LookupError:
+        return default
 
 class RequestBase:
     """
     Only GET and POST methods are supported
     """
-    response: str = ""  # response
-    encoding = "utf-8"
+    content: bytes = b""  # response 的 bytes
+    _text: str = ""  # 解码后的 response, 为 None 时在使用 response 时解码
+    encoding = DEFAULT_ENCODING
+    detect = True  # 每次打开时检测编码, OpenConfig 中有 encoding 时为 False
     system_proxies = False  # 是否系统代理(False时不经过梯子的代理)
     _response = requests.models.Response()
     _session = requests.Session()
@@ -52,7 +77,7 @@ class RequestBase:
         # 要么显示地指定 proxies , 要么不过系统代理, 使用 proxies=None 会使用系统当前代理
         self.params['proxies'] = proxies or NO_SYSTEM_PROXIES.copy()
 
-    def open(self, url, data=None, method=None, **kwargs) -> str:
+    def open(self, url, data=None, method=None, **kwargs) -> bytes:
         """
         if method is GET, ignore data param, if is POST, need data param.
         """
@@ -62,9 +87,28 @@ class RequestBase:
             url, data, *_ = url.values()
         self._response = self._session.request(method=method, url=url,
                                                data=data, **kwargs)
+        self.content = self._response.content
+        if self.detect:
+            # 同一网站的页面编码可能不同, 每个页面都检测, 不沿用上一个页面的编码
+            encoding = detect_encoding(self._response.headers, self.content)
+            if encoding != self.encoding:
+                logger.info(f"encoding: {encoding}")
+            self.encoding = encoding
         self._response.encoding = self.encoding  # destination code base
-        self.response = self._response.text
-        return self.response
+        self._text = None
+        return self.content
+
+    @property
+    def response(self) -> str:
+        """ 整个页面的 str, 第一次使用时才解码 content """
+        if self._text is None:
+            self._text = str(self.content, self.encoding, errors="replace")
+        return self._text
+
+    @response.setter
+    def response(self, text: str or None):
+        """ 为 None 时由 content 解码 """
+        self._text = text
 
     def update_param(self, params: dict, cover=True):
         for key, value in params.items():
@@ -117,11 +161,97 @@ class RequestHeaders:
         self.request.params["headers"]["Referer"] = referer
 
 
+class HtmlCut:
+    """ 用字符串查找代替正则裁剪 html, 不会因 .* 在大页面上回溯
+    OpenConfig.html_cut 为含有 start 的 dict 时使用, 如
+        {"start": "<ul class=\"searchList\">", "tag": "ul"}  从start开始, 到对应的</ul>结束, 计算嵌套的<ul>
+        {"start": "<li>", "end": "</li>", "last": true}  从第一个<li>到最后一个</li>
+        {"start": "</tr>", "end": "</table>", "last": true, "include": false}  不包含start和end
+        {"start": "", "end": ""}  整个页面
+    Args:
+        start (str): 开始标记, 为空时从头开始
+        end (str): 结束标记, 为空时到末尾结束, 有 tag 时默认为 </tag>
+        tag (str): 计算标签嵌套层数, start 为该标签的开始标签
+        last (bool): 使用最后一个 end, 等同于正则的 .*
+        include (bool): 结果是否包含 start 和 end
+    """
+    def __init__(self, start="", end="", tag="", last=False, include=True):
+        self.start = start
+        self.end = end or (f"</{tag}>" if tag else "")
+        self.tag = tag
+        self.last = last
+        self.include = include
+        self._bytes = {k: getattr(self, k).encode("utf-8") for k in ("start", "end")}
+        if tag:
+            self._bytes["tag"] = f"<{tag}".encode("utf-8")
+
+    def __repr__(self):
+        return f"HtmlCut(start={self.start!r}, end={self.end!r}, tag={self.tag!r}, " \
+               f"last={self.last}, include={self.include})"
+
+    def span(self, text: str or bytes) -> tuple or None:
+        """ 返回裁剪部分的 (start, end), 找不到时返回 None
+        text 为 bytes 时可用 memoryview(text)[start: end] 取得结果而不复制
+        """
+        if isinstance(text, str):
+            start_s, end_s, tag_s = self.start, self.end, f"<{self.tag}"
+        else:
+            start_s, end_s, tag_s = self._bytes["start"], self._bytes["end"], self._bytes.get("tag")
+        start = text.find(start_s) if start_s else 0
+        if start < 0:
+            return None
+        pos = start + len(start_s)
+        if self.tag:
+            end = self._tag_end(text, pos, tag_s, end_s)
+        elif not end_s:
+            end = len(text)
+        else:
+            end = text.rfind(end_s, pos) if self.last else text.find(end_s, pos)
+            end = end + len(end_s) if end >= 0 else None
+        if end is None:
+            return None
+        if not self.include:
+            start, end = pos, end - len(end_s)
+        return start, end
+
+    @staticmethod
+    def _tag_end(text, pos, tag_s, end_s) -> int or None:
+        """ 从 pos 开始计算标签层数, 返回层数为0的结束标签之后的位置 """
+        depth = 1
+        length = len(tag_s)
+        while depth:
+            close = text.find(end_s, pos)
+            if close < 0:
+                return None
+            idx = text.find(tag_s, pos, close)
+            while idx >= 0:
+                # <ul> 或 <ul class=...>, 不包括 <ult>
+                if text[idx + length: idx + length + 1] in (" ", ">", "\n", "\t", "\r", "/",
+                                                             b" ", b">", b"\n", b"\t", b"\r", b"/"):
+                    depth += 1
+                idx = text.find(tag_s, idx + length, close)
+            depth -= 1
+            pos = close + len(end_s)
+        return pos
+
+    def cut(self, text: str or bytes):
+        span = self.span(text)
+        return text[span[0]: span[1]] if span else None
+
+
+def init_cut(rule):
+    """ html_cut 规则为含有 start 的 dict 时返回 HtmlCut, 否则与之前一样编译为正则
+    """
+    if isinstance(rule, dict) and "start" in rule:
+        return HtmlCut(**rule)
+    return init_re(rule)
+
+
 class ListWebResponse:
     request: RequestBase
     bs = None
     html_cut: str = ""
-    html_cut_rule: re.Pattern
+    html_cut_rule: re.Pattern or HtmlCut
     config: dict
     li_tag: str
 
@@ -131,7 +261,7 @@ class ListWebResponse:
         if file:
             self.request = RequestBase()
             self.get_response_from_file(file)
-        self.html_cut_rule = init_re(html_cut_rule)
+        self.html_cut_rule = init_cut(html_cut_rule)
 
     def cut_html(self, rule: dict or str or re.Pattern = None, response=""):
         """ 裁剪得到的html源码, 保存到 self.html_cut
@@ -148,21 +278,34 @@ class ListWebResponse:
                     "rule_option": "re.compile额外参数, 默认为re.S, 
                     re.S无法保存在json中,所以使用re.S在python中的 int值,值为 16"
                 }
+                dict 中有 start 时使用 HtmlCut, 见 HtmlCut 的说明
         Returns:
-            html_cut(str): 使用正则裁剪后的html源码,也有可能不裁剪
+            html_cut(str): 裁剪后的html源码,也有可能不裁剪
         """
         logger.info("ListWebResponse.cut_html")
         rule = rule or self.html_cut_rule
-        response = response or self.request.response
-        if isinstance(rule, re.Pattern):
-            html_cut = rule.search(response)
+        if not isinstance(rule, (re.Pattern, HtmlCut)):
+            rule = init_cut(rule)
+        encoding = self.request.encoding
+        if (isinstance(rule, HtmlCut) and not response and self.request.content
+                and encoding in BYTES_CUT_ENCODINGS):
+            # 只解码裁剪的部分
+            response = self.request.content
+            span = rule.span(response)
+            html_cut = str(memoryview(response)[span[0]: span[1]], encoding,
+                           errors="replace") if span else None
         else:
-            pattern = init_re(rule)
-            html_cut = pattern.search(response)
-        if not html_cut:
+            response = response or self.request.response
+            if isinstance(rule, HtmlCut):
+                html_cut = rule.cut(response)
+            else:
+                html_cut = rule.search(response)
+                html_cut = html_cut.group() if html_cut else None
+        if html_cut is None:
             self.cut_judge()
             raise CutError(f"len response {len(response)}, cut rule {rule}")
-        self.html_cut = html_cut.group()
+        self.html_cut = html_cut
+        return html_cut
 
     def cut_judge(self):
         """
@@ -189,41 +332,22 @@ class ListWebResponse:
         logger.info(f"tag list len {len(self.tag_list)}")
 
     def save_response(self, rps="", url="test.html", extra="", save_date=True, 
-                      path="./html_error/",):
+                      path=None):
         """
         保存response，仅在浏览列表页面出错时或测试时保存使用
+        页面放入 ERROR_SNAPSHOT 的队列, 由后台线程压缩和写入, 见 module/error_snapshot.py
 
         Args:
-            rps (str): response,为空时使用self.url_response_byte
+            rps (str, bytes): response,为空时使用 request 的 bytes
             url (str): 网页url,为空时使用 test.html
-            path (str): html文件相对路径,默认为 ./html_error
+            path (str): html文件相对路径,默认为 ErrorSnapshot.Folder (./html_error)
             save_date (bool): 是带有保存带时间的新文件
             extra:
         Returns:
-            file_name (str): 保存的文件名
+            (bool): 是否放入队列, 队列已满时丢弃
         """
-        if isinstance(url, dict):
-            data = url["form"] if "form" in url else ""
-            full_url = url["url"]
-        else:
-            full_url = url
-        rps = rps or self.request.response
-        path = f"{path}/" if path[-1] != "/" else path
-        file_name = path + url_to_filename(full_url)
-        name_list = file_name.split(".")
-        # 添加额外名称
-        if isinstance(url, dict) and data:
-            name_list[-2] = f"{name_list[-2]}_{urlencode(data)}"
-        elif isinstance(url, dict) and data is None:
-            name_list[-2] = f"{name_list[-2]}_form={data}"
-        if save_date:
-            name_list[-2] = f"{name_list[-2]}{date_now_s(True)}"
-        if extra:
-            name_list[-2] = f"{name_list[-2]}_{extra}"
-
-        file_name = ".".join(name_list)
-        save_file(file_name, rps)
-        logger.info(f"save html as {file_name}")
+        rps = rps or self.request.content or self.request.response
+        return ERROR_SNAPSHOT.save(rps, url, extra, save_date, path)
 
     def get_response_from_file(self, file, html_cut=False):
         """ 将文件读取的数据赋给self.url_response_byte, 仅在测试中使用
@@ -239,6 +363,7 @@ class ListWebResponse:
             response = file
             logger.info(f"read html from str: {file.strip()[:100]}...")
         self.request.response = response
+        self.request.content = b""
         if html_cut:
             self.html_cut = response
 
@@ -260,7 +385,7 @@ class GetList(RequestHeaders, ListWebResponse):
         cookies = deep_get(self.config, "cookies")
         self.config["cookies"] = cookie_str_to_dict(cookies)
 
-        self.html_cut_rule = init_re(deep_get(self.config, "html_cut"))
+        self.html_cut_rule = init_cut(deep_get(self.config, "html_cut"))
 
         headers = deep_get(self.config, "headers")
         if not headers:
@@ -276,6 +401,10 @@ class GetList(RequestHeaders, ListWebResponse):
                                    headers=headers, 
                                    timeout=deep_get(self.config, "time_out"),
                                    proxies=deep_get(self.config, "proxies"))
+        encoding = deep_get(self.config, "encoding")
+        if encoding:
+            self.request.encoding = codecs.lookup(encoding).name
+            self.request.detect = False
 
     def url_extra_params(self, url, **kwargs):
         """
@@ -0,0 +1,139 @@
+"""
+json 接口的项目列表
+列表页面返回 json 的网站 (如 qjc) 不需要裁剪 html 和解析 tag:
+    1. 直接解码 response 的 bytes, 安装 orjson 时使用 orjson, 否则使用 json
+    2. 按 OpenConfig.li_tag 取得项目列表
+    3. 每个项目只取出 BidTag 中的字段, 得到 (name, date, url, type)
+
+li_tag 和 BidTag 的规则为 "." 分隔的键, 与 deep_get 相同, 如 "list.contentList"
+规则在初始化和热重载时编译为 KeyPath, 不在每个项目上分割字符串
+
+    class Qjc(JsonList, Task):
+        ...
+"""
+import json
+
+from module.exception import CutError
+from module.log import logger
+from module.utils import KeyPath, key_path
+from module.web_brows import BidTag, return_none
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TAG_KEYS = ("name", "date", "url", "type")
+
+
+def json_loads(data: bytes or str):
+    """ 解码 json, bytes 不需要先解码为 str
+    Raises:
+        ValueError: json 格式错误, orjson 和 json 的 JSONDecodeError 都是 ValueError
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compile_path(rule: str) -> KeyPath or None:
+    """ 规则为空时返回 None """
+    return key_path(rule) if rule else None
+
+
+class JsonProjection:
+    """ 从项目列表中取出 BidTag 的字段, 每个项目为一个 tuple
+    规则都是单个键时使用 dict.get, 否则逐层查找, 规则为空的字段为 "None"
+    """
+    def __init__(self, rules: dict, keys=TAG_KEYS):
+        self.keys = keys
+        self.paths = [compile_path(rules[key]) for key in keys]
+        self.flat = all(path and len(path.keys) == 1 for path in self.paths)
+        self.flat_keys = [path.last for path in self.paths] if self.flat else None
+
+    def __repr__(self):
+        return f"JsonProjection({dict(zip(self.keys, self.paths))})"
+
+    def __call__(self, rows: list) -> list:
+        if self.flat:
+            keys = self.flat_keys
+            try:
+                return [tuple(map(row.get, keys)) for row in rows]
+            except AttributeError:  # 列表中有不是 dict 的项目
+                pass
+        return [self.get(row) for row in rows]
+
+    def get(self, row) -> tuple:
+        return tuple(path.get(row) if path else "None" for path in self.paths)
+
+
+class JsonList:
+    """ json 列表网站的 Mixin, 放在 Task 之前继承, 替换 cut_html 和 get_tag_list
+    tag_list 中的项目为 JsonProjection 得到的 tuple
+    """
+    bs: dict or list
+    html_cut: dict or list
+    li_path: KeyPath or None
+    projection: JsonProjection
+
+    class TagGet(BidTag.TagGet):
+        """ 项目为 dict 时使用, 如直接调用 get_tag_info(dict) """
+        def init_rule(self, rule: str = ""):
+            self.tag_rule = compile_path(rule)
+            self.tag_fun = self.tag_rule.get if self.tag_rule else return_none
+
+        def get(self, tag):
+            return self.tag_fun(tag)
+
+    def __init__(self, name="", config: dict = None):
+        super().__init__(name, config)
+        self.init_projection()
+
+    def init_projection(self):
+        self.li_path = compile_path(self.li_tag)
+        self.projection = JsonProjection(self.tag_rules)
+        logger.info(f"li_tag: {self.li_path}, {self.projection}")
+
+    def reload_rules(self, config: dict):
+        super().reload_rules(config)
+        self.init_projection()
+
+    def cut_html(self, rule=None, response=None):
+        """ 不裁剪, 直接将 response 解码为 json 保存在 self.html_cut
+        Args:
+            rule: 不使用, 与 ListWebResponse.cut_html 的参数相同
+            response (bytes, str): 为空时使用 request 的 bytes
+        """
+        logger.info("JsonList.cut_html")
+        response = response or self.request.content or self.request.response
+        if not response:
+            raise CutError("Response is ''")
+        try:
+            self.html_cut = json_loads(response)
+        except ValueError as e:
+            raise CutError(f"len response {len(response)}, json error: {e}")
+        return self.html_cut
+
+    def get_tag_list(self, response=None, li_tag=None, *args):
+        """ 由 li_tag 得到项目列表, 每个项目只保留 BidTag 的字段
+        Args:
+            response (dict, list, bytes, str): 为空时使用 self.html_cut
+            li_tag (str): 为空时使用 self.li_tag
+        """
+        logger.info("JsonList.get_tag_list")
+        if response is None:
+            response = self.html_cut
+        elif isinstance(response, (bytes, str)):
+            response = self.cut_html(response=response)
+        self.bs = response
+        path = self.li_path if li_tag is None else compile_path(li_tag)
+        rows = path.get(response, []) if path else response
+        self.tag_list = self.projection(rows)
+        return self.tag_list
+
+    def get_tag_info(self, tag) -> list:
+        if isinstance(tag, tuple):
+            self.tag = tag
+            self.tag_info = list(tag)
+            return self.tag_info
+        return super().get_tag_info(tag)
@@ -1,24 +1,43 @@
 """
 TODO
-前缀树的错误插入检查
 遍历得到的网页列表，判断每个名称是否符合要求
 对招标项目网页的具体内容进行判断,截至时间、标书获取等
 """
 
+import gc
 import json
+import os
 import pickle
+import weakref
+from collections import deque
+from functools import lru_cache
 
-from _ctypes import PyObj_FromPtr  # 根据内存地址获得变量
-
+from module.config import CONFIG
 from module.log import logger
 from module.utils import *
 
-_get_p = PyObj_FromPtr
+MATCH_CACHE_SIZE = 20000  # 匹配结果缓存的标题数
 
 
 class BidTitleTrie:
-    def __init__(self, read_file=""):
+    def __init__(self, read_file="", cache_size=MATCH_CACHE_SIZE):
         self.child = {}
+        # 前缀树或规则每次修改时加1, 与标题一起作为匹配结果缓存的键, 修改前的缓存不再命中
+        self.version = 0
+        self._match_cache = lru_cache(maxsize=cache_size)(_weak_match(self))
+        # 两级关键词规则, 标题中同时有first关键词和任一second关键词, 且没有not关键词时匹配
+        self.rules = []  # [{"first": "降噪", "second": ["耳机", "耳罩"], "not": ["招聘"]}, ...]
+        # 规则中所有关键词的 Aho-Corasick 自动机, 状态 0 为根节点
+        self._rule_goto = [{}]  # 每个状态的转移 {字符: 状态}
+        self._rule_fail = [0]  # 每个状态的失配状态
+        self._rule_out = [0]  # 到达该状态时出现的关键词的位, 包括失配链上的关键词
+        self._rule_first = {}  # {first关键词的位: [(规则序号, second的位, not的位), ...]}
+        self._rule_first_mask = 0
+        self._rule_bit = {}  # {关键词: 位}
+        self._rule_compiled = True
+        # insert_from_file 插入的规则行和 first 关键词的首字符, 用于下次生成时复用未变化的子树
+        self._lines = {}  # {规则行: 首字符}
+        self._shared = set()  # 与其他前缀树共用的根节点子树的首字符, 修改前先复制
         if read_file:
             self.init_from_file(read_file)
 
@@ -28,8 +47,9 @@ class BidTitleTrie:
                 self._insert_from_list(li)
         else:
             self._insert_from_list(insert_list)
+        self.version += 1
 
-    def _insert_from_list(self, l_in: list):
+    def _insert_from_list(self, l_in: list, normalized=False):
         """  将列表中的所有字符串插入前缀树, 列表的形式为 [1,2,3],输入必须为3
         1: first关键词 字符开头 如 机
         2: first关键词 字符后可能的字符,用空格分隔 如 载 上, 与 1相连就是 机载 机上,
@@ -41,25 +61,28 @@ class BidTitleTrie:
             l_in : ["l","ed","面板 屏"]
         Args:
             l_in (list): 要插入的字符串列表
+            normalized (bool): l_in 已由 normalize_match 转换, 不再检查和转换每个关键词
         """
-        first_aft = second = ""
+        first_aft = second = ()
         first = l_in[0].strip()
         if len(l_in) > 1:
-            first_aft = l_in[1].strip().split(" ") if l_in[1].strip() else ""
+            first_aft = l_in[1].split()
             if len(l_in) > 2:
-                second = l_in[2].strip().split(" ") if l_in[2].strip() else ""
-        c_p = []  # 用于存second
-        # 存first
-        if first_aft:
-            for word_aft in first_aft:  # 存first_after
-                c_p.append(self._insert(f"{first}{word_aft.strip()}"))
-        else:
-            c_p = [self._insert(first)]
+                second = l_in[2].split()
+        if not normalized:
+            first = _clean_word(first)
+            first_aft = [_clean_word(word) for word in first_aft]
+            second = [_clean_word(word) for word in second]
+        words = [first + word_aft for word_aft in first_aft] if first_aft else [first]
+        if self._lines or self._shared:
+            for word in words:
+                self._own(word[:1])
+        # 存first, 终止节点用于存second
+        nodes = [self._insert(word) for word in words]
         # 存second
-        if second:
-            for s_p in c_p:
-                for word_s in second:
-                    self._insert(word_s, root=False, child_p=s_p)
+        for node in nodes:
+            for word_s in second:
+                self._insert(word_s, node)
 
     def insert_from_str(self, word_insert, split=""):
         """ 传入str, 使用分隔符将输入的多行字符串分隔成list, 再分别存入前缀树中
@@ -71,12 +94,35 @@ class BidTitleTrie:
         """
         # 用输入的分隔符预处理,否则
         if split == "":
-            word_list = word_insert.split(":")
-            self.insert_from_list(word_list)
+            word_list = [word_insert]
         else:
             word_list = word_insert.split(split)
-            for li in word_insert:
-                self.insert_from_list(li)
+        for li in word_list:
+            li = li.strip()
+            if li.startswith("&"):
+                self._add_rule(li[1:].split(":"))
+            elif li:
+                self._insert_from_list(li.split(":"))
+        self.version += 1
+
+    def insert_rule(self, l_in: list):
+        """ 插入两级关键词规则, 列表的形式为 [first, second, not]
+        first: 一个关键词
+        second: 使用空格分隔, 标题中有任一second关键词时匹配, 为空时只需要first
+        not: 使用空格分隔, 标题中有任一not关键词时不匹配, 可省略
+
+        Examples:
+            l_in : ["降噪", "耳机 耳罩", "招聘"]
+        """
+        self.version += 1
+        self._add_rule(l_in)
+
+    def _add_rule(self, l_in: list):
+        l_in = l_in + ["", ""]
+        self.rules.append({"first": normalize_match(l_in[0].strip()),
+                           "second": normalize_match(l_in[1]).split(),
+                           "not": normalize_match(l_in[2]).split()})
+        self._rule_compiled = False
 
     def init_from_file(self, file_read="./bid_settings/trie_dict.b"):
         """ 读取二进制文件中的dict变量, 赋给self.child
@@ -91,7 +137,15 @@ class BidTitleTrie:
             with open(file_read, "r", encoding="utf-8") as f_r:
                 f_read = f_r.read()
                 self.child = json.loads(f_read)
-        logger.info(f"title trie init from file: {file_read}")
+        self._lines, self._shared = {}, set()
+        self.version += 1
+        self._match_cache.cache_clear()
+        file_rule = rule_file(file_read)
+        if os.path.exists(file_rule):
+            with open(file_rule, "r", encoding="utf-8") as f_r:
+                self.rules = json.loads(f_r.read())
+            self._rule_compiled = False
+        logger.info(f"title trie init from file: {file_read}, {len(self.rules)} rules")
 
     def save_local(self, file_save="./bid_settings/title_trie.json"):
         create_folder(file_save)
@@ -100,53 +154,109 @@ class BidTitleTrie:
                 pickle.dump(self.child, f_w)
         else:
             save_json(self.child, file_save)
+            if self.rules or os.path.exists(rule_file(file_save)):
+                save_json(self.rules, rule_file(file_save))
         logger.info(f"save file: {file_save}")
 
-    def insert_from_file(self, trie_file):
-        """ 从文本文件中遍历每行,插入前缀树
+    def insert_from_file(self, trie_file, previous: "BidTitleTrie" = None) -> int:
+        """ 从文本文件中遍历每行,插入前缀树, 跳过不符合规则的行
+        每行只由 normalize_match 转换一次, 全部插入后 version 加1
+        插入时暂停 gc, 大量新建的节点 dict 会反复触发 gc 遍历整个前缀树, 10 万行规则单核全部插入约 0.8-1 s
+        同一个 first 关键词首字符的规则行只修改根节点下的同一个子树, 与 previous 相比只检查和插入新增的规则行,
+        没有新增或删除规则行的子树直接共用 previous 的, 修改少量规则后只重新插入变化的子树
 
         Args:
             trie_file (str): 前缀树文件路径
+            previous (BidTitleTrie): 上次由 insert_from_file 生成的前缀树, 为 None 时全部插入
+        Returns:
+            (int): 不符合规则的行数
         """
-
+        error = 0
         with open(trie_file, "r", encoding="utf-8") as f_r:
-            for line in f_r:
-                line = line.strip()
-                if line.startswith("#") or not line:
+            lines = list(map(str.strip, f_r.read().splitlines()))
+        fresh = not self.child  # 已有关键词时子树不只由文件中的规则生成, 不能复用和记录
+        known = previous._lines if fresh and previous is not None else {}
+        keys = dict(known)
+        changed = set()  # 新增或删除了规则行的子树
+        todo = enumerate(lines, start=1)
+        if known:
+            current = set(lines)
+            changed.update(keys.pop(line) for line in known.keys() - current)
+            added = current - known.keys()
+            todo = ((idx, line) for idx, line in todo if line in added)
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for idx, line in todo:
+                if not line or line[0] == "#":
                     continue
-                self.insert_from_str(line)
-        logger.info(f"init from file: {trie_file}")
+                message = check_rule(line)
+                if message:
+                    logger.warning(f"{trie_file} line {idx}: {line}, {message}")
+                    error += 1
+                    continue
+                if line[0] == "&":
+                    self._add_rule(normalize_match(line[1:]).split(":"))
+                    continue
+                l_in = normalize_match(line).split(":")
+                first = l_in[0].strip()
+                if not first:  # first 关键词只有 normalize_match 删除的字符
+                    logger.warning(f"{trie_file} line {idx}: {line}, empty first keyword")
+                    error += 1
+                    continue
+                self._insert_from_list(l_in, normalized=True)
+                keys[line] = first[0]
+            if known:
+                changed.update(keys[line] for line in added if line in keys)
+                # 变化的子树再插入未修改的规则行, 其他子树共用 previous 的
+                for line, key in known.items():
+                    if key in changed and line in keys:
+                        self._insert_from_list(normalize_match(line).split(":"), normalized=True)
+                for key in previous.child.keys() - changed:
+                    self.child[key] = previous.child[key]
+                    self._shared.add(key)
+                    previous._shared.add(key)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if fresh:
+            self._lines = keys
+        self.version += 1
+        logger.info(f"init from file: {trie_file}, {len(self._shared)} subtrees shared with previous")
+        return error
+
+    def _own(self, key: str):
+        """ 修改根节点下 key 的子树前调用, 与其他前缀树共用的子树先复制一份
+        修改后的前缀树不再只由规则行生成, 下次生成时不复用
+        """
+        self._lines = {}
+        if key in self._shared:
+            self._shared.discard(key)
+            if key in self.child:
+                self.child[key] = pickle.loads(pickle.dumps(self.child[key], pickle.HIGHEST_PROTOCOL))
+
+    def words(self) -> set:
+        """ 前缀树中所有的关键词, second关键词与first关键词相连, 如 降噪耳机
+        """
+        return set(trie_diff(self.child, {}))
 
-    def _insert(self, word: str, root=True, child_p=-1) -> int:
-        """ 将字符串插入前缀树
+    def _insert(self, word: str, node: dict = None) -> dict:
+        """ 将已转换的字符串插入前缀树, 由调用者转换字符和修改 version
 
         Args:
             word (str): 要插入的字符串
-            child_p (int): child节点的内存地址,需要使用id()获得
+            node (dict): 开始插入的节点, 为 None 时从根节点插入
         Returns:
-            id(c) (int): 最后插入的字符所在的内存地址
+            c (dict): 最后插入的字符所在的节点
         """
-        warning_list = []  # 储存不符合规范的字符,用于打印
-        if root:
-            c = self.child
-        else:
-            if child_p < 1:
-                logger.error(f"input memory address: {child_p}, words: {word}")
-            else:
-                c = _get_p(child_p)
+        c = self.child if node is None else node
         for wd in word:
-            if wd in c:
-                c = c[wd]
-            else:
-                if wd in ("", " ", "："):  # TODO 错误检查,检查是否有符号,符号是否符合要求
-                    warning_list.append(wd)
-                else:
-                    c[wd] = {}
-                    c = c[wd]
-        if warning_list:
-            logger.warning(f"insert word: {word} has {warning_list}")
+            nxt = c.get(wd)
+            if nxt is None:
+                nxt = c[wd] = {}
+            c = nxt
         c["end"] = True
-        return id(c)
+        return c
 
     def search(self, word: str) -> bool:
         """ 查找字符串是否在前缀树中 , 需要被查找的字符的节点有 "end"
@@ -185,12 +295,29 @@ class BidTitleTrie:
 
     def search_all(self, text):
         """ 输入一个字符串, 在树中查找是否有符合条件的分支
+        标题先由 normalize_match 转换, 返回的关键词为转换后的字符
 
         Args:
             text:
         Returns:
             wordMatch (list): 返回符合规则的关键词,当有第二关键词时 len > 2
         """
+        return self._search_all(normalize_match(text))
+
+    def match(self, text: str) -> list:
+        """ 带缓存的 search_all, 同一标题在不同分类, 网站和每次运行中重复出现时不再遍历前缀树
+        """
+        return list(self._match_cache(normalize_match(text), self.version))
+
+    def cache_info(self) -> str:
+        info = self._match_cache.cache_info()
+        total = info.hits + info.misses
+        rate = info.hits / total * 100 if total else 0
+        return f"match cache: hits {info.hits}, misses {info.misses}, " \
+               f"hit rate {rate:.1f}%, size {info.currsize}/{info.maxsize}"
+
+    def _search_all(self, text: str) -> list:
+        """ text 为 normalize_match 转换后的标题 """
         listMatch = []
         wordMatch = ""
         c = self.child
@@ -199,7 +326,7 @@ class BidTitleTrie:
         while 1:
             if fast > length:
                 break
-            wd: str = text[fast].upper()
+            wd: str = text[fast]
             # logger.debug(f"fast: {fast}, wd:{wd}")
             if wd in c:  # 进入前缀树匹配
                 c = c[wd]
@@ -211,15 +338,216 @@ class BidTitleTrie:
                     if wordMatch not in listMatch:
                         listMatch.append(wordMatch)
                     wordMatch = ""
-                if c != self.child:
+                if c is not self.child:
                     c = self.child
                     slow = fast
                     continue
                 c = self.child  # 若第一关键词未匹配则回到上次节点
                 slow = fast + 1
             fast += 1
+        if wordMatch and wordMatch not in listMatch:  # 关键词在标题末尾
+            listMatch.append(wordMatch)
+        if self.rules:
+            for word in self._search_rule(text):
+                if word not in listMatch:
+                    listMatch.append(word)
         return listMatch
 
+    def search_span(self, text: str) -> list:
+        """ 匹配到的关键词在原标题中第一次出现的位置, 用于高亮
+
+        Returns:
+            (list): [(关键词, start, end), ...], 两级关键词规则拆分为各个关键词
+        """
+        norm, offset = normalize_offset(text)
+        spans = []
+        for match in self.search_all(text):
+            for word in match.replace("&", "/").split("/"):
+                start = norm.find(word)
+                if start >= 0:
+                    spans.append((word, offset[start], offset[start + len(word) - 1] + 1))
+        return spans
+
+    def search_rule(self, text: str) -> list:
+        """ 两级关键词规则匹配, 用 Aho-Corasick 自动机一次遍历标题得到所有出现的关键词的位,
+        耗时与标题长度成正比, 与关键词的数量和长度无关, 只检查出现了first关键词的规则
+
+        Returns:
+            (list): 匹配到的规则, 如 ["降噪&耳机"]
+        """
+        return self._search_rule(normalize_match(text))
+
+    def _search_rule(self, text: str) -> list:
+        if not self._rule_compiled:
+            self._compile_rules()
+        goto, fail, out = self._rule_goto, self._rule_fail, self._rule_out
+        state = found = 0
+        for wd in text:
+            while state and wd not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(wd, 0)
+            found |= out[state]
+        result = []
+        first = found & self._rule_first_mask
+        while first:
+            bit = first & -first  # 最低位
+            first ^= bit
+            for idx, second, negative in self._rule_first[bit]:
+                if found & negative or (second and not found & second):
+                    continue
+                rule = self.rules[idx]
+                word = rule["first"]
+                if second:
+                    word = f"{word}&{'/'.join(w for w in rule['second'] if found & self._rule_bit[w])}"
+                result.append(word)
+        return result
+
+    def _compile_rules(self):
+        """ 为规则中的所有关键词分配一个位, 生成 Aho-Corasick 自动机 """
+        goto, fail, out = [{}], [0], [0]
+        self._rule_first, self._rule_bit = {}, {}
+        self._rule_first_mask = 0
+
+        def get_bit(word):
+            if word not in self._rule_bit:
+                self._rule_bit[word] = bit = 1 << len(self._rule_bit)
+                state = 0
+                for wd in word:
+                    nxt = goto[state].get(wd)
+                    if nxt is None:
+                        nxt = goto[state][wd] = len(goto)
+                        goto.append({})
+                        fail.append(0)
+                        out.append(0)
+                    state = nxt
+                out[state] |= bit
+            return self._rule_bit[word]
+
+        for idx, rule in enumerate(self.rules):
+            first = get_bit(rule["first"])
+            second = negative = 0
+            for word in rule["second"]:
+                second |= get_bit(word)
+            for word in rule["not"]:
+                negative |= get_bit(word)
+            self._rule_first.setdefault(first, []).append((idx, second, negative))
+            self._rule_first_mask |= first
+        # 按深度遍历, 失配状态为当前关键词最长的, 也是其他关键词前缀的后缀
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for wd, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and wd not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(wd, 0)
+                out[nxt] |= out[fail[nxt]]
+        self._rule_goto, self._rule_fail, self._rule_out = goto, fail, out
+        self._rule_compiled = True
+
+
+def _weak_match(trie: BidTitleTrie):
+    """ 缓存的匹配函数只保存前缀树的弱引用, 缓存不会使前缀树循环引用自己,
+    热重载替换 titleTrie 后旧的前缀树和它的缓存可以立即释放
+    """
+    ref = weakref.ref(trie)
+
+    def match(text: str, version: int) -> tuple:
+        return tuple(ref()._search_all(text))
+    return match
+
+
+def _clean_word(word: str) -> str:
+    """ 删除关键词中不符合规范的字符后由 normalize_match 转换 """
+    if " " in word or "：" in word:  # 不符合规范的字符不插入
+        logger.warning(f"insert word: {word} has space or full width colon")
+        word = word.replace(" ", "").replace("：", "")
+    return normalize_match(word)
+
+
+def check_rule(line: str) -> str:
+    """ 检查前缀树文件中的一行 "first: first_aft: second"
+
+    两级关键词规则以 & 开头 "& first: second: not"
+
+    Returns:
+        (str): 错误信息, 符合规则时返回 ""
+    """
+    if "：" in line:
+        return "full width colon"
+    l_in = line.lstrip("&").split(":")
+    if len(l_in) > 3:
+        return "more than 3 parts"
+    first = l_in[0].strip()
+    if not first:
+        return "empty first keyword"
+    if len(first.split()) > 1:
+        return "first keyword has space"
+    return ""
+
+
+def rule_file(trie_file: str) -> str:
+    """ 两级关键词规则保存在前缀树文件旁, 如 title_trie_rule.json """
+    return f"{os.path.splitext(trie_file)[0]}_rule.json"
+
+
+def rule_text(rule: dict) -> str:
+    text = f"& {rule['first']}: {' '.join(rule['second'])}: {' '.join(rule['not'])}"
+    return text.rstrip(": ")
+
+
+def trie_diff(new: dict, old: dict, prefix="") -> list:
+    """ new 中有而 old 中没有的关键词, 相同的子树直接跳过
+    """
+    words = []
+    for wd, c in new.items():
+        if wd == "end":
+            if "end" not in old:
+                words.append(prefix)
+        elif wd not in old:
+            words.extend(trie_diff(c, {}, prefix + wd))
+        elif c is not old[wd] and c != old[wd]:  # 共用的子树不需要逐个比较
+            words.extend(trie_diff(c, old[wd], prefix + wd))
+    return words
+
+
+def title_trie_diff(new: BidTitleTrie, old: BidTitleTrie = None) -> tuple:
+    """ 比较两个前缀树的关键词和两级关键词规则
+
+    Returns:
+        added (list): new 中新增的关键词和规则
+        removed (list): new 中删除的关键词和规则
+    """
+    old_child = old.child if old is not None else {}
+    added, removed = sorted(trie_diff(new.child, old_child)), sorted(trie_diff(old_child, new.child))
+    rules = {rule_text(r) for r in new.rules}
+    old_rules = {rule_text(r) for r in old.rules} if old is not None else set()
+    return added + sorted(rules - old_rules), removed + sorted(old_rules - rules)
+
+
+def compile_trie(trie_file, previous: BidTitleTrie = None) -> tuple:
+    """ 从前缀树文件生成新的前缀树, 并与 previous 比较关键词
+    previous 中规则行未变化的子树直接共用, 见 BidTitleTrie.insert_from_file
+
+    Args:
+        trie_file (str): 前缀树文件路径
+        previous (BidTitleTrie): 上次生成的前缀树
+    Returns:
+        trie (BidTitleTrie): 新的前缀树
+        added (list): 新增的关键词
+        removed (list): 删除的关键词, 包括两级关键词规则
+    """
+    trie = BidTitleTrie()
+    error = trie.insert_from_file(trie_file, previous)
+    added, removed = title_trie_diff(trie, previous)
+    logger.info(f"compile title trie from {trie_file}, {error} error lines")
+    if added:
+        logger.info(f"added: {added}")
+    if removed:
+        logger.info(f"removed: {removed}")
+    return trie, added, removed
+
 
 init_file = "./bid_settings/title_trie.json"
 
@@ -228,15 +556,37 @@ try:
 except FileNotFoundError as e:
     logger.warning(f"{e}")
     titleTrie = BidTitleTrie()
+trie_watcher = FileWatcher([init_file, rule_file(init_file)], CONFIG.reload_interval)
+
+
+def reload_title_trie() -> bool:
+    """ title_trie.json 或规则文件被修改时, 读取为新的前缀树后替换 titleTrie,
+    替换前正在使用的前缀树不受影响, 使用时需要通过 judge_content.titleTrie 获取
+    """
+    global titleTrie
+    if not trie_watcher.changed():
+        return False
+    try:
+        trie = BidTitleTrie(init_file)
+    except (OSError, ValueError) as e:  # 文件正在写入
+        logger.warning(f"reload {init_file} failed: {e}")
+        return False
+    trie_watcher.update()
+    added, removed = title_trie_diff(trie, titleTrie)
+    logger.info(f"title trie reloaded from {init_file}, added: {added}, removed: {removed}")
+    titleTrie = trie
+    return True
 
 
 def update_match(data_list_file: str = ""):
-    from module.config import config
+    """ 用当前的前缀树重新匹配 daylist 文件, 覆写对应的 daymatch 文件
+    """
+    if data_list_file.endswith(".bin"):
+        return update_match_record(f"{CONFIG.DATA_FOLDER}/{data_list_file}")
     if data_list_file.endswith(".txt"):
-        f_in = f"{config.dataFolder}/{data_list_file}"
+        f_in = f"{CONFIG.DATA_FOLDER}/{data_list_file}"
     else:
-        from module.utils import date_days
-        f_in = f"{config.dataFolder}/bid_daylist_{date_days(format='day')}.txt"
+        f_in = f"{CONFIG.DATA_FOLDER}/bid_daylist_{date_days(format='day')}.txt"
     f_out = f_in.replace("daylist", "daymatch")
     with open(f_in, "r", encoding="utf-8") as fi,\
          open(f_out, "w", encoding="utf-8") as fo:
@@ -244,18 +594,39 @@ def update_match(data_list_file: str = ""):
             if " start at " in line:
                 fo.write(line)
                 continue
-            line = line.split(";")
-            result = titleTrie.search_all(line[0])
+            result = titleTrie.search_all(line.split(";")[0])
             if result:
-                logger.info(f"{result} {line[0]} {line[1]}")
-                line.insert(0, f"[{','.join(result)}]")
-                line = f"{'; '.join(line)}"
-                fo.write(line)
+                line = line.rstrip("\n")
+                logger.info(f"{result} {line}")
+                fo.write(f"[{','.join(result)}]; {line}\n")
+
+
+def update_match_record(f_in: str):
+    """ 用当前的前缀树重新匹配记录文件 bid_dayrecord_{day}.bin, 覆写对应的 daymatch 文件
+    每条记录只解码标题字段, 标题中含有 "; " 时也能正确匹配
+    """
+    from datetime import datetime
+
+    from module.bid_record import NAME, BidRecordReader
+    f_out = f_in.replace("dayrecord", "daymatch")[:-4] + ".txt"
+    site = None
+    with BidRecordReader(f_in) as reader,\
+         open(f_out, "w", encoding="utf-8") as fo:
+        for idx in range(len(reader)):
+            result = titleTrie.search_all(reader.field(idx, NAME))
+            if not result:
+                continue
+            record = reader.record(idx)
+            if record.site != site:
+                site = record.site
+                fo.write(f"{site} start at {datetime.fromtimestamp(record.time).strftime('%Y-%m-%d %H:%M:%S')}\n")
+            line = f"{record.name}; {record.date}; {record.url}; {record.type}"
+            logger.info(f"{result} {line}")
+            fo.write(f"[{','.join(result)}]; {line}\n")
 
 
 if __name__ == "__main__":
-    titleTrie.child = {}
-    titleTrie.insert_from_file("./test/前缀树.txt")
+    titleTrie, _, _ = compile_trie("./test/前缀树.txt", titleTrie)
     titleTrie.save_local(init_file)
     print(titleTrie.search_all("123测量图形456"))
     print(titleTrie.search_all("123测测量图形456"))
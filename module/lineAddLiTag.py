@@ -6,6 +6,12 @@
 3. -e : 输出excel文件
 4. -i : dayFile 需要指定 输入类型, 可选输入(小写L)  l m mn
         mn 为 match文件, 不输出已匹配关键词
+5. -s : excel文件中每个网站一张工作表
+6. -b : 批量输出, 指定开始和结束日期 格式为 mm-dd, 如 -b 07-01 07-31, 不输入结束日期时到当天
+        每天的 list 和 match 文件在进程池中并行输出
+7. -w : 批量输出时的进程数, 默认为 cpu 核数
+8. -r : 读取二进制记录文件 bid_dayrecord_{day}.bin 代替 day 文件, 输出的文件名不变
+        记录文件中的标题可以含有 "; "
 
 暂定
 -t : 选择txt文件输出, 需要指定txt文件
@@ -17,11 +23,15 @@
 
 import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from datetime import datetime, timedelta
 from os.path import basename, exists
 
 from openpyxl import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
+from module.bid_record import BidRecordReader
 from module.utils import date_days
 
 DATAPATH = "./data"
@@ -49,11 +59,16 @@ with open(CONFIG_FILE, "r", encoding="utf-8") as f:
 
 class Command:
     day: str = None
+    day_start: str = None  # 批量输出
+    day_end: str = None
+    workers: int = None
     excel = None
     htm = None
     List = None
     Match = None
     match_no_keyword = None
+    sheet = None
+    record = None
     argv = None
     _argv = None
 
@@ -79,6 +94,14 @@ class Command:
                 self.htm = True
             elif command == "-i":
                 self.command_file_in()
+            elif command == "-s":
+                self.sheet = True
+            elif command == "-b":
+                self.command_batch()
+            elif command == "-w":
+                self.command_workers()
+            elif command == "-r":
+                self.record = True
             else:
                 self.error(command)
         if self.excel is None and self.htm is None:
@@ -93,14 +116,31 @@ class Command:
         if not self.argv or self.argv[0].startswith("-"):
             return
         else:
-            command = self.argv.pop(0)
-            date = command.split("-")
-            for d in date:
-                if not d.isdigit():
-                    self.error(command)
-            if len(command) == 5:  # mm-dd -> yyyy-mm-dd
-                command = f"{self.day[:4]}-{command}"
-            self.day = command
+            self.day = self._pop_day()
+
+    def command_batch(self):
+        if not self.argv or self.argv[0].startswith("-"):
+            self.error("-b")
+        self.day_start = self._pop_day()
+        self.day_end = date_days(format="day")
+        if self.argv and not self.argv[0].startswith("-"):
+            self.day_end = self._pop_day(year=self.day_start[:4])
+
+    def command_workers(self):
+        if not self.argv or not self.argv[0].isdigit():
+            self.error("-w")
+        self.workers = int(self.argv.pop(0))
+
+    def _pop_day(self, year=None) -> str:
+        """ 取出一个日期, mm-dd 使用 year 或今年补全为 yyyy-mm-dd """
+        command = self.argv.pop(0)
+        date = command.split("-")
+        for d in date:
+            if not d.isdigit():
+                self.error(command)
+        if len(command) == 5:  # mm-dd -> yyyy-mm-dd
+            command = f"{year or date_days(format='day')[:4]}-{command}"
+        return command
 
     def command_file_in(self):
         if not self.argv or self.argv[0].startswith("-"):
@@ -125,86 +165,135 @@ class Command:
         exit()
 
 
+HTM_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        body {background-color: #C7EDCC}
+        #bar {position: sticky; top: 0; padding: 4px 0; background-color: #C7EDCC}
+    </style>
+</head>
+<body>
+<div id="bar">
+    <select id="site"><option value="">全部网站</option></select>
+    <input id="keyword" placeholder="检索标题或关键词">
+    <button id="prev">上一页</button> <span id="page"></span> <button id="next">下一页</button>
+</div>
+<ol id="list"></ol>
+<script>
+// [网站, 序号, 标题, 日期, url, 匹配词]
+const ROWS = [
+"""
+
+HTM_TAIL = """];
+const PAGE_SIZE = 200;
+const site = document.getElementById("site"), keyword = document.getElementById("keyword"),
+      list = document.getElementById("list"), pageText = document.getElementById("page");
+let rows = ROWS, page = 0;
+new Set(ROWS.map(r => r[0])).forEach(s => site.add(new Option(s, s)));
+
+function esc(s) {
+    return s.replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]));
+}
+
+function filter() {
+    const s = site.value, k = keyword.value.trim().toUpperCase();
+    rows = ROWS.filter(r => (!s || r[0] === s) &&
+                            (!k || r[2].toUpperCase().includes(k) || r[5].includes(k)));
+    show(Infinity);  // 与之前一样默认显示最新的项目, 即最后一页
+}
+
+function show(p) {
+    const last = Math.max(0, Math.ceil(rows.length / PAGE_SIZE) - 1);
+    page = Math.min(Math.max(p, 0), last);
+    list.innerHTML = rows.slice(page * PAGE_SIZE, (page + 1) * PAGE_SIZE).map(r =>
+        `<li value="${r[1]}">${r[5] ? esc(r[5]) + ": " : ""}<a href="${esc(r[4])}">${esc(r[2])}</a>, ${esc(r[3])}</li>`
+    ).join("");
+    pageText.textContent = `${page + 1} / ${last + 1}, 共 ${rows.length} 个项目`;
+    window.scrollTo(0, document.body.scrollHeight);
+}
+
+site.onchange = keyword.oninput = filter;
+document.getElementById("prev").onclick = () => show(page - 1);
+document.getElementById("next").onclick = () => show(page + 1);
+filter();
+</script>
+</body>
+</html>
+"""
+
+
 class Htm:
+    """ 项目以 JSON 数组写入页面, 由页面中的 js 分页显示, 可按网站筛选和检索标题,
+    写入时逐行输出, 不在内存中保存所有项目
+    """
     def __init__(self) -> None:
         self.name: str = None
         self.output = None
-        self.time = None
-        self.line = None  # fun
+        self.site = ""  # 当前网站, 由 "{网站} start at" 行切换
+        self.keyword = False  # 是否输出匹配词
         self.idx = 1
 
     def init(self, name: str, type, match_no_keyword):
         self.name = name[:-4] + ".htm"
         self.output = open(self.name, "w", encoding="utf-8")
-        self.line = self.list
-        if type == "match" and not match_no_keyword:
-            self.line = self.match
+        self.site = ""
+        self.keyword = type == "match" and not match_no_keyword
 
     def head(self, *args):
-        # html <head>标签, 显示标题
-        self.output.write(f"""<head>
-        <title>{self.name.split(".")[0]}</title>
-    </head>\n""")
+        title = basename(self.name).split(".")[0]
+        self.output.write(HTM_HEAD.replace("{title}", title))
 
     def body(self, body):
-        if body == "top":
-            self.output.write(f'<body onload=scrollToBottom(); style="background-color: #C7EDCC">\n')
-            self.function()
-        elif body == "bottom":
-            for _ in range(0,8):
-                self.output.write("<li></li>\n")
-            self.output.write("</body>")
-
-    def function(self):
-        # 页面渲染完成后自动滚到底部
-        self.output.write("""
-        <script>
-            // 页面渲染完成后自动滚到底部
-            function scrollToBottom()
-            {
-                window.scrollTo(0, document.getElementsByTagName("body")[0].scrollHeight);
-            }
-        </script>
-        """)
-
-    def labels_a(self, title, url):
-        return f"<a href=\"{url}\">{title}</a>"
-
-    def li(self, line: str):
-        if ";" in line:
-            line = get_list(line)
-            labelsA = self.labels_a(line[TITLE], line[URL])
-            data = self.line(line, labelsA, self.idx)
-            self.output.write(data)
-            self.idx += 1
-        else:
-            self.output.write(f"<li>{line.strip()}</li>\n")
-
-    def list(self, line, labelsA, idx):
-        return f"<li>{str(idx)}. {labelsA}, {line[DATE]}</li>\n"
-
-    # match 一行会分为5个 [匹配关键词]; 标题; 日期; url; 类型
-    def match(self, line, labelsA, idx):
-        return f"<li>{str(idx)}. {line[0]}: {labelsA}, {line[DATE]}</li>\n"
+        if body == "bottom":
+            self.output.write(HTM_TAIL)
+
+    def li(self, line: str, line_list: list = None):
+        """
+        Args:
+            line (str): day文件中的一行
+            line_list (list): get_list(line) 的结果, 由 Writer 解析一次后传入
+        """
+        if line_list is None and ";" not in line:
+            if " start at " in line:
+                self.site = line.split(" ", 1)[0]
+            return
+        line_list = line_list or get_list(line)
+        # match 一行会分为5个 [匹配关键词]; 标题; 日期; url; 类型
+        keyword = line_list[0] if self.keyword else ""
+        row = [self.site, self.idx, line_list[TITLE], line_list[DATE], line_list[URL], keyword]
+        # "</" 会被浏览器当作 </script>
+        data = json.dumps(row, ensure_ascii=False).replace("</", "<\\/")
+        self.output.write(f"{data},\n")
+        self.idx += 1
 
     def exit(self):
         self.output.close()
 
 
 class Excel:
-    def __init__(self) -> None:
+    """ 使用 write_only 工作簿逐行写入, 内存占用与行数无关
+    multi_sheet 为 True 时每个网站一张工作表, 由 "{网站} start at" 行切换工作表
+    """
+    TITLE = ["序号", "标题", "日期", "URL"]
+    WIDTH = [6, 95, 20, 10]  # 列宽
+
+    def __init__(self, multi_sheet=False) -> None:
         self.name = None  # 保存的文件
-        self.line = None  # fun
         self.workbook: Workbook = None
-        self.sheet: Worksheet = None
+        self.sheet: WriteOnlyWorksheet = None  # 当前工作表
+        self.sheets: dict = None  # {工作表名: [工作表, 序号]}
+        self.sheet_name = None
+        self.multi_sheet = multi_sheet
         self.type = None
-        self.title_idx: list = None
-        self.row = 2
+        self.title: list = None
+        self.width: list = None
         self.idx = 1
 
     def init(self, name: str, type, match_no_keyword):
         self.type = type
-        self.row = 2
         name = basename(name)[:-4]
         self.name = name + ".xlsx"
         idx = 1
@@ -213,55 +302,66 @@ class Excel:
             self.name = f"{name}({idx}).xlsx"
             idx += 1
         self.name = f"{DATAFOLDER}/{self.name}"
-        # 初始化工作表
-        self.workbook = Workbook()
-        self.sheet = self.workbook.active  # 第一张工作表
-        # 需要写入的列
-        self.title_idx = ["A", "B", "C", "D"]
-        if self.type == "match" and not match_no_keyword:
-            self.title_idx.append("E")
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+        self.sheet = self.sheet_name = None
+        # 需要写入的列, match 文件多一列匹配词, 不输出匹配词时仍按4列写入
+        columns = 5 if self.type == "match" and not match_no_keyword else 4
+        self.title = self.TITLE.copy()
+        self.width = self.WIDTH.copy()
+        if self.type == "match":
+            self.title.insert(1, "匹配词")
+            self.width.insert(1, 20)
+        self.title = self.title[:columns]
+        self.width = self.width[:columns]
 
     def head(self, *args, **kwargs):
-        title = ["序号", "标题", "日期", "URL"]
-        width = [6, 95, 20, 10]  # 列宽
-        if self.type == "match":
-            title.insert(1, "匹配词")
-            width.insert(1, 20)
-        # 写入标题
-        for i, col in enumerate(self.title_idx):
-            self.sheet[f"{col}1"] = title[i]
-            col = col[0]
-            self.sheet.column_dimensions[col].width = width[i]
-        del(self.title_idx[0])  # 序号列单独写入
-        # 冻结窗格 B2
-        self.sheet.freeze_panes = "B2"
+        pass
 
     def body(self, body):
-        if body == "bottom":
-            if self.type == "match":
-                self.sheet.auto_filter.ref = "B1:C1"
-            else:
-                self.sheet.auto_filter.ref = "B1"
-
-    def li(self, line, *args):
-        if ";" not in line:
-            self.sheet[f"B{self.row}"] = line
+        pass
+
+    def switch_sheet(self, sheet_name="Sheet"):
+        """ 切换到 sheet_name 工作表, 不存在时创建并写入标题行
+        """
+        if self.sheet is not None:
+            self.sheets[self.sheet_name][1] = self.idx
+        if sheet_name not in self.sheets:
+            sheet = self.workbook.create_sheet(sheet_name)
+            for i, width in enumerate(self.width):
+                sheet.column_dimensions[chr(ord("A") + i)].width = width
+            # 冻结窗格 B2
+            sheet.freeze_panes = "B2"
+            sheet.auto_filter.ref = "B1:C1" if self.type == "match" else "B1"
+            sheet.append(self.title)
+            self.sheets[sheet_name] = [sheet, 1]
+        self.sheet, self.idx = self.sheets[sheet_name]
+        self.sheet_name = sheet_name
+
+    def li(self, line, line_list: list = None):
+        if line_list is None and ";" not in line:
+            if self.multi_sheet and " start at " in line:
+                self.switch_sheet(line.split(" ", 1)[0])
+            elif self.sheet is None:
+                self.switch_sheet()
+            self.sheet.append([None, line.strip()])
         else:
-            line_list = get_list(line)
-            self.sheet[f"A{self.row}"] = self.idx
-            for i, col in enumerate(self.title_idx):
-                self.sheet[f"{col}{self.row}"] = line_list[i]
+            if self.sheet is None:
+                self.switch_sheet()
+            line_list = line_list or get_list(line)
+            self.sheet.append([self.idx, *line_list[:len(self.title) - 1]])
             self.idx += 1
-        self.row += 1
 
     def exit(self):
+        if self.sheet is None:
+            self.switch_sheet()
         self.workbook.save(self.name)
         self.workbook.close()
 
 
-def get_output_class(class_name):
+def get_output_class(class_name, command: Command = None):
     if class_name == "excel":
-        return Excel()
+        return Excel(multi_sheet=bool(command and command.sheet))
     elif class_name == "htm":
         return Htm()
     return None
@@ -285,27 +385,90 @@ class Writer:
         self.file_out = {}
         for k in ("htm", "excel"):
             if getattr(self.command, k):
-                self.file_out[k] = get_output_class(k)
+                self.file_out[k] = get_output_class(k, self.command)
 
     def output(self):
         for type, name in self.file_in.items():
+            self.output_file(type, name)
+
+    def output_file(self, type, name):
+        """ 读取一个 day 文件, 输出为所有格式
+        """
+        for out in self.file_out.values():
+            out: Htm
+            out.idx = 1
+            out.init(name, type, self.command.match_no_keyword)
+            out.head()
+            out.body("top")
+
+        # 每行只解析一次, 结果传给所有输出
+        lines = self.read_record(type, name) if self.command.record else self.read_file(name)
+        for line, line_list in lines:
             for out in self.file_out.values():
                 out: Htm
-                out.idx = 1
-                out.init(name, type, self.command.match_no_keyword)
-                out.head()
-                out.body("top")
-
-            with open(name, "r", encoding="utf-8") as f:
-                idx = 0
-                for line in f:
-                    for out in self.file_out.values():
-                        out: Htm
-                        out.li(line)
-
-            for out in self.file_out.values():
-                out.body("bottom")
-                out.exit()
+                out.li(line, line_list)
+
+        for out in self.file_out.values():
+            out.body("bottom")
+            out.exit()
+
+    def source(self, type, name) -> str:
+        """ 实际读取的文件, -r 时为当天的记录文件 """
+        if self.command.record:
+            return f"{name[:-4].replace(f'bid_day{type}_', 'bid_dayrecord_')}.bin"
+        return name
+
+    @staticmethod
+    def read_file(name):
+        """ 每行都要输出, 按文本逐行读取 """
+        with open(name, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\r\n")
+                yield line, line.split("; ") if ";" in line else None
+
+    def read_record(self, type, name):
+        """ 记录转换为与 day 文件相同的 (line, line_list), 网站变化时插入 "{网站} start at" 行
+        match 只输出匹配到关键词的记录
+        """
+        site = None
+        with BidRecordReader(self.source(type, name)) as reader:
+            for record in reader.records(match_only=type == "match"):
+                if record.site != site:
+                    site = record.site
+                    start = datetime.fromtimestamp(record.time).strftime("%Y-%m-%d %H:%M:%S")
+                    yield f"{site} start at {start}", None
+                line_list = [record.name, record.date, record.url, record.type]
+                if type == "match":
+                    line_list.insert(0, f"[{record.match}]")
+                yield "", line_list
+
+
+def _output_file(command: Command, type, name):
+    """ 在子进程中输出一个 day 文件 """
+    Writer(command).output_file(type, name)
+    return name
+
+
+def batch_output(command: Command):
+    """ 输出 command.day_start 到 command.day_end 每天的 list 和 match 文件,
+    每个 day 文件为进程池中的一个任务, 在一个进程中读取一次并输出 htm 和 excel
+    """
+    day = datetime.strptime(command.day_start, "%Y-%m-%d")
+    day_end = datetime.strptime(command.day_end, "%Y-%m-%d")
+    jobs = []
+    while day <= day_end:
+        day_command = copy(command)
+        day_command.day = day.strftime("%Y-%m-%d")
+        writer = Writer(day_command)
+        for type, name in writer.file_in.items():
+            if exists(writer.source(type, name)):
+                jobs.append((day_command, type, name))
+        day += timedelta(days=1)
+    print(f"batch output {len(jobs)} files, {command.day_start} - {command.day_end}")
+    with ProcessPoolExecutor(max_workers=command.workers) as pool:
+        futures = [pool.submit(_output_file, *job) for job in jobs]
+        for future in futures:
+            print(f"output {future.result()}")
 
 
 def get_list(line: str) -> list:
@@ -317,5 +480,8 @@ if __name__ == "__main__":
     command = Command(sys.argv)
     # argv = "-h -i mn -d 07-06".split(" ")
     # command = Command(argv)
-    writer = Writer(command)
-    writer.output()
+    if command.day_start:
+        batch_output(command)
+    else:
+        writer = Writer(command)
+        writer.output()
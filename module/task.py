@@ -1,15 +1,19 @@
 """
 
 """
+import re
 import traceback
-from io import TextIOWrapper
 
+from module.bid_archive import BID_ARCHIVE, BidArchive
+from module.bid_dedup import BID_DEDUP, BidDedup
+from module.bid_file import BID_FILE, BidFile
 from module.bid_proxy import Clash
+from module.bid_search import BID_SEARCH, BidSearch
 from module.bid_task import BidTask
 from module.config import CONFIG
 from module.exception import *
-from module.get_url import GetList, MAX_ERROR_OPEN
-from module.judge_content import titleTrie
+from module.get_url import GetList, MAX_ERROR_OPEN, init_cut
+from module import judge_content
 from module.log import logger
 from module.task_manager import RUN_TIME_START, TaskNode, TaskQueue
 from module.utils import *
@@ -63,84 +67,62 @@ class BidTaskQueue(TaskQueue):
 
 
 class DataFileTxt:
-    files_path = {
-        "list": None,
-        "match": None,
-        "daymatch": None,
-        "daylist": None
-    }
-    files = {
-        "list": None,
-        "match": None,
-        "daymatch": None,
-        "daylist": None
-    }
-    file_open = False
+    """ 数据文件写入, 所有任务共用 BID_FILE 的缓冲区和打开的文件,
+    BID_DEDUP 的去重记录, BID_SEARCH 的检索索引以及 BID_ARCHIVE 的归档
+    """
+    bid_file: BidFile
+    bid_dedup: BidDedup
+    bid_search: BidSearch
+    bid_archive: BidArchive
 
     def __init__(self, name):
-        self.data_file_open()
         self.name = name
+        self.bid_file = BID_FILE
+        self.bid_dedup = BID_DEDUP
+        self.bid_search = BID_SEARCH
+        self.bid_archive = BID_ARCHIVE
 
-    def data_file_init(self):
-        for k in self.files_path.keys():
-            if "day" in k:  # dayList.txt or dayMatch.txt
-                self.files_path[k] = f"{CONFIG.DATA_FOLDER}/bid_{k}_{date_days(format='day')}.txt"
-            else:
-                self.files_path[k] = f"{CONFIG.DATA_FOLDER}/bid_{k}_{self.name}.txt"
-
-        create_folder(self.files_path["list"])
-        log = ""
-        for k, v in self.files_path.items():
-            log += f"{k}: {v}\n{' '*26}"
-        logger.info(log.strip())
-
-    def data_file_open(self):
-        if not self.file_open:
-            self.data_file_init()
-            for k, v in self.files_path.items():
-                self.files[k] = open(v, "a", encoding="utf-8")
-            # 写入运行时间
-            self.file_open = True
-            self.write_all(f"{self.name} start at {date_now_s()}\n")
-        logger.info(f"{self.name}.file_open={self.file_open}")
-
-    def data_file_exit(self):
-        if self.file_open:
-            for v in self.files.values():
-                v: TextIOWrapper
-                v.close()
-            self.file_open = False
-        logger.info(f"{self.name}.file_open={self.file_open}")
+    def is_new_bid(self, bid_info: BidObj) -> bool:
+        """ 项目url第一次出现时返回True, 已写入过的项目不再写入和匹配
+        """
+        return self.bid_dedup.is_new(bid_info.url, bid_info.date)
 
     def write_match(self, data):
-        if self.file_open:
-            self._write("match", data)
+        self.bid_file.write(self.name, "match", data)
 
     def write_list(self, data):
-        if self.file_open:
-            self._write("list", data)
-
-    def _write(self, files, data):
-        if not self.file_open:
-            self.data_file_open()
-        if "\n" in data:
-            data = data.replace("\n", "")
-        if data[-1] != "\n":
-            data = f"{data}\n"
-        for k, v in self.files.items():
-            if files in k:
-                v: TextIOWrapper
-                v.write(data)
+        self.bid_file.write(self.name, "list", data)
+
+    def write_bid(self, category, bid_info: BidObj, data, match: list = None):
+        """ 写入 bid_list 和记录文件, 加入检索索引和归档
+        """
+        self.write_list(data)
+        self.bid_file.write_record(self.name, category, bid_info, match)
+        self.bid_search.add(self.name, category, bid_info)
+        self.bid_archive.add(self.name, category, bid_info, match)
+
+    def write_bids(self, category, bids: list, matches: list):
+        """ 一起写入一页中的多个项目, 与逐个调用 write_bid 相同
+        Args:
+            bids (list): [BidObj, ...]
+            matches (list): 每个项目的匹配词
+        """
+        self.bid_file.write_lines(self.name, "list", [bid.message() for bid in bids])
+        self.bid_file.write_records(self.name, category, bids, matches)
+        for bid, match in zip(bids, matches):
+            self.bid_search.add(self.name, category, bid)
+            self.bid_archive.add(self.name, category, bid, match)
 
     def write_all(self, data):
         self.write_match(data)
         self.write_list(data)
 
     def flush(self):
-        if self.file_open:
-            for fi in self.files.values():
-                fi: TextIOWrapper
-                fi.flush()
+        """ 先写入文件再提交去重记录, 保证记录过的项目一定已写入文件
+        """
+        self.bid_file.flush()
+        self.bid_search.commit()
+        self.bid_dedup.commit()
 
 
 class Task(DataFileTxt, BidTag, Bid, GetList):
@@ -170,8 +152,8 @@ class Task(DataFileTxt, BidTag, Bid, GetList):
         self.complete_delay = deep_get(config, "completeDelay") or COMPLETE_DELAY
         delay = deep_get(config, "nextOpenDelay")
         self.delay = tuple(int(t) for t in delay.split(",")) if delay else NEXT_OPEN_DELAY
-        self.bid_task_queue = BidTaskQueue()
         self.clash = Clash(CONFIG.config) if deep_get(config, "clash") else None
+        self.rules_version = CONFIG.rules_version.get(self.name, 0)
 
     def get_next_pages_url(self, list_url="", next_rule=None, **kwargs) -> str:
         """
@@ -227,7 +209,6 @@ class Task(DataFileTxt, BidTag, Bid, GetList):
 
 
         self.process_tag_list(self.tag_list)
-        self.flush()  # 刷新缓冲区写入文件
 
         if not self.match_num:
             logger.info("no match")
@@ -240,46 +221,52 @@ class Task(DataFileTxt, BidTag, Bid, GetList):
         self.pages = self.next_rule.search(self.list_url).group()
         return self.pages
 
-    def tag_filterate(self):
+    def tag_filterate(self, bid_info: BidObj = None):
         return True
 
     def process_tag_list(self, tag_list: list):
-        """ 遍历处理 tag_list
+        """ 按页处理 tag_list:
+        1. 解析所有 tag
+        2. 由 BidTask.judge_page 一次得到开始和结束的位置
+        3. 去重后一起匹配关键词并写入
         若能遍历到结尾,保存 interruptUrl 和 interrupt
         """
         logger.hr("BidTask.process_tag_list", 3)
-        idx = 0
         if not tag_list:
             logger.info("tag list is []")
             self.bid_task.complete()
             return
-        for idx, tag in enumerate(tag_list):
-            # bid对象接收bid_tag解析结果
-            if not self._parse_tag(tag, idx):
-                continue
-
-            if self.bid_task.bid_judge(self.bid_info, idx):
-                break
-
-            if not self.bid_task.start:  # interrupt状态时判断项目是否开始记录
-                self.bid_task.bid_is_start(self.bid_info)
-                continue
-
-            if self.tag_filterate():
-                self.write_list(f"{self.message()}\n")  # 写入文件
-                self._title_trie_search()  # 使用title trie 查找关键词
-  
+        bids = self.parse_tag_list(tag_list)
+        start, end = self.bid_task.judge_page(bids)
+        new = [bid for _, bid in bids[start: end] if self.tag_filterate(bid) and self.is_new_bid(bid)]
+        if new:
+            self.write_bids(self.bid_task.name, new, self._title_trie_search(new))
+
+        if end < len(bids):
+            idx, self.bid_info = bids[end]
+        else:
+            idx = len(tag_list) - 1
+            if bids:
+                self.bid_info = bids[-1][1]
         logger.info(f"tag stop at {idx + 1}, tag counting from 1")
         self.bid_task.set_interrupt(self.bid_info)  # 设置每次最后一个为interrupt
         self.bid_task.set_interrupt_url(self.list_url)
         self.bid_task.print_interrupt()
 
+    def parse_tag_list(self, tag_list: list) -> list:
+        """ 解析一页的所有 tag, 返回 [(tag 序号, BidObj), ...], 解析失败的 tag 跳过
+        """
+        bids = []
+        for idx, tag in enumerate(tag_list):
+            if self._parse_tag(tag, idx):
+                bids.append((idx, self.bid_info))
+        return bids
+
     def _parse_tag(self, tag: Tag or dict, idx):
         """ 由BidTag.get 读取一个项目项目节点, Bid 接收并对信息进行处理
         Save:
             tag_info(list): 
-            bid_info(dict): 
-            info_list(list): 
+            bid_info(BidObj): 
         """
         err_flag = False
         try:
@@ -308,15 +295,18 @@ class Task(DataFileTxt, BidTag, Bid, GetList):
             return False
         return True
 
-    def _title_trie_search(self):
-        """ 判断招标标题信息
+    def _title_trie_search(self, bids: list) -> list:
+        """ 判断一页招标项目的标题, 返回每个项目匹配到的关键词, 匹配的项目一起写入 match 文件
         """
-        result: list = titleTrie.search_all(self.bid_info["name"])
-        if result:
-            result = f"[{','.join(result)}]; {self.message()}"
-            logger.info(result)
-            self.write_match(result)
-            self.match_num += 1
+        match = judge_content.titleTrie.match
+        results = [match(bid.name) for bid in bids]
+        messages = [f"[{','.join(result)}]; {bid.message()}"
+                    for bid, result in zip(bids, results) if result]
+        for message in messages:
+            logger.info(message)
+        self.bid_file.write_lines(self.name, "match", messages)
+        self.match_num += len(messages)
+        return results
 
     def _complete_bid_task(self):
         self.bid_task.set_task("interruptBid.url", "")
@@ -329,8 +319,47 @@ class Task(DataFileTxt, BidTag, Bid, GetList):
             sleep_random(self.delay, message=" you can use 'Ctrl  C' stop now")
             if not result:
                 break
+            self.check_reload()
         logger.info(f"{self.name} {self.bid_task.name} is complete")
 
+    def check_reload(self):
+        """ 在两页之间检查 bid_settings.json 和 title_trie.json 的修改, HotReload.Switch 关闭时不检查
+        """
+        if not CONFIG.hot_reload:
+            return
+        CONFIG.check_reload()
+        version = CONFIG.rules_version.get(self.name, 0)
+        if version != self.rules_version:
+            self.rules_version = version
+            try:
+                self.reload_rules(CONFIG.get_(self.name))
+            except (re.error, KeyError, TypeError, ValueError) as e:
+                # 规则有错误时继续使用之前的规则
+                logger.error(f"{self.name} rules version {version} error: {e}")
+        judge_content.reload_title_trie()
+
+    def reload_rules(self, config: dict):
+        """ 重新编译网站规则, 全部编译成功后再替换, 出错时不修改当前的规则
+        """
+        tag_get = {key: self.TagGet(key, config["BidTag"][key])
+                   for key in ("name", "date", "url", "type")}
+        bid_cut = {k: init_re(v) for k, v in config["Bid"]["re"].items()}
+        html_cut_rule = init_cut(deep_get(config, "OpenConfig.html_cut"))
+        next_rule = init_re(config["task"]["next_pages"])
+        delay = deep_get(config, "task.nextOpenDelay")
+        delay = tuple(int(t) for t in delay.split(",")) if delay else NEXT_OPEN_DELAY
+
+        self.tag_rules, self.tag_get = config["BidTag"], tag_get
+        self.url_root, self.bid_cut = config["Bid"]["urlRoot"], bid_cut
+        self.init_bid_handlers()
+        self.html_cut_rule = html_cut_rule
+        self.li_tag = config["OpenConfig"]["li_tag"]
+        self.next_rule = next_rule
+        self.error_delay = deep_get(config, "task.errorDelay") or ERROR_DELAY
+        self.complete_delay = deep_get(config, "task.completeDelay") or COMPLETE_DELAY
+        self.delay = delay
+        logger.info(f"{self.name} rules reloaded, version {CONFIG.rules_version.get(self.name, 0)}")
+
     def run_bid_task(self, name) -> datetime:
         self.list_url = None
         self.bid_task = BidTask(name)
@@ -348,8 +377,21 @@ class Task(DataFileTxt, BidTag, Bid, GetList):
             return str2time(RUN_TIME_START)
         return datetime.now() + get_time_add(time_add)
 
+    def refresh(self):
+        """ Task 实例在多次运行之间复用, 每次运行前从 CONFIG 刷新运行状态,
+        编译好的规则, session 和数据文件保持不变
+        """
+        self.error = False
+        self.bid_tag_error = 0
+        self.match_num = 0
+        self.list_url = None
+        self.bid_task_queue = BidTaskQueue()
+        # 写入运行时间
+        self.write_all(f"{self.name} start at {date_now_s()}\n")
+
     def run(self, restart=False) -> datetime:
         logger.hr(f"{self.name} run")
+        self.refresh()
         if restart:
             self.bid_task_queue.restart()
         while 1:
@@ -369,13 +411,22 @@ class Task(DataFileTxt, BidTag, Bid, GetList):
             bid_task.set_time(nextRunTime)
             CONFIG.save()
             self.bid_task_queue.insert(bid_task)
-        self.close()
+        self.run_end()
         if not self.error:
             reset_task(CONFIG.record, self.name, time=time2str(self.bid_task_queue.head.nextRunTime))
         return self.bid_task_queue.first_runtime(), self.error
 
+    def run_end(self):
+        """ 每次 run 结束时调用, 将缓冲区写入文件和归档, session 保留到下次运行
+        """
+        self.flush()
+        self.bid_archive.flush()
+        logger.info(judge_content.titleTrie.cache_info())
+
     def close(self):
-        self.data_file_exit()
+        """ 退出程序时调用, 关闭 session, 数据文件由 BID_FILE.close 关闭
+        """
+        self.flush()
         self.request._session.close()
 
 
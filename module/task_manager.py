@@ -7,14 +7,22 @@
 """
 from datetime import datetime
 from importlib import import_module
-from os.path import exists
+from os import listdir
 
+from module.bid_archive import BID_ARCHIVE
+from module.bid_dedup import BID_DEDUP
+from module.bid_file import BID_FILE
+from module.bid_search import BID_SEARCH
 from module.config import CONFIG
+from module.error_snapshot import ERROR_SNAPSHOT
 from module.exception import *
 from module.log import logger
 from module.utils import *
 from module.lineAddLiTag import Writer
 
+WEB_CLASS = {}  # {name: Task子类}, 由 import_web_module 在启动时填充一次
+TASK_CACHE = {}  # {name: Task}, 长期保存的任务实例, 在各次运行之间复用
+
 
 class TaskNode:
     # 仅保存下次运行时间和任务名
@@ -129,6 +137,12 @@ class TaskManager(TaskQueue):
     def exit(self):
         """关闭任务中占用的文件,保存settings"""
         logger.hr("TaskManager.exit")
+        close_all_task()
+        BID_FILE.close()
+        BID_ARCHIVE.flush()
+        BID_DEDUP.close()
+        BID_SEARCH.close()
+        ERROR_SNAPSHOT.close()
         CONFIG.save()
 
     def loop(self):
@@ -206,15 +220,33 @@ class TaskManager(TaskQueue):
 
 
 def task_init(task: TaskNode):
+    """ 返回任务实例, 每个任务只创建一次, 之后的运行复用该实例
+    编译好的规则, session 和打开的数据文件在各次运行之间保留, 运行状态在 Task.run 中从 CONFIG 刷新
+    """
     CONFIG.task = task.name
     name = task.name
-    if exists(f"./module/web/{name}.py"):
-        mod = import_module(f"module.web.{name}")
-    else:
-        from module.task import Task
-        return Task(name, CONFIG.task)
-    logger.hr(f"task {name}", 1)
-    return getattr(mod, name.title())(name, CONFIG.task)
+    if name not in TASK_CACHE:
+        logger.hr(f"task {name}", 1)
+        TASK_CACHE[name] = get_task_class(name)(name, CONFIG.task)
+    return TASK_CACHE[name]
+
+
+def get_task_class(name):
+    """ 从 WEB_CLASS 中查找任务类, module/web 中没有对应网站时使用 Task
+    """
+    if not WEB_CLASS:
+        import_web_module()
+    if name in WEB_CLASS:
+        return WEB_CLASS[name]
+    from module.task import Task
+    return Task
+
+
+def close_all_task():
+    for name, task in TASK_CACHE.items():
+        logger.info(f"close task {name}")
+        task.close()
+    TASK_CACHE.clear()
 
 
 def during_runtime(time: datetime) -> datetime or None:
@@ -247,10 +279,18 @@ def queue_restart(queue: TaskQueue):
 
 
 def import_web_module():
-    from os import listdir
+    """ 导入 module/web 下所有网站模块, 将 name.title() 对应的类保存到 WEB_CLASS
+    """
+    from module.task import Task
     for module in listdir("./module/web"):
-        if module.endswith(".py"):
-            import_module(f"module.web.{module[:-3]}")
+        if not module.endswith(".py"):
+            continue
+        name = module[:-3]
+        mod = import_module(f"module.web.{name}")
+        cls = getattr(mod, name.title(), None)
+        if isinstance(cls, type) and issubclass(cls, Task):
+            WEB_CLASS[name] = cls
+    logger.info(f"web class: {list(WEB_CLASS)}")
 
 
 def compare_nextRunTime(queue: TaskQueue, task_insert: TaskNode):
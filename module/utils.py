@@ -7,6 +7,7 @@ import os
 import re
 import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from random import uniform
 from urllib.parse import unquote
 
@@ -53,6 +54,47 @@ def deep_get(d: dict, keys: list or str, default=None):
     return deep_get(d.get(keys[0]), keys[1:], default)
 
 
+class KeyPath:
+    """ 预先分割好的 "a.b.c" 路径, 与 deep_get / deep_set 的结果相同,
+    不需要每次调用都分割字符串并递归, 由 key_path 创建并缓存
+        key_path("zzlh.公告.state").get(record)
+        key_path("zzlh.公告.state").set(record, "complete")
+    """
+    __slots__ = ("keys", "parents", "last")
+
+    def __init__(self, keys: str or tuple):
+        self.keys = tuple(keys.split(".")) if isinstance(keys, str) else tuple(keys)
+        self.parents = self.keys[:-1]
+        self.last = self.keys[-1]
+
+    def __repr__(self):
+        return f"KeyPath({'.'.join(self.keys)!r})"
+
+    def get(self, d, default=None):
+        try:
+            for key in self.keys:
+                d = d[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        return default if d is None else d
+
+    def set(self, d: dict, value) -> dict:
+        """ 中间的键不存在或不是 dict 时创建新的 dict """
+        node = d
+        for key in self.parents:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        node[self.last] = value
+        return d
+
+
+@lru_cache(maxsize=4096)
+def key_path(keys: str) -> KeyPath:
+    return KeyPath(keys)
+
+
 def save_json(data, json_file, indent=2, logger=None):
     """ 覆写json文件
     Args:
@@ -97,6 +139,31 @@ def save_file(file, data, mode="w", bytes=False):
             f.write(str(data))
 
 
+class FileWatcher:
+    """ 按修改时间检查文件是否变化, interval 秒内只检查一次, 用于在运行中重新读取配置
+    """
+    def __init__(self, files: list, interval=5):
+        self.files = files
+        self.interval = interval
+        self.check_time = time.time()
+        self.mtime = self._mtime()
+
+    def _mtime(self) -> tuple:
+        return tuple(os.stat(f).st_mtime_ns if os.path.exists(f) else 0 for f in self.files)
+
+    def changed(self) -> bool:
+        """ 距上次检查超过 interval 且文件修改时间变化时返回 True """
+        now = time.time()
+        if now - self.check_time < self.interval:
+            return False
+        self.check_time = now
+        return self._mtime() != self.mtime
+
+    def update(self):
+        """ 读取或写入文件后记录当前的修改时间 """
+        self.mtime = self._mtime()
+
+
 # time
 RUN_TIME_START = "2023-01-01 00:00:00"  # 默认下次运行时间
 _DATE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
@@ -178,6 +245,33 @@ def sleep_random(time_range: tuple = (2, 3), message: str = None):
     print("sleep end")
 
 
+DAY_SECONDS = 86400
+# 2023-07-06, 2023.07.06, 2023/7/6, 2023年07月06日, 可以带有 08:30 或 08:30:00
+_DATE_PATTERN = re.compile(r"(\d{4})\D(\d{1,2})\D(\d{1,2})\D*(?:(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?)?")
+
+
+@lru_cache(maxsize=4096)
+def date_key(date: str) -> int:
+    """ 日期字符串转换为秒数, 可以直接比较先后, 同一页中相同的日期只解析一次
+    没有时间时为当天 00:00:00
+    Raises:
+        ValueError: 无法识别的日期
+    """
+    if len(date) in (10, 19) and date[4] == "-" and date[7] == "-":  # %Y-%m-%d [%H:%M:%S]
+        try:
+            key = datetime(int(date[:4]), int(date[5:7]), int(date[8:10])).toordinal() * DAY_SECONDS
+            if len(date) == 10:
+                return key
+            return key + int(date[11:13]) * 3600 + int(date[14:16]) * 60 + int(date[17:19])
+        except ValueError:
+            pass
+    match = _DATE_PATTERN.match(date.strip())
+    if not match:
+        raise ValueError(f"unknown date: {date!r}")
+    year, month, day, hour, minute, second = (int(v or 0) for v in match.groups())
+    return datetime(year, month, day).toordinal() * DAY_SECONDS + hour * 3600 + minute * 60 + second
+
+
 def time_difference(time1, time2, unit="second"):
     """获得时间差,单位为秒,返回 time1 - time2
     Args:
@@ -336,6 +430,64 @@ def cookie_str_to_dict(cookies: str):
     return cookie_dict
 
 
+# title
+ZERO_WIDTH = "\u200b\u200c\u200d\u2060\ufeff\u00ad"  # 零宽字符和软连字符
+PUNCTUATION = {
+    "【": "[", "】": "]", "〔": "(", "〕": ")", "〖": "[", "〗": "]",
+    "“": '"', "”": '"', "‘": "'", "’": "'",
+    "—": "-", "–": "-", "―": "-", "‐": "-",
+}
+
+
+def _title_table(upper=False) -> dict:
+    """ 标题的转换表, 每个字符最多转换为一个字符
+    全角 ASCII 转为半角, 全角空格和换行等转为空格, 删除零宽字符, 统一各种括号, 引号和横线
+    Args:
+        upper (bool): 同时将小写字母转为大写, 用于关键词匹配
+    """
+    table = {code: chr(code - 0xFEE0) for code in range(0xFF01, 0xFF5F)}  # ！-～
+    table[0x3000] = " "
+    for c in "\t\r\n\xa0":
+        table[ord(c)] = " "
+    for c in ZERO_WIDTH:
+        table[ord(c)] = None
+    for c, r in PUNCTUATION.items():
+        table[ord(c)] = r
+    if upper:
+        for code, c in list(table.items()):
+            if c and "a" <= c <= "z":
+                table[code] = c.upper()
+        for code in range(ord("a"), ord("z") + 1):
+            table[code] = chr(code).upper()
+    return table
+
+
+NAME_TABLE = _title_table()
+MATCH_TABLE = _title_table(upper=True)
+
+
+def normalize_name(name: str) -> str:
+    """ 保存的项目标题, 连续的空白合并为一个空格 """
+    return " ".join(name.translate(NAME_TABLE).split())
+
+
+def normalize_match(title: str) -> str:
+    """ 用于关键词匹配的标题, 在 normalize_name 的基础上转为大写, 不合并空格 """
+    return title.translate(MATCH_TABLE)
+
+
+def normalize_offset(title: str) -> tuple:
+    """ normalize_match 的结果和每个字符在原标题中的位置, 用于高亮匹配到的关键词
+    Returns:
+        text (str): normalize_match(title)
+        offset (list): text[i] 对应 title[offset[i]]
+    """
+    text = title.translate(MATCH_TABLE)
+    if len(text) == len(title):
+        return text, list(range(len(title)))
+    return text, [idx for idx, c in enumerate(title) if MATCH_TABLE.get(ord(c), c) is not None]
+
+
 if __name__ == "__main__":
     # 本模块测试
     # test code
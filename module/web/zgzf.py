@@ -43,9 +43,9 @@ class Zgzf(Task):
                 del(self.cookies[k])
 
     # Task
-    def close(self):
+    def run_end(self):
         self._delete_cookies()
-        super().close()
+        super().run_end()
         if self.clash:
             self.clash.switch_proxy()
 
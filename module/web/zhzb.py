@@ -1,6 +1,7 @@
 
 from module.task import Task
 from module.log import logger
+from module.utils import normalize_name
 
 
 class Zhzb(Task):
@@ -19,7 +20,7 @@ class Zhzb(Task):
         return self.list_url["form"]["page"]
     
     def get_name(self, name:str):
-        return name.replace("\\\"", "")
+        return normalize_name(name.replace("\\\"", ""))
 
     @property
     def _referer(self):
@@ -17,15 +17,47 @@ INDEX_RULE = 1
 ATTR_RULE = 2
 
 
+BID_KEYS = ("name", "date", "url", "type")
+
+
 class BidObj:
-    _name = None
-    _date = None
-    _url = None
-    def __init__(self, message) -> None:
-        if isinstance(message, (list, tuple)):
-            self._name, self._date, self._url = message
-        elif isinstance(message, dict):
-            pass
+    """ 一个招标项目, 代替每个项目新建的 bid_info dict 和 info_list
+    可以像之前的 bid_info 一样用 bid["name"] 读取, 也可以用 bid.name
+    """
+    __slots__ = BID_KEYS
+
+    # bid["name"] 直接使用 object.__getattribute__, 不经过 python 函数
+    __getitem__ = object.__getattribute__
+
+    def __init__(self, name="", date="", url="", type="None"):
+        self.name = name
+        self.date = date
+        self.url = url
+        self.type = type
+
+    def __repr__(self):
+        return f"BidObj{self.values()}"
+
+    def __eq__(self, other):
+        if isinstance(other, BidObj):
+            return self.values() == other.values()
+        return NotImplemented
+
+    def keys(self) -> tuple:
+        return BID_KEYS
+
+    def values(self) -> tuple:
+        return self.name, self.date, self.url, self.type
+
+    def items(self):
+        return zip(BID_KEYS, self.values())
+
+    def to_dict(self, keys=BID_KEYS) -> dict:
+        return {key: getattr(self, key) for key in keys}
+
+    def message(self) -> str:
+        # type 可能是 None
+        return f"{self.name}; {self.date}; {self.url}; {self.type}"
 
 
 def tag_get(tag: Tag, rule, *args) -> Tag or None:
@@ -177,9 +209,9 @@ class BidTag:
 class Bid:
     # 解析后的bid信息
     # Bid: 用于 module.web 中的继承，保存一个网页列表中招标项目的最终信息
-    bid_info: dict = None
+    bid_info: BidObj = None
     url_root: str
-    info_list: list = None
+    bid_handlers: tuple  # 每个字段的 (正则, get_xxx)
     get_bid_now: str
 
     def __init__(self, config: dict = None):
@@ -190,25 +222,36 @@ class Bid:
         for k, v in config["re"].items():
             self.bid_cut[k] = init_re(v)
             logger.debug(f"rule init {k}: {self.bid_cut[k]}")
+        self.init_bid_handlers()
 
-    def get_bid_info(self, *args):
+    def init_bid_handlers(self):
+        """ 预先取得每个字段的正则和 get_xxx 方法, bid_cut 修改后需要重新调用
+        """
+        handlers = []
+        for key in BID_KEYS:
+            rule = self.bid_cut.get(key)
+            if rule is not None and not rule.pattern:
+                rule = None
+            handlers.append((key, rule, getattr(self, f"get_{key}")))
+        self.bid_handlers = tuple(handlers)
+
+    def get_bid_info(self, *args) -> BidObj:
         """ 接收BidTag.get()返回的list
         Args:
             *args: [name, date, url, type]
         """
-        self.bid_info = {}
         if args and  isinstance(args[0], Tag):
             args = self.get_tag_info(args[0])
-        for idx, key in enumerate(("name", "date", "url", "type")):
+        if len(args) != len(self.bid_handlers):  # zip 会忽略多出的字段
+            raise ValueError(f"get_bid_info need {len(self.bid_handlers)} fields, got {len(args)}: {args}")
+        fields = []
+        for data, (key, rule, fun) in zip(args, self.bid_handlers):
             self.get_bid_now = key
-            re = deep_get(self.bid_cut, key)
-            data = _re_get_str(args[idx], re)
-            fun = getattr(self, f"get_{key}")
-            data: str = fun(data)
-            self.bid_info[key] = data.replace("\n", "")
-
-        self.info_list = [*self.bid_info.values()]
-        return self.info_list
+            if rule is not None:
+                data = rule.search(data).group()
+            fields.append(fun(data).replace("\n", ""))
+        self.bid_info = BidObj(*fields)
+        return self.bid_info
 
     def get_url(self, url):
         """ 用 前缀加上后缀得到网址
@@ -223,7 +266,7 @@ class Bid:
         return f"{self.url_root}{url}"
 
     def get_name(self, name):
-        return name
+        return normalize_name(name)
 
     def get_type(self, type):
         if type in ["", " ", None]:
@@ -234,26 +277,7 @@ class Bid:
         return date.replace("年", "-").replace("月", "-").replace("日", "")
 
     def message(self) -> str:
-        # info_list 的最后一位可能是 None
-        return f"{'; '.join(self.info_list[:-1])}; {str(self.info_list[-1])}"
-
-
-def _re_get_str(obj: str, rule: re.Pattern = None, cut_rule=None):
-    """ 正则获取字符串
-
-    Args:
-        obj: 被匹配的字符
-        rule: 编译好的正则
-        cut_rule: 正则表达式, 仅在测试中使用
-    Returns:
-        (str): 返回re.search搜索结果
-    """
-    # 默认正则参数 (4)(数字)+(_,-,年)+(2)(数字)+(_,-,月)+(2)(数字)+(日),日可忽略
-    if rule is None or rule.pattern == "":
-        return obj
-    if isinstance(cut_rule, str):
-        return re.search(cut_rule, obj).group()
-    return rule.search(obj).group()
+        return self.bid_info.message()
 
 
 # class BidHtml(ReqOpen):
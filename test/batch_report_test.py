@@ -0,0 +1,56 @@
+"""
+批量输出测试
+在临时文件夹中生成几天的 day 文件, 用 batch_output (-b 开始 结束 -w 进程数) 并行输出,
+检查每个存在的 day 文件都输出了 htm 和 excel, 缺少的日期跳过, 结果与逐个输出相同
+在仓库根目录运行: PYTHONPATH=. python test/batch_report_test.py
+"""
+import os
+import tempfile
+import time
+
+from module import lineAddLiTag
+from module.lineAddLiTag import Command, Writer, batch_output
+
+DAYS = ["2023-07-01", "2023-07-02", "2023-07-04"]  # 缺少 07-03
+ROWS = 2000
+
+
+def write_days(folder: str):
+    for day in DAYS:
+        lines = ["zzlh start at 09:00:00"] + \
+                [f"项目{i}; {day}; https://a.com/{day}/{i}; 货物" for i in range(ROWS)]
+        with open(f"{folder}/bid_daylist_{day}.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        with open(f"{folder}/bid_daymatch_{day}.txt", "w", encoding="utf-8") as f:
+            f.write("zzlh start at 09:00:00\n" + f"[项目]; {lines[1]}\n")
+
+
+def read_htm(folder: str) -> dict:
+    result = {}
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".htm"):
+            with open(f"{folder}/{name}", "r", encoding="utf-8") as f:
+                result[name] = f.read()
+    return result
+
+
+def check(folder: str):
+    write_days(folder)
+    start = time.time()
+    batch_output(Command(["-b", DAYS[0], DAYS[-1], "-w", "2"]))
+    cost = time.time() - start
+    outputs = sorted(name for name in os.listdir(folder) if not name.endswith(".txt"))
+    assert outputs == sorted(f"bid_day{key}_{day}.{ext}" for day in DAYS
+                             for key in ("list", "match") for ext in ("htm", "xlsx")), outputs
+    batch = read_htm(folder)
+    # 与逐个输出的 htm 相同
+    for day in DAYS:
+        Writer(Command(["-h", "-d", day])).output()
+    assert read_htm(folder) == batch
+    print(f"batch output {len(DAYS) * 2} files with 2 workers: {cost:.2f} s, cpu count: {os.cpu_count()}")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        lineAddLiTag.DATAFOLDER = folder  # 子进程由 fork 创建时继承
+        check(folder)
@@ -0,0 +1,137 @@
+"""
+BidArchive 测试
+在临时文件夹中多次写入同一分区后读取, 检查分区文件的合并, 日期, 网站和匹配词的过滤,
+按行数和时间自动写入, 以及合并中断后的恢复
+在仓库根目录运行: PYTHONPATH=. python test/bid_archive_test.py
+"""
+import os
+import tempfile
+from glob import glob
+
+from module import bid_archive
+from module.bid_archive import COMPACT_MANIFEST, COMPACT_TEMP, BidArchive
+from module.utils import date_days
+
+TODAY = date_days(format="day")
+LAST_MONTH = "2023-06-30"
+
+
+def bid(i: int, date=TODAY) -> dict:
+    return {"name": f"项目{i}", "date": date, "url": f"https://a.com/{i}", "type": "货物"}
+
+
+def files(folder: str, month: str, site: str) -> list:
+    return glob(f"{folder}/month={month}/site={site}/*.parquet")
+
+
+def read(archive: BidArchive, *args, **kwargs) -> list:
+    rows = []
+    for batch in archive.read(*args, **kwargs):
+        rows += batch.to_pylist()
+    return rows
+
+
+def check(folder: str):
+    archive = BidArchive(folder, {"MaxFiles": 3})
+    # 本月的分区超过 MaxFiles 时合并
+    for i in range(4):
+        archive.add("zzlh", "货物", bid(i), ["项目"] if i % 2 else None)
+        archive.flush()
+        assert len(files(folder, TODAY[:7], "zzlh")) == (i + 1 if i < 3 else 1)
+    archive.add("zzlh", "货物", bid(4))
+    archive.add("qjc", "服务", bid(5))
+    archive.flush()
+    assert len(files(folder, TODAY[:7], "zzlh")) == 2
+    # 已结束的月份写入后立即合并
+    for i in range(6, 8):
+        archive.add("zzlh", "货物", bid(i, LAST_MONTH))
+        archive.flush()
+        assert len(files(folder, LAST_MONTH[:7], "zzlh")) == 1
+
+    rows = read(archive, TODAY, TODAY)
+    assert [r["name"] for r in rows if r["site"] == "zzlh"] == [f"项目{i}" for i in range(5)], rows
+    assert [r["site"] for r in rows].count("qjc") == 1
+    assert [r["name"] for r in read(archive, TODAY, TODAY, match_only=True)] == ["项目1", "项目3"]
+    assert [r["name"] for r in read(archive, TODAY, TODAY, site=["qjc"])] == ["项目5"]
+    assert [r["name"] for r in read(archive, "2023-06-01", LAST_MONTH)] == ["项目6", "项目7"]
+    assert not glob(f"{folder}/**/_compact.tmp", recursive=True)
+
+    archive.compact()
+    assert len(files(folder, TODAY[:7], "zzlh")) == 1
+    assert len(read(archive, "2023-06-01", TODAY)) == 8
+    file = os.path.join(folder, "archive.xlsx")
+    assert archive.to_excel(file, TODAY, TODAY) == 6 and os.path.exists(file)
+    print("write and read partition: ok")
+
+
+def check_buffer(folder: str):
+    archive = BidArchive(folder, {"BufferRows": 3, "FlushInterval": 60})
+    for i in range(3):
+        assert not files(folder, TODAY[:7], "zzlh")
+        archive.add("zzlh", "货物", bid(i))
+    assert len(files(folder, TODAY[:7], "zzlh")) == 1 and not archive.rows, "达到 BufferRows 时写入"
+    archive.add("zzlh", "货物", bid(3))
+    assert archive.row_count == 1
+    archive.flush_time -= 61
+    archive.add("zzlh", "货物", bid(4))
+    assert len(files(folder, TODAY[:7], "zzlh")) == 2 and not archive.rows, "超过 FlushInterval 时写入"
+    assert len(read(archive, TODAY, TODAY)) == 5
+    print("buffer rows and interval: ok")
+
+
+def crash_at(name: str, fun, *args, skip=""):
+    """ 使 os.replace 或 os.remove 抛出异常, 模拟合并时中断, 目标文件以 skip 结尾时正常执行 """
+    real = getattr(bid_archive.os, name)
+
+    def crash(*args):
+        if skip and args[-1].endswith(skip):
+            return real(*args)
+        raise KeyboardInterrupt
+
+    setattr(bid_archive.os, name, crash)
+    try:
+        fun(*args)
+    except KeyboardInterrupt:
+        pass
+    else:
+        raise AssertionError(f"{name} is not called")
+    finally:
+        setattr(bid_archive.os, name, real)
+
+
+def check_recover(folder: str):
+    archive = BidArchive(folder, {"MaxFiles": 100})
+    path = f"{folder}/month={TODAY[:7]}/site=zzlh"
+    for i in range(3):
+        archive.add("zzlh", "货物", bid(i))
+        archive.flush()
+    # 未写完的临时文件直接删除
+    with open(f"{path}/{COMPACT_TEMP}", "wb") as f:
+        f.write(b"PAR1")
+    assert len(read(archive, TODAY, TODAY)) == 3, "读取时忽略临时文件"
+    assert archive.compact_partition(path) == 3 and not os.path.exists(f"{path}/{COMPACT_TEMP}")
+    for i in range(3, 6):
+        archive.add("zzlh", "货物", bid(i))
+        archive.flush()
+    # 写入 _compact.json 后, 临时文件改名前中断: 读取前完成合并
+    crash_at("replace", archive.compact_partition, path, skip=COMPACT_MANIFEST)
+    assert os.path.exists(f"{path}/{COMPACT_MANIFEST}") and os.path.exists(f"{path}/{COMPACT_TEMP}")
+    assert [r["name"] for r in read(archive, TODAY, TODAY)] == [f"项目{i}" for i in range(6)]
+    assert len(files(folder, TODAY[:7], "zzlh")) == 1 and not os.path.exists(f"{path}/{COMPACT_MANIFEST}")
+    # 改名后, 删除原来的文件前中断: 不会读到重复的项目
+    for i in range(6, 8):
+        archive.add("zzlh", "货物", bid(i))
+        archive.flush()
+    crash_at("remove", archive.compact_partition, path)
+    assert len(files(folder, TODAY[:7], "zzlh")) == 3, "原来的文件还在"
+    assert [r["name"] for r in read(archive, TODAY, TODAY)] == [f"项目{i}" for i in range(8)]
+    assert len(files(folder, TODAY[:7], "zzlh")) == 1
+    assert not glob(f"{path}/_*")
+    print("recover interrupted compact: ok")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        check(os.path.join(folder, "check"))
+        check_buffer(os.path.join(folder, "buffer"))
+        check_recover(os.path.join(folder, "recover"))
@@ -0,0 +1,66 @@
+"""
+BidDedup 测试
+在临时文件夹中检查: 创建时不打开 sqlite, is_new 和 url 规范化, commit 后重新打开仍然去重, 过期记录被删除
+在仓库根目录运行: PYTHONPATH=. python test/bid_dedup_test.py
+"""
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from module.bid_dedup import BidDedup, normalize_url
+
+CONFIG = {"Capacity": 1000, "ErrorRate": 0.01, "KeepDays": 30}
+
+
+def day(days: int) -> str:
+    return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def check_lazy(file: str):
+    dedup = BidDedup(file, CONFIG)
+    assert dedup.db is None and not os.path.exists(file), "创建时不应打开 sqlite"
+    dedup.commit()
+    dedup.close()
+    assert not os.path.exists(file)
+    print("lazy open: ok")
+
+
+def check_is_new(file: str):
+    assert normalize_url("HTTPS://A.com/bid?b=2&a=1&c=#top") == normalize_url("http://a.com/bid?a=1&b=2")
+    dedup = BidDedup(file, CONFIG)
+    assert dedup.is_new("https://a.com/bid?a=1&b=2", day(0))
+    assert dedup.db is not None
+    assert not dedup.is_new("http://A.com/bid?b=2&a=1", day(0))
+    assert dedup.is_new("https://a.com/bid?a=2", day(0))
+    assert dedup.is_new("") and dedup.is_new(""), "空的 url 不去重"
+    assert dedup.is_new("https://a.com/old", day(40))
+    dedup.commit()
+    dedup.close()
+    print("is_new: ok")
+
+
+def check_reopen(file: str):
+    # 直接写入一条过期记录, 重新打开时删除
+    db = sqlite3.connect(file)
+    db.execute("INSERT INTO seen VALUES (?, ?)", (normalize_url("https://a.com/expired"), day(31)))
+    db.commit()
+    db.close()
+    dedup = BidDedup(file, CONFIG)
+    assert not dedup.is_new("https://a.com/bid?a=1&b=2"), "commit 后重新打开"
+    assert dedup.is_new("https://a.com/expired"), "过期记录应被删除"
+    assert dedup.is_new("https://a.com/old"), "项目日期超过 KeepDays"
+    dedup.close()
+    db = sqlite3.connect(file)
+    days = dict(db.execute("SELECT url, day FROM seen"))
+    db.close()
+    assert days[normalize_url("https://a.com/expired")] == day(0)
+    print("commit and expiry: ok")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        file = os.path.join(folder, "bid_dedup.db")
+        check_lazy(file)
+        check_is_new(file)
+        check_reopen(file)
@@ -0,0 +1,89 @@
+"""
+BidFile 测试
+在临时文件夹中检查缓冲区按行数和时间写入, 多行中的换行符, 以及经过 day_end 时切换 day 文件和记录文件,
+CONFIG.save 之前写入 BID_FILE 的缓冲区
+在仓库根目录运行: PYTHONPATH=. python test/bid_file_test.py
+"""
+import os
+import tempfile
+from datetime import datetime
+
+from module.bid_file import BID_FILE, BidFile
+from module.bid_record import BidRecordReader
+from module.config import CONFIG
+from module.web_brows import BidObj
+
+DAY = datetime(2023, 7, 6, 23, 0, 0).timestamp()
+
+
+def read(file: str) -> list:
+    if not os.path.exists(file):
+        return []
+    with open(file, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def check_buffer(folder: str):
+    bid_file = BidFile(folder, {"BufferLines": 3, "FlushInterval": 60, "Record": False})
+    site_file = f"{folder}/bid_list_zzlh.txt"
+    day_file = f"{folder}/bid_daylist_2023-07-06.txt"
+    bid_file.flush_time = DAY - 1
+    bid_file.write("zzlh", "list", "第一行\n", DAY)
+    bid_file.write_lines("zzlh", "list", ["第二行"], DAY)
+    assert read(site_file) == [] and bid_file.buffer_len == 2, "未达到 BufferLines 时不写入"
+    bid_file.write_lines("zzlh", "list", ["第三行", ""], DAY)
+    assert read(site_file) == read(day_file) == ["第一行", "第二行", "第三行", ""]
+    assert bid_file.buffer_len == 0
+    # 超过 FlushInterval 时写入
+    bid_file.write("zzlh", "match", "[耳机]; 匹配", DAY)
+    assert read(f"{folder}/bid_match_zzlh.txt") == []
+    bid_file.write("zzlh", "match", "[耳机]; 匹配2", DAY + 61)
+    assert read(f"{folder}/bid_daymatch_2023-07-06.txt") == ["[耳机]; 匹配", "[耳机]; 匹配2"]
+    bid_file.close()
+    assert not bid_file.files
+    print("buffer: ok")
+
+
+def check_day_change(folder: str):
+    bid_file = BidFile(folder, {"BufferLines": 100, "FlushInterval": 86400, "Record": True})
+    bid = BidObj("降噪耳机", "2023-07-06", "https://a.com/1", "货物")
+    bid_file.write("qjc", "list", "7月6日", DAY)
+    bid_file.write_record("qjc", "货物", bid, ["耳机"], DAY)
+    assert bid_file.day == "2023-07-06" and bid_file.day_end == datetime(2023, 7, 7).timestamp()
+    # 经过 day_end 后先写入旧日期的缓冲区, 再切换 day 文件
+    day_end = bid_file.day_end
+    bid_file.write("qjc", "list", "7月7日", day_end)
+    bid_file.write_records("qjc", "货物", [bid, bid], [[], ["耳机"]], day_end + 1)
+    assert read(f"{folder}/bid_daylist_2023-07-06.txt") == ["7月6日"]
+    assert read(f"{folder}/bid_daylist_2023-07-07.txt") == [], "新的一天仍在缓冲区中"
+    assert f"{folder}/bid_daylist_2023-07-06.txt" not in bid_file.files, "旧的 day 文件已关闭"
+    bid_file.close()
+    assert read(f"{folder}/bid_daylist_2023-07-07.txt") == ["7月7日"]
+    assert read(f"{folder}/bid_list_qjc.txt") == ["7月6日", "7月7日"]
+    with BidRecordReader(f"{folder}/bid_dayrecord_2023-07-06.bin") as reader:
+        assert [(r.name, r.match) for r in reader] == [("降噪耳机", "耳机")]
+    with BidRecordReader(f"{folder}/bid_dayrecord_2023-07-07.bin") as reader:
+        assert [r.match for r in reader] == ["", "耳机"]
+    print("day change: ok")
+
+
+def check_save_hook(folder: str):
+    BID_FILE.folder = folder
+    BID_FILE.write("zzlh", "list", "保存状态之前写入", DAY)
+    BID_FILE.write_record("zzlh", "货物", BidObj("降噪耳机", "2023-07-06", "https://a.com/1", "货物"), now=DAY)
+    assert read(f"{folder}/bid_list_zzlh.txt") == []
+    CONFIG.hot_reload = False
+    CONFIG.record_file = f"{folder}/bid_settings.json"
+    CONFIG.save()
+    assert read(f"{folder}/bid_list_zzlh.txt") == ["保存状态之前写入"]
+    with BidRecordReader(f"{folder}/bid_dayrecord_2023-07-06.bin") as reader:
+        assert [r.name for r in reader] == ["降噪耳机"]
+    BID_FILE.close()
+    print("save hook: ok")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        check_buffer(os.path.join(folder, "buffer"))
+        check_day_change(os.path.join(folder, "day"))
+        check_save_hook(os.path.join(folder, "save"))
@@ -0,0 +1,79 @@
+"""
+BidObj 速度测试
+比较原来的 Bid.get_bid_info (每个项目新建 dict 和 list, 每个字段 getattr 和 deep_get)
+和使用 BidObj 与预先取得的 bid_handlers 的 get_bid_info
+每个项目: 解析 -> 判断是否与 stopBid 相同 -> 读取 url 和 date 去重 -> message
+使用生成的 10000 个项目
+在仓库根目录运行: PYTHONPATH=. python test/bid_obj_test.py
+"""
+import time
+from random import choice, randint, seed
+
+from module.utils import deep_get
+from module.web_brows import Bid
+
+ROWS = 10000
+REPEAT = 10
+CONFIG = {"Bid": {"urlRoot": "http://www.365trade.com.cn", "re": {"date": "\\d{4}-\\d{2}-\\d{2}"}}}
+WORDS = "哈尔滨音乐学院食堂大宗食品面板采购项目二次招标公告降噪耳机语音识别显示屏设备维修服务"
+STOP = {"name": "", "date": "2023-07-01", "url": "http://www.365trade.com.cn/zbgg/0.jhtml"}
+
+
+def make_rows(rows=ROWS) -> list:
+    seed(0)
+    return [["".join(choice(WORDS) for _ in range(randint(12, 40))), f"[2023-07-0{i % 9 + 1}]",
+             f"/zbgg/{i + 1}.jhtml", "货物"] for i in range(rows)]
+
+
+class BidDict(Bid):
+    """ 旧实现: bid_info 为 dict, info_list 为 list """
+    def get_bid_info(self, *args):
+        self.bid_info = {}
+        for idx, key in enumerate(("name", "date", "url", "type")):
+            self.get_bid_now = key
+            re = deep_get(self.bid_cut, key)
+            data = args[idx] if re is None or re.pattern == "" else re.search(args[idx]).group()
+            fun = getattr(self, f"get_{key}")
+            data: str = fun(data)
+            self.bid_info[key] = data.replace("\n", "")
+        self.info_list = [*self.bid_info.values()]
+        return self.info_list
+
+    def message(self) -> str:
+        return f"{'; '.join(self.info_list[:-1])}; {str(self.info_list[-1])}"
+
+
+def run(bid: Bid, rows: list) -> list:
+    messages = []
+    seen = set()
+    for row in rows:
+        bid.get_bid_info(*row)
+        info = bid.bid_info
+        if info["name"] == STOP["name"] and info["url"] == STOP["url"]:
+            break
+        key = (info["url"], info["date"])
+        if key not in seen:
+            seen.add(key)
+            messages.append(bid.message())
+    return messages
+
+
+def bench(name, bid, rows):
+    start = time.time()
+    for _ in range(REPEAT):
+        result = run(bid, rows)
+    print(f"{name}: {(time.time() - start) / REPEAT * 1000:.2f} ms / {len(rows)} rows")
+    return result
+
+
+if __name__ == "__main__":
+    rows = make_rows()
+    old = bench("dict + list", BidDict(CONFIG), rows)
+    new = bench("BidObj", Bid(CONFIG), rows)
+    assert old == new
+    for fields in (list(rows[0])[:3], list(rows[0]) + ["多出的字段"]):
+        try:
+            Bid(CONFIG).get_bid_info(*fields)
+        except ValueError:
+            continue
+        raise AssertionError(f"字段数不同时应抛出异常: {fields}")
@@ -0,0 +1,77 @@
+"""
+BidRecord 测试
+在临时文件夹中写入记录文件后读取, 检查字段, 按网站和日期筛选, 超过 64 KB 的字段,
+以及写入中断 (记录文件结尾不完整, 索引缺少或不完整) 后的读取和继续写入
+在仓库根目录运行: PYTHONPATH=. python test/bid_record_test.py
+"""
+import os
+import tempfile
+
+from module.bid_record import NAME, BidRecordReader, BidRecordWriter, encode_record
+
+BIDS = [
+    ("zzlh", "货物", {"name": "降噪耳机; 采购项目", "date": "2023-07-06", "url": "https://a.com/1", "type": "货物"},
+     ["降噪耳机"]),
+    ("zzlh", "货物", {"name": "食堂大宗食品", "date": "2023-07-05 09:30", "url": "https://a.com/2", "type": "货物"},
+     []),
+    ("qjc", "服务", {"name": "长标题" * 30000, "date": "2023-7-6", "url": "https://b.com/3", "type": "服务"},
+     ["标题"]),
+    ("qjc", "服务", {"name": "没有日期", "date": "", "url": "https://b.com/4", "type": ""}, None),
+]
+
+
+def write(file: str, bids: list):
+    writer = BidRecordWriter(file)
+    writer.write([(site, encode_record(site, category, bid, match, 1688600000))
+                  for site, category, bid, match in bids])
+    writer.close()
+
+
+def expect(bids: list) -> list:
+    return [(1688600000, site, category, bid["name"], bid["date"], bid["url"], bid["type"], ",".join(match or []))
+            for site, category, bid, match in bids]
+
+
+def check_round_trip(folder: str):
+    file = os.path.join(folder, "bid_dayrecord_2023-07-06.bin")
+    write(file, BIDS)
+    with BidRecordReader(file) as reader:
+        assert [tuple(r) for r in reader] == expect(BIDS)
+        assert reader.field(0, NAME) == "降噪耳机; 采购项目"
+        assert len(reader.field(2, NAME).encode("utf-8")) > 2 ** 16
+        assert [r.url for r in reader.records(site="qjc")] == ["https://b.com/3", "https://b.com/4"]
+        assert [r.url for r in reader.records(date="2023-07-06")] == ["https://a.com/1", "https://b.com/3"]
+        assert [r.url for r in reader.records(site="zzlh", date="2023-07-05")] == ["https://a.com/2"]
+        assert [r.url for r in reader.records(match_only=True)] == ["https://a.com/1", "https://b.com/3"]
+    print("round trip: ok")
+
+
+def check_truncated(folder: str):
+    file = os.path.join(folder, "bid_dayrecord_2023-07-07.bin")
+    write(file, BIDS[:2])
+    full = os.path.getsize(file)
+    write(file, BIDS[3:])
+    # 最后一条记录只写入了一部分, 索引已写入
+    os.truncate(file, os.path.getsize(file) - 5)
+    with BidRecordReader(file) as reader:
+        assert [tuple(r) for r in reader] == expect(BIDS[:2])
+        assert reader.end == full
+    # 索引文件不完整时从记录文件补全
+    os.truncate(f"{file}.idx", 20)
+    with BidRecordReader(file) as reader:
+        assert [tuple(r) for r in reader] == expect(BIDS[:2])
+    # 继续写入时删除不完整的记录, 新记录可以读取
+    write(file, BIDS[2:])
+    with BidRecordReader(file) as reader:
+        assert [tuple(r) for r in reader] == expect(BIDS)
+    # 没有索引文件
+    os.remove(f"{file}.idx")
+    with BidRecordReader(file) as reader:
+        assert [r.url for r in reader.records(date="2023-07-06")] == ["https://a.com/1", "https://b.com/3"]
+    print("truncated tail: ok")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        check_round_trip(folder)
+        check_truncated(folder)
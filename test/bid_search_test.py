@@ -0,0 +1,101 @@
+"""
+BidSearch 测试
+在临时文件夹中导入 bid_list 文件并检索, 重复导入不增加项目, 单个字的关键词, 多线程同时写入和检索,
+第一次使用时才创建数据库
+在仓库根目录运行: PYTHONPATH=. python test/bid_search_test.py
+"""
+import os
+import tempfile
+import threading
+
+from module.bid_search import BidSearch
+
+LINES = [
+    "zzlh start at 2023-07-06 09:00:00",
+    "哈尔滨音乐学院降噪耳机采购项目; 2023-07-06; https://a.com/1.html; 货物",
+    "哈尔滨音乐学院食堂大宗食品采购; 2023-07-06; https://a.com/2.html; 货物",
+    "LED 显示屏维修服务; 2023-07-05; https://a.com/3.html; 服务",
+    "同一网址不同日期的项目; 2023-07-04; https://a.com/3.html; 服务",
+]
+
+
+def write_list(folder: str) -> str:
+    file = os.path.join(folder, "bid_list_zzlh.txt")
+    with open(file, "w", encoding="utf-8") as f:
+        f.write("\n".join(LINES) + "\n")
+    return file
+
+
+def check_lazy(folder: str):
+    file = os.path.join(folder, "lazy.db")
+    search = BidSearch(file)
+    search.commit()
+    search.close()
+    assert not os.path.exists(file), "未使用时不创建数据库"
+    assert search.search("耳机") == [] and os.path.exists(file)
+    search.close()
+    print("lazy open: ok")
+
+
+def check_import(search: BidSearch, file: str):
+    assert search.import_list_file(file) == 4
+    assert search.import_list_file(file) == 0, "重复导入"
+    rows = search.search("", limit=100)
+    assert len(rows) == 4, rows
+    assert [row[3] for row in rows] == sorted((row[3] for row in rows), reverse=True)
+    print("import twice: ok")
+
+
+def check_search(search: BidSearch):
+    assert [row[2] for row in search.search("降噪耳机")] == ["哈尔滨音乐学院降噪耳机采购项目"]
+    assert len(search.search("哈尔滨")) == 2
+    assert len(search.search("led显示屏")) == 1  # normalize_match 后比较
+    assert len(search.search("采购", date_start="2023-07-06", date_end="2023-07-06")) == 2
+    assert len(search.search("服务", type="服务")) == 1
+    assert not search.search("耳机", site="qjc")
+    # 单个字不使用 FTS 索引
+    assert len(search.search("食")) == 1
+    assert len(search.search("项", limit=1)) == 1
+    print("search: ok")
+
+
+def check_threads(search: BidSearch, count=200):
+    def add(thread):
+        for i in range(count):
+            search.add("qjc", "货物", {"name": f"线程{thread}项目{i}", "date": "2023-07-07",
+                                      "url": f"https://b.com/{thread}_{i}.html", "type": "货物"})
+            if i % 50 == 0:
+                search.commit()
+
+    def query():
+        for _ in range(count):
+            search.search("线程", site="qjc")
+
+    threads = [threading.Thread(target=add, args=(i,)) for i in range(2)]
+    threads.append(threading.Thread(target=query))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    search.commit()
+    assert len(search.search("线程", site="qjc", limit=1000)) == count * 2
+    print("threads: ok")
+
+
+def check_reopen(folder: str):
+    """ 重新打开时唯一索引已存在, 项目不变 """
+    search = BidSearch(os.path.join(folder, "bid_search.db"))
+    assert len(search.search("", limit=1000)) == 4 + 200 * 2
+    search.close()
+    print("reopen: ok")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        check_lazy(folder)
+        search = BidSearch(os.path.join(folder, "bid_search.db"))
+        check_import(search, write_list(folder))
+        check_search(search)
+        check_threads(search)
+        search.close()
+        check_reopen(folder)
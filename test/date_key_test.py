@@ -0,0 +1,59 @@
+"""
+日期比较速度测试
+比较原来的 StopBid._date_is_end (每个项目 strptime 后比较 datetime) 和 date_key 的整数比较,
+检查 StopBid 的 date 和 date_key 一致
+使用生成的 10000 个项目日期, 每页 20 个项目的日期大多相同
+在仓库根目录运行: PYTHONPATH=. python test/date_key_test.py
+"""
+import time
+from datetime import datetime, timedelta
+from random import choice, randint, seed
+
+from module.bid_task import StopBid
+from module.utils import DAY_SECONDS, date_key
+
+ROWS = 10000
+REPEAT = 10
+STOP = datetime(2023, 7, 1) - timedelta(days=1)
+
+
+def make_dates(rows=ROWS) -> list:
+    seed(0)
+    dates = []
+    for i in range(rows):
+        day = datetime(2023, 7, 6) - timedelta(days=i // 400, seconds=randint(0, 3600) * (i % 2))
+        dates.append(day.strftime(choice(["%Y-%m-%d", "%Y-%m-%d %H:%M:%S"])))
+    return dates
+
+
+def is_end_strptime(date: str):
+    """ 旧实现 """
+    if len(date) > 10:
+        date_format = "%Y-%m-%d %H:%M:%S"
+    else:
+        date_format = "%Y-%m-%d"
+    return datetime.strptime(date, date_format) < STOP
+
+
+def is_end_key(date: str, stop=date_key(str(STOP))):
+    return date_key(date) < stop
+
+
+def bench(name, fun, dates):
+    start = time.time()
+    for _ in range(REPEAT):
+        result = [fun(date) for date in dates]
+    print(f"{name}: {(time.time() - start) / REPEAT * 1000:.2f} ms / {len(dates)} rows")
+    return result
+
+
+if __name__ == "__main__":
+    dates = make_dates()
+    assert bench("strptime", is_end_strptime, dates) == bench("date_key", is_end_key, dates)
+    for date in ("2023.07.06", "2023/7/6 08:30", "2023年07月06日", "2023年7月6日 08:30:00"):
+        assert datetime.fromordinal(date_key(date) // 86400) == datetime(2023, 7, 6), date
+    # 与原来相同, 早于 6 天前的停止日期不修改, 停止日期为前一天
+    for date, stop in (("2020-01-01", datetime(2019, 12, 31)), ("2023-07-06 08:30:00", datetime(2023, 7, 5, 8, 30))):
+        stop_bid = StopBid({"name": "", "date": date, "url": ""})
+        assert stop_bid.date == stop and stop_bid.date_key == date_key(str(stop)), date
+    assert StopBid({"name": "", "date": "", "url": ""}).date_key % DAY_SECONDS == 0
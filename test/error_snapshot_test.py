@@ -0,0 +1,83 @@
+"""
+出错页面快照测试
+比较原来同步写入整个页面和放入 ErrorSnapshot 队列的耗时, 检查去重, 压缩和 LRU 删除
+在仓库根目录运行: PYTHONPATH=. python test/error_snapshot_test.py
+"""
+import glob
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from module.error_snapshot import ErrorSnapshot, read_snapshot, snapshot_name
+from module.utils import save_file
+
+FOLDER = tempfile.mkdtemp(prefix="snapshot_")
+URL = "https://www.365trade.com.cn/zbgg/index.jhtml?page=1"
+REPEAT = 20
+
+
+def make_page(seed: int, items=5000) -> bytes:
+    rows = "".join(f"<li><a href=\"/zbgg/{seed}_{i}.jhtml\">哈尔滨音乐学院显示屏设备维修服务{i}</a>"
+                   f"<i>2023-07-06</i></li>\n" for i in range(items))
+    return f"<html><body><ul class=\"searchList\">\n{rows}</ul></body></html>".encode("utf-8")
+
+
+def bench():
+    page = make_page(0)
+    text = page.decode("utf-8")
+    start = time.time()
+    for i in range(REPEAT):
+        save_file(f"{FOLDER}/sync/{snapshot_name(URL, str(i))}", text)
+    sync = (time.time() - start) / REPEAT * 1000
+    snapshot = ErrorSnapshot({"Folder": f"{FOLDER}/queue", "QueueSize": REPEAT})
+    pages = [make_page(i) for i in range(REPEAT)]
+    start = time.time()
+    for i, body in enumerate(pages):
+        snapshot.save(body, URL, str(i))
+    queued = (time.time() - start) / REPEAT * 1000
+    snapshot.close()
+    size = sum(os.path.getsize(f) for f in glob.glob(f"{FOLDER}/queue/*"))
+    print(f"page {len(page) // 1000} KB, sync save: {sync:.2f} ms, queue save: {queued:.3f} ms, "
+          f"gzip {size // REPEAT // 1000} KB/page")
+
+
+def check():
+    folder = f"{FOLDER}/check"
+    page = make_page(0, 100)
+    snapshot = ErrorSnapshot({"Folder": folder, "MaxMB": 1, "QueueSize": 4})
+    snapshot.save(page, URL, "cut_Error")
+    snapshot.save(page, URL, "cut_Error")
+    snapshot.flush()
+    files = glob.glob(f"{folder}/*")
+    assert len(files) == 1 and files[0].endswith(".html.gz"), files
+    assert read_snapshot(files[0]) == page
+    snapshot.close()
+    # 队列已满时丢弃, 不阻塞
+    full = ErrorSnapshot({"Folder": folder, "QueueSize": 1})
+    full.thread = threading.Thread()  # 不启动写入线程
+    assert full.save(make_page(1, 10), URL) and not full.save(make_page(2, 10), URL)
+    # 超过 1MB 时删除最久未使用的快照, 去重命中的快照被视为最近使用
+    snapshot = ErrorSnapshot({"Folder": folder, "MaxMB": 1, "QueueSize": 100})
+    for i in range(1, 40):
+        snapshot.save(os.urandom(100_000), URL, str(i))
+        if i % 5 == 0:
+            snapshot.save(page, URL)
+    snapshot.close()
+    size = sum(os.path.getsize(f) for f in glob.glob(f"{folder}/*"))
+    assert size <= 2 ** 20, size
+    assert os.path.exists(files[0]), "重复的页面应保留"
+    # 重新启动时读取已有的快照
+    snapshot = ErrorSnapshot({"Folder": folder})
+    snapshot._load(folder)
+    assert snapshot.size[folder] == size and files[0] in snapshot.files[folder]
+    print(f"check: ok, {len(glob.glob(f'{folder}/*'))} files, {size // 1000} KB")
+
+
+if __name__ == "__main__":
+    try:
+        check()
+        bench()
+    finally:
+        shutil.rmtree(FOLDER, ignore_errors=True)
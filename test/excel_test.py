@@ -0,0 +1,91 @@
+"""
+Excel 输出速度测试
+比较逐个单元格赋值的普通工作簿 (旧的 Excel 实现) 和 write_only 逐行写入的 lineAddLiTag.Excel
+使用随机生成的 day 文件, 默认 100000 行
+在仓库根目录运行: PYTHONPATH=. python test/excel_test.py
+"""
+import shutil
+import tempfile
+import time
+import tracemalloc
+from random import choice, randint, seed
+
+from openpyxl import Workbook
+
+from module import lineAddLiTag
+from module.lineAddLiTag import Excel, get_list
+
+ROWS = 100000
+TRACE_MEMORY = 0  # 统计内存峰值, tracemalloc 会使耗时明显增加
+SITES = ["zzlh", "qjc", "hkgy", "jdcg", "zhzb", "cebpub", "zgzf"]
+WORDS = "哈尔滨音乐学院食堂大宗食品面板采购项目二次招标公告降噪耳机语音识别显示屏设备维修服务"
+
+
+def make_day_file(file, rows=ROWS):
+    seed(0)
+    with open(file, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            if i % 5000 == 0:
+                f.write(f"{choice(SITES)} start at 2023-07-06 08:30:00\n")
+            name = "".join(choice(WORDS) for _ in range(randint(12, 40)))
+            f.write(f"{name}; 2023-07-06; http://www.365trade.com.cn/zbgg/{i}.jhtml; 货物\n")
+
+
+def excel_cell(file_in, file_out):
+    """ 旧实现: 普通工作簿, 每个单元格单独赋值 """
+    workbook = Workbook()
+    sheet = workbook.active
+    for col, title in zip("ABCD", ["序号", "标题", "日期", "URL"]):
+        sheet[f"{col}1"] = title
+    row = idx = 2
+    with open(file_in, "r", encoding="utf-8") as f:
+        for line in f:
+            if ";" not in line:
+                sheet[f"B{row}"] = line
+            else:
+                line_list = get_list(line)
+                sheet[f"A{row}"] = idx
+                for i, col in enumerate("BCD"):
+                    sheet[f"{col}{row}"] = line_list[i]
+                idx += 1
+            row += 1
+    workbook.save(file_out)
+    workbook.close()
+
+
+def excel_stream(file_in, multi_sheet=False):
+    excel = Excel(multi_sheet=multi_sheet)
+    excel.init(file_in, "list", False)
+    with open(file_in, "r", encoding="utf-8") as f:
+        for line in f:
+            excel.li(line)
+    excel.exit()
+    return excel.name
+
+
+def bench(name, fun, *args):
+    if TRACE_MEMORY:
+        tracemalloc.start()
+    start = time.time()
+    fun(*args)
+    cost = time.time() - start
+    if TRACE_MEMORY:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        print(f"{name}: {cost:.2f} s, peak memory {peak:.1f} MB")
+    else:
+        print(f"{name}: {cost:.2f} s")
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="excel_")
+    lineAddLiTag.DATAFOLDER = folder  # Excel 输出到 DATAFOLDER
+    try:
+        file_in = f"{folder}/bid_daylist_excel_test.txt"
+        make_day_file(file_in)
+
+        bench("Workbook cell", excel_cell, file_in, f"{folder}/bid_daylist_excel_test_cell.xlsx")
+        bench("write_only", excel_stream, file_in)
+        bench("write_only multi sheet", excel_stream, file_in, True)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,143 @@
+"""
+热重载测试
+在临时文件夹中检查 FileWatcher, CONFIG.check_reload 合并修改的网站规则, Task.check_reload 重新编译规则
+(规则有错误时继续使用之前的规则), 以及 reload_title_trie 替换前缀树
+bid_settings.json, title_trie.json 和数据文件都使用临时文件夹中的副本, 不修改 ./bid_settings 和 ./data
+在仓库根目录运行: PYTHONPATH=. python test/hot_reload_test.py
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from module.config import CONFIG
+
+FOLDER = tempfile.TemporaryDirectory()
+CONFIG.DATA_FOLDER = FOLDER.name  # 在导入 BID_FILE 等之前设置
+
+from module import judge_content
+from module.judge_content import BidTitleTrie
+from module.task_manager import TaskNode, close_all_task, task_init
+from module.utils import FileWatcher
+
+SITE = "zzlh"
+
+
+def touch(file: str, data: dict or str):
+    """ 写入后修改 mtime, 避免与上次写入在同一个时间精度内 """
+    with open(file, "w", encoding="utf-8") as f:
+        f.write(data if isinstance(data, str) else json.dumps(data, ensure_ascii=False))
+    stat = os.stat(file)
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def check_watcher(folder: str):
+    file = os.path.join(folder, "watch.json")
+    watcher = FileWatcher([file], interval=60)
+    touch(file, "{}")
+    assert not watcher.changed(), "interval 内不检查"
+    watcher.check_time = 0
+    assert watcher.changed(), "新建的文件"
+    watcher.update()
+    watcher.check_time = 0
+    assert not watcher.changed()
+    touch(file, "{\"a\": 1}")
+    watcher.check_time = 0
+    assert watcher.changed()
+    print("file watcher: ok")
+
+
+def check_config(folder: str) -> str:
+    record_file = os.path.join(folder, "bid_settings.json")
+    shutil.copyfile(CONFIG.record_file, record_file)
+    CONFIG.record_file = record_file
+    CONFIG.record_watcher = FileWatcher([record_file], interval=0)
+    CONFIG.hot_reload = True
+    assert CONFIG.check_reload() == []
+
+    with open(record_file, "r", encoding="utf-8") as f:
+        record = json.load(f)
+    run_time = CONFIG.record[SITE]["nextRunTime"]
+    record[SITE]["task"]["errorDelay"] = "20m"
+    record[SITE]["nextRunTime"] = "2000-01-01 00:00:00"  # 运行状态以内存中的为准
+    touch(record_file, record)
+    version = CONFIG.rules_version.get(SITE, 0)
+    assert CONFIG.check_reload() == [SITE]
+    assert CONFIG.rules_version[SITE] == version + 1
+    assert CONFIG.record[SITE]["task"]["errorDelay"] == "20m"
+    assert CONFIG.record[SITE]["nextRunTime"] == run_time
+    assert CONFIG.check_reload() == [], "没有再次修改"
+    # save 前先合并修改的规则, 不会覆盖
+    record[SITE]["task"]["errorDelay"] = "30m"
+    touch(record_file, record)
+    CONFIG.save()
+    with open(record_file, "r", encoding="utf-8") as f:
+        assert json.load(f)[SITE]["task"]["errorDelay"] == "30m"
+    print("config check_reload: ok")
+    return record_file
+
+
+def check_task(record_file: str):
+    task = task_init(TaskNode(SITE))
+    with open(record_file, "r", encoding="utf-8") as f:
+        record = json.load(f)
+    old_rule = task.next_rule
+    record[SITE]["task"]["next_pages"] = "(?<=_)\\d{1,3}("  # 错误的正则
+    touch(record_file, record)
+    task.check_reload()
+    assert task.next_rule is old_rule, "规则有错误时继续使用之前的规则"
+    assert task.rules_version == CONFIG.rules_version[SITE]
+
+    record[SITE]["task"]["next_pages"] = "(?<=_)\\d{1,4}"
+    record[SITE]["task"]["errorDelay"] = "15m"
+    touch(record_file, record)
+    task.check_reload()
+    assert task.next_rule.pattern == "(?<=_)\\d{1,4}" and task.error_delay == "15m"
+    assert task.get_next_pages_url("https://a.com/zbgg_12.jhtml") == "https://a.com/zbgg_13.jhtml"
+    # HotReload.Switch 关闭时不重新读取规则和前缀树
+    CONFIG.hot_reload = False
+    record[SITE]["task"]["errorDelay"] = "25m"
+    touch(record_file, record)
+    trie_watcher, judge_content.trie_watcher = judge_content.trie_watcher, None
+    task.check_reload()
+    judge_content.trie_watcher = trie_watcher
+    assert task.error_delay == "15m"
+    CONFIG.hot_reload = True
+    close_all_task()
+    print("task check_reload: ok")
+
+
+def check_trie(folder: str):
+    assert judge_content.trie_watcher.interval == CONFIG.reload_interval
+    trie_file = os.path.join(folder, "title_trie.json")
+    trie = BidTitleTrie()
+    trie.insert_from_str("降: 噪 : 耳机", "\n")
+    trie.save_local(trie_file)
+    judge_content.init_file = trie_file
+    judge_content.trie_watcher = FileWatcher([trie_file, judge_content.rule_file(trie_file)], interval=0)
+    judge_content.titleTrie = old = BidTitleTrie(trie_file)
+    assert not judge_content.reload_title_trie()
+
+    trie.insert_rule(["语音", "识别", ""])
+    trie.save_local(trie_file)
+    for file in (trie_file, judge_content.rule_file(trie_file)):
+        stat = os.stat(file)
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert judge_content.reload_title_trie()
+    assert judge_content.titleTrie is not old
+    assert judge_content.titleTrie.search_all("语音识别系统") == ["语音&识别"]
+    assert old.search_all("语音识别系统") == [], "替换前的前缀树不受影响"
+    # 文件正在写入时不替换
+    touch(trie_file, "{\"降\": ")
+    current = judge_content.titleTrie
+    assert not judge_content.reload_title_trie() and judge_content.titleTrie is current
+    print("title trie reload: ok")
+
+
+if __name__ == "__main__":
+    try:
+        check_watcher(FOLDER.name)
+        check_task(check_config(FOLDER.name))
+        check_trie(FOLDER.name)
+    finally:
+        FOLDER.cleanup()
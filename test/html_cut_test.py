@@ -0,0 +1,72 @@
+"""
+html_cut 裁剪速度测试
+比较原来的正则规则和 HtmlCut 的字符串查找, 检查两者的结果相同
+使用生成的大页面, ./html_error 中有保存的页面时也一起测试
+在仓库根目录运行: PYTHONPATH=. python test/html_cut_test.py
+"""
+import glob
+import re
+import time
+
+from module.error_snapshot import read_snapshot
+from module.get_url import HtmlCut
+
+ITEMS = 20000
+REPEAT = 20
+CASES = [
+    ("ul tag", r"(<ul class=\"searchList\">).*?(</ul>)",
+     {"start": "<ul class=\"searchList\">", "tag": "ul"}),
+    ("li last", r"<li>.*</li>", {"start": "<li>", "end": "</li>", "last": True}),
+    ("table exclude", r"(?<=</tr>).*(?=</table>)",
+     {"start": "</tr>", "end": "</table>", "last": True, "include": False}),
+]
+
+
+def make_page(items=ITEMS):
+    rows = "".join(f"<li><a href=\"/zbgg/{i}.jhtml\">哈尔滨音乐学院食堂大宗食品采购项目{i}</a>"
+                   f"<span>2023-07-06</span></li>\n" for i in range(items))
+    table = "".join(f"<tr><td>{i}</td><td>显示屏设备维修服务</td></tr>\n" for i in range(items // 10))
+    return f"<html><body><div class=\"head\"><ul><li>首页</li></ul></div>\n" \
+           f"<ul class=\"searchList\">\n{rows}</ul>\n" \
+           f"<table><tr><th>序号</th></tr>\n{table}</table></body></html>"
+
+
+def bench(name, fun, text):
+    start = time.time()
+    for _ in range(REPEAT):
+        result = fun(text)
+    print(f"  {name}: {(time.time() - start) / REPEAT * 1000:.2f} ms")
+    return result
+
+
+def compare(page, label):
+    print(f"{label}: {len(page)} chars")
+    for name, rule, cut_rule in CASES:
+        pattern = re.compile(rule, re.S)
+        cut = HtmlCut(**cut_rule)
+        print(f" {name}")
+        result_re = bench("re", lambda t: (m := pattern.search(t)) and m.group(), page)
+        result_cut = bench("HtmlCut", cut.cut, page)
+        assert result_re == result_cut, f"{name} 结果不同"
+        data = page.encode("utf-8")
+        span = bench("HtmlCut bytes", cut.span, data)
+        if span:
+            assert str(memoryview(data)[span[0]: span[1]], "utf-8") == result_cut
+
+
+def check_nested():
+    cut = HtmlCut(start="<ul class=\"list\">", tag="ul")
+    page = "<ul class=\"list\"><li><ul><li>a</li></ul></li><li><ul class=\"x\">b</ul></li></ul><ul>c</ul>"
+    expect = page[: page.index("<ul>c")]
+    assert cut.cut(page) == expect
+    assert cut.cut(page.encode("utf-8")) == expect.encode("utf-8")
+    assert HtmlCut(start="<ul class=\"none\">", tag="ul").cut(page) is None
+    assert HtmlCut(start="<ul class=\"list\">", tag="ul").cut(page[:-20]) is None
+    print("nested ul: ok")
+
+
+if __name__ == "__main__":
+    check_nested()
+    compare(make_page(), "make_page")
+    for file in glob.glob("./html_error/*.html*"):
+        compare(str(read_snapshot(file), "utf-8", errors="replace"), file)
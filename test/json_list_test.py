@@ -0,0 +1,60 @@
+"""
+json 列表解析速度测试
+比较原来的 qjc 解析 (解码为 str, json.loads, 每个字段 deep_get) 和 JsonList 的
+bytes 直接解码 (安装 orjson 时使用 orjson) 加字段投影
+使用生成的 qjc 格式的列表, 默认每页 ROWS 个项目
+在仓库根目录运行: PYTHONPATH=. python test/json_list_test.py
+"""
+import json
+import time
+from random import choice, randint, seed
+
+from module.json_list import JsonProjection, compile_path, json_loads, orjson
+from module.utils import deep_get
+
+ROWS = 2000
+REPEAT = 50
+RULES = {"name": "nonSecretTitle", "date": "publishTime", "url": "pcUrl", "type": "purchaseType"}
+LI_TAG = "list.contentList"
+WORDS = "哈尔滨音乐学院食堂大宗食品面板采购项目二次招标公告降噪耳机语音识别显示屏设备维修服务"
+
+
+def make_page(rows=ROWS) -> bytes:
+    seed(0)
+    content = [{
+        "id": str(i),
+        "nonSecretTitle": "".join(choice(WORDS) for _ in range(randint(12, 40))),
+        "publishTime": "2023-07-06 08:30:00",
+        "pcUrl": f"/front/cggg/{i}.html",
+        "purchaseType": "公开招标",
+        "summary": "".join(choice(WORDS) for _ in range(200)),
+        "attachments": [{"name": f"附件{j}", "size": j * 1024} for j in range(3)],
+    } for i in range(rows)]
+    page = {"code": 200, "list": {"total": rows, "contentList": content}}
+    return json.dumps(page, ensure_ascii=False).encode("utf-8")
+
+
+def parse_old(data: bytes) -> list:
+    """ 原来的 Qjc.get_tag_list 和 Qjc.TagGet """
+    bs = json.loads(data.decode("utf-8"))
+    return [[deep_get(tag, RULES[key]) for key in RULES] for tag in deep_get(bs, LI_TAG)]
+
+
+def parse_new(data: bytes, projection=JsonProjection(RULES), path=compile_path(LI_TAG)) -> list:
+    return projection(path.get(json_loads(data), []))
+
+
+def bench(name, fun, data):
+    start = time.time()
+    for _ in range(REPEAT):
+        result = fun(data)
+    print(f"{name}: {(time.time() - start) / REPEAT * 1000:.2f} ms")
+    return result
+
+
+if __name__ == "__main__":
+    data = make_page()
+    print(f"page: {len(data)} bytes, {ROWS} rows, orjson: {orjson is not None}")
+    old = bench("json.loads + deep_get", parse_old, data)
+    new = bench("json_loads + JsonProjection", parse_new, data)
+    assert [tuple(row) for row in old] == new
@@ -0,0 +1,135 @@
+"""
+按页判断项目的测试
+用随机生成的页面比较 find_stop / find_start 和原来逐个项目判断的结果
+并比较逐个调用 BidTask.bid_judge 和 BidTask.judge_page 的速度
+在仓库根目录运行: PYTHONPATH=. python test/judge_page_test.py
+"""
+import time
+from random import choice, randint, random, seed
+
+from module.bid_task import BidTask, StopBid, find_start, find_stop
+from module.config import CONFIG
+from module.utils import date_days, date_key, normalize_name
+from module.web_brows import BidObj
+
+PAGES = 2000
+ROWS = 10000
+REPEAT = 10
+
+
+def make_page(rows: int, names: list) -> list:
+    """ 日期大致倒序, 名称有重复 """
+    infos = []
+    day = 20
+    for i in range(rows):
+        if random() < 0.1:
+            day = max(1, day - 1)
+        date = f"2023-07-{day:02d}" + (" 08:30:00" if random() < 0.5 else "")
+        infos.append((choice(names), date, f"/zbgg/{randint(0, rows // 2)}.jhtml", "货物"))
+    return infos
+
+
+def judge_rows(infos: list, stop: tuple, first_bid: tuple, has_first: bool, interrupt: dict):
+    """ 原来的逐个判断, 返回 (start, end, first_bid) """
+    start = None if interrupt else 0
+    stop_name, stop_url, stop_key = stop
+    for pos, info in enumerate(infos):
+        idx = pos if has_first else pos + 1
+        # compare_last_first
+        if info == first_bid:
+            return start, pos, first_bid
+        # StopBid.bid_is_end
+        if info[0] == stop_name and info[2] == stop_url or date_key(info[1]) < stop_key:
+            return start, pos, first_bid
+        if not idx:
+            first_bid = info
+        # bid_is_start
+        if start is None and all(interrupt[k] and info[i] == interrupt[k]
+                                 for i, k in enumerate(("name", "date", "url"))):
+            start = pos + 1
+    return start, len(infos), first_bid
+
+
+def find_page(infos: list, stop: tuple, first_bid: tuple, has_first: bool, interrupt: dict):
+    bids = [BidObj(*info) for info in infos]
+    end, first_bid = find_stop(bids, *stop, first_bid, has_first)
+    start = 0
+    if interrupt:
+        pos = find_start(bids, interrupt, end)
+        start = None if pos is None else pos + 1
+    return start, end, first_bid
+
+
+def check():
+    seed(0)
+    names = [f"项目{i}" for i in range(30)]
+    for _ in range(PAGES):
+        infos = make_page(randint(0, 40), names)
+        stop = (choice(names), f"/zbgg/{randint(0, 20)}.jhtml", date_key(f"2023-07-{randint(1, 20):02d}"))
+        first_bid = choice(infos) if infos and random() < 0.3 else None
+        interrupt = {}
+        if infos and random() < 0.3:
+            interrupt = dict(zip(("name", "date", "url"), choice(infos)[:3]))
+        args = (infos, stop, first_bid, random() < 0.8, interrupt)
+        assert judge_rows(*args) == find_page(*args), args
+    print(f"{PAGES} random pages: ok")
+
+
+def new_task(name: str) -> BidTask:
+    bid_task = BidTask(name)
+    bid_task.stop_bid.date_key = date_key("2023-06-01")
+    return bid_task
+
+
+def task_judge_rows(name: str, bids: list) -> int:
+    """ 原来 process_tag_list 中的逐个判断 """
+    bid_task = new_task(name)
+    for idx, bid in bids:
+        if bid_task.bid_judge(bid, idx):
+            return idx
+    return len(bids)
+
+
+def task_judge_page(name: str, bids: list) -> int:
+    return new_task(name).judge_page(bids)[1]
+
+
+def check_saved_names(name: str):
+    """ bid_settings.json 中之前保存的 stopBid 和 interruptBid 名称没有经过 normalize_name """
+    raw = "某某（2023）采购项目　公告"
+    today = f"{date_days(0, 'day')} 00:00:00"
+    bid = BidObj(normalize_name(raw), today, "/zbgg/1.jhtml", "货物")
+    assert bid.name != raw
+    assert StopBid({"name": raw, "date": "", "url": "/zbgg/1.jhtml"}).bid_is_end(bid)
+
+    settings = CONFIG.get_task(name)
+    saved = {key: settings[key] for key in ("state", "interruptBid")}
+    settings["state"] = "interrupt"
+    settings["interruptBid"] = {"name": raw, "date": today, "url": "/zbgg/1.jhtml"}
+    try:
+        bid_task = new_task(name)
+        other = [BidObj(f"项目{i}", today, f"/zbgg/{i}0.jhtml", "货物") for i in range(2)]
+        assert bid_task.judge_page(list(enumerate([other[0], bid, other[1]]))) == (2, 3)
+    finally:
+        settings.update(saved)
+    print("saved raw names: ok")
+
+
+def bench(name, fun, *args):
+    start = time.time()
+    for _ in range(REPEAT):
+        result = fun(*args)
+    print(f"{name}: {(time.time() - start) / REPEAT * 1000:.2f} ms")
+    return result
+
+
+if __name__ == "__main__":
+    check()
+    seed(1)
+    CONFIG.task = CONFIG.taskList[0]
+    task_name = CONFIG.get_task("TaskList")[0]
+    bids = [(idx, BidObj(*info)) for idx, info in enumerate(make_page(ROWS, [f"项目{i}" for i in range(ROWS)]))]
+    print(f"{ROWS} rows, {CONFIG.name} {task_name}")
+    check_saved_names(task_name)
+    assert bench("bid_judge", task_judge_rows, task_name, bids) == \
+        bench("judge_page", task_judge_page, task_name, bids)
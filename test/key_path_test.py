@@ -0,0 +1,41 @@
+"""
+KeyPath 速度测试
+比较每次分割字符串并递归的 deep_get / deep_set 和缓存的 key_path
+以及 BidTask.set_task 这类先拼接 key 再读写 bid_settings 的调用
+在仓库根目录运行: PYTHONPATH=. python test/key_path_test.py
+"""
+import json
+import time
+
+from module.utils import deep_get, deep_set, key_path
+
+NUMBER = 200000
+KEYS = ["zzlh.公告.state", "zzlh.公告.interruptBid.url", "zzlh.公告.stopBid.date", "qjc.task.next_pages"]
+
+
+def bench(name, fun):
+    start = time.time()
+    for _ in range(NUMBER):
+        fun()
+    print(f"{name}: {(time.time() - start) / NUMBER * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    with open("./bid_settings/bid_settings_default.json", "r", encoding="utf-8") as f:
+        record = json.load(f)
+    record["zzlh"]["公告"] = {"state": "", "interruptBid": {"name": "", "date": "", "url": ""},
+                             "stopBid": {"name": "", "date": "", "url": ""}}
+    for key in KEYS:
+        path = key_path(key)
+        assert deep_get(record, key) == path.get(record), key
+        print(key)
+        bench("  deep_get", lambda: deep_get(record, key))
+        bench("  key_path.get", lambda: key_path(key).get(record))
+        bench("  KeyPath.get", lambda: path.get(record))
+        bench("  deep_set", lambda: deep_set(record, key, "1"))
+        bench("  KeyPath.set", lambda: path.set(record, "1"))
+
+    name, task = "zzlh", "公告"
+    print("set_task")
+    bench("  deep_set f-string", lambda: deep_set(record, f"{name}.{task}.state", "interrupt"))
+    bench("  key_path f-string", lambda: key_path(f"{name}.{task}.state").set(record, "interrupt"))
@@ -0,0 +1,70 @@
+"""
+匹配结果缓存测试
+检查 match 与 search_all 结果相同, 重复的标题命中缓存, 前缀树或规则修改后 (version 加1) 旧的结果不再命中,
+缓存条数不超过 cache_size, 返回的列表可以修改而不影响缓存, 缓存不会使替换后的前缀树无法释放, 并比较有无缓存的耗时
+在仓库根目录运行: PYTHONPATH=. python test/match_cache_test.py
+"""
+import gc
+import time
+import weakref
+from random import choice, seed
+
+from module.judge_content import BidTitleTrie
+
+WORDS = "降: 噪 : 耳机\n显: 示 : 屏\n& 语音: 识别: 招聘"
+TITLES = ["哈尔滨音乐学院降噪耳机采购项目", "ＬＥＤ显示屏维修", "语音识别系统", "食堂大宗食品采购"]
+
+
+def check_cache():
+    trie = BidTitleTrie(cache_size=3)
+    trie.insert_from_str(WORDS, "\n")
+    for title in TITLES:
+        assert trie.match(title) == trie.search_all(title)
+    info = trie._match_cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 4, 3), info
+    # 全角和大小写不同的标题由 normalize_match 转换后使用同一个缓存
+    assert trie.match("led显示屏维修") == ["显示屏"]
+    assert trie._match_cache.cache_info().hits == 1
+
+    result = trie.match("语音识别系统")
+    result.append("修改返回值")
+    assert trie.match("语音识别系统") == ["语音&识别"]
+
+    # 修改前缀树或规则后重新匹配
+    version = trie.version
+    trie.insert_from_list(["食", "堂"])
+    assert trie.version == version + 1
+    assert trie.match("食堂大宗食品采购") == ["食堂"]
+    trie.insert_rule(["降噪", "耳机", "采购"])
+    assert trie.match("哈尔滨音乐学院降噪耳机采购项目") == ["降噪耳机"]
+    assert "hits" in trie.cache_info()
+    # 没有循环引用, 不需要 gc 即可释放
+    gc.disable()
+    try:
+        ref = weakref.ref(trie)
+        del trie
+        assert ref() is None, "缓存使前缀树无法释放"
+    finally:
+        gc.enable()
+    print("match cache: ok")
+
+
+def bench(count=100000):
+    seed(0)
+    trie = BidTitleTrie()
+    trie.insert_from_str(WORDS, "\n")
+    titles = [choice(TITLES) + str(i % 2000) for i in range(count)]  # 2000 个不同的标题重复出现
+    start = time.time()
+    for title in titles:
+        trie.search_all(title)
+    search = time.time() - start
+    start = time.time()
+    for title in titles:
+        trie.match(title)
+    match = time.time() - start
+    print(f"{count} titles, search_all: {search:.2f} s, match: {match:.2f} s, {trie.cache_info()}")
+
+
+if __name__ == "__main__":
+    check_cache()
+    bench()
@@ -0,0 +1,75 @@
+"""
+day 文件报告测试
+在临时文件夹中生成 bid_daylist 和 bid_daymatch 文件, 由 Writer 一次读取后输出 htm 和 excel,
+检查 htm 中嵌入的项目 (网站, 序号, 匹配词, "</" 转义) 和 excel 中每个网站的工作表
+在仓库根目录运行: PYTHONPATH=. python test/report_test.py
+"""
+import json
+import tempfile
+
+from openpyxl import load_workbook
+
+from module import lineAddLiTag
+from module.lineAddLiTag import Command, HTM_HEAD, Writer
+
+DAY = "2023-07-06"
+LIST = [
+    "zzlh start at 2023-07-06 09:00:00",
+    "降噪耳机采购; 2023-07-06; https://a.com/1; 货物",
+    "标题中有</script>; 2023-07-06; https://a.com/2; 货物",
+    "qjc start at 2023-07-06 10:00:00",
+    "显示屏维修; 2023-07-05; https://b.com/3; 服务",
+]
+MATCH = [
+    "zzlh start at 2023-07-06 09:00:00",
+    "[耳机]; 降噪耳机采购; 2023-07-06; https://a.com/1; 货物",
+]
+
+
+def write_day(folder: str):
+    for key, lines in (("list", LIST), ("match", MATCH)):
+        with open(f"{folder}/bid_day{key}_{DAY}.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def htm_rows(file: str) -> list:
+    with open(file, "r", encoding="utf-8") as f:
+        text = f.read()
+    assert text.startswith(HTM_HEAD.split("{title}")[0])
+    body = text[text.index("const ROWS = [\n") + len("const ROWS = [\n"): text.index("];\nconst PAGE_SIZE")]
+    assert "</script>" not in body, "标题中的 </ 需要转义"
+    return [json.loads(line.rstrip(",")) for line in body.splitlines()]
+
+
+def check(folder: str):
+    write_day(folder)
+    command = Command(["-h", "-e", "-s", "-d", DAY])
+    writer = Writer(command)
+    writer.output()
+
+    assert htm_rows(f"{folder}/bid_daylist_{DAY}.htm") == [
+        ["zzlh", 1, "降噪耳机采购", "2023-07-06", "https://a.com/1", ""],
+        ["zzlh", 2, "标题中有</script>", "2023-07-06", "https://a.com/2", ""],
+        ["qjc", 3, "显示屏维修", "2023-07-05", "https://b.com/3", ""],
+    ]
+    assert htm_rows(f"{folder}/bid_daymatch_{DAY}.htm") == [
+        ["zzlh", 1, "降噪耳机采购", "2023-07-06", "https://a.com/1", "[耳机]"]]
+
+    workbook = load_workbook(f"{folder}/bid_daylist_{DAY}.xlsx", read_only=True)
+    assert workbook.sheetnames == ["zzlh", "qjc"]
+    rows = [list(row) for row in workbook["zzlh"].values]
+    assert rows[0] == ["序号", "标题", "日期", "URL"]
+    assert rows[2] == [1, "降噪耳机采购", "2023-07-06", "https://a.com/1"]
+    assert [list(row) for row in workbook["qjc"].values][2] == [1, "显示屏维修", "2023-07-05", "https://b.com/3"]
+    workbook.close()
+    workbook = load_workbook(f"{folder}/bid_daymatch_{DAY}.xlsx", read_only=True)
+    assert [list(row) for row in workbook["zzlh"].values][2] == \
+        [1, "[耳机]", "降噪耳机采购", "2023-07-06", "https://a.com/1"]
+    workbook.close()
+    print("htm and excel report: ok")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        lineAddLiTag.DATAFOLDER = folder
+        check(folder)
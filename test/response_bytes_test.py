@@ -0,0 +1,113 @@
+"""
+response 保存为 bytes 的测试
+比较先解码整个页面再裁剪, 和在 bytes 上裁剪后只解码裁剪部分的时间和内存
+使用生成的 zzlh 列表页面, ./html_error 中有保存的页面时也一起测试
+在仓库根目录运行: PYTHONPATH=. python test/response_bytes_test.py
+"""
+import glob
+import time
+import tracemalloc
+
+from requests.models import Response
+
+from module.error_snapshot import read_snapshot
+from module.get_url import HtmlCut, ListWebResponse, RequestBase, detect_encoding
+
+REPEAT = 20
+RULE = {"start": "<ul class=\"searchList\">", "tag": "ul"}
+
+
+def make_page(items=500, nav=20000) -> bytes:
+    rows = "".join(f"<li><a href=\"/zbgg/{i}.jhtml\"><span title=\"哈尔滨音乐学院显示屏设备维修服务{i}\">"
+                   f"哈尔滨音乐学院...</span></a><i>2023-07-06</i><em>货物</em></li>\n" for i in range(items))
+    nav = "".join(f"<li><a href=\"/page/{i}\">第{i}页</a></li>\n" for i in range(nav))
+    return (f"<html><head><meta charset=\"utf-8\"></head><body><ul class=\"nav\">{nav}</ul>\n"
+            f"<ul class=\"searchList\">\n{rows}</ul></body></html>").encode("utf-8")
+
+
+def cut_str(web: ListWebResponse, body: bytes) -> str:
+    """ 原来的方式: 解码整个页面后裁剪 """
+    web.request.content = b""
+    web.request.response = str(body, "utf-8", errors="replace")
+    return web.cut_html()
+
+
+def cut_bytes(web: ListWebResponse, body: bytes) -> str:
+    web.request.content = body
+    web.request.response = None
+    return web.cut_html()
+
+
+def bench(name, fun, web, body):
+    start = time.time()
+    for _ in range(REPEAT):
+        result = fun(web, body)
+    cost = (time.time() - start) / REPEAT * 1000
+    tracemalloc.start()
+    fun(web, body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {name}: {cost:.2f} ms, peak {peak // 1000} KB")
+    return result
+
+
+def compare(body: bytes, label: str):
+    print(f"{label}: {len(body) // 1000} KB")
+    web = ListWebResponse(html_cut_rule=RULE)
+    web.request = RequestBase()
+    expect = bench("decode all + cut", cut_str, web, body)
+    result = bench("cut bytes + decode cut", cut_bytes, web, body)
+    assert result == expect, "结果不同"
+    assert web.request._text is None, "不应解码整个页面"
+
+
+class FakeSession:
+    """ 按顺序返回 (Content-Type, body) 的 Response, 不访问网络 """
+    def __init__(self, pages: list):
+        self.pages = pages
+
+    def request(self, **kwargs) -> Response:
+        content_type, body = self.pages.pop(0)
+        response = Response()
+        response.headers["Content-Type"] = content_type
+        response._content = body
+        return response
+
+
+def check_detect():
+    page = make_page(1, 1)
+    assert detect_encoding({"Content-Type": "text/html; charset=GBK"}, page) == "gbk"
+    assert detect_encoding({"Content-Type": "text/html"}, page) == "utf-8"
+    assert detect_encoding({}, b"<html><meta http-equiv=\"Content-Type\" "
+                               b"content=\"text/html; charset=gb2312\" />") == "gb2312"
+    assert detect_encoding({}, b"<html>") == "utf-8"
+    assert detect_encoding({"Content-Type": "text/html; charset=none"}, page) == "utf-8"
+    # 非 utf-8 的页面解码整个页面后裁剪
+    web = ListWebResponse(html_cut_rule=RULE)
+    web.request = RequestBase()
+    web.request.encoding = "gbk"
+    text = "<ul class=\"searchList\"><li>显示屏</li></ul>"
+    web.request.content = f"<p>测试</p>{text}".encode("gbk")
+    web.request.response = None
+    assert web.cut_html() == text
+    # 每个页面都检测编码, 没有 charset 的页面不沿用上一个页面的编码
+    request = RequestBase()
+    request._session = FakeSession([("text/html; charset=GBK", text.encode("gbk")), ("text/html", page)])
+    assert request.open("https://a.com/1") and request.encoding == "gbk" and request.response == text
+    request.open("https://a.com/2")
+    assert request.encoding == "utf-8" and request.response == page.decode("utf-8")
+    request.detect = False  # OpenConfig 中有 encoding
+    request.encoding = "gbk"
+    request._session = FakeSession([("text/html; charset=utf-8", text.encode("gbk"))])
+    request.open("https://a.com/3")
+    assert request.encoding == "gbk" and request.response == text
+    print("detect encoding: ok")
+
+
+if __name__ == "__main__":
+    check_detect()
+    compare(make_page(), "make_page")
+    for file in glob.glob("./html_error/*.html*"):
+        body = read_snapshot(file)
+        if HtmlCut(**RULE).span(body):
+            compare(body, file)
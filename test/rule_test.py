@@ -0,0 +1,105 @@
+"""
+两级关键词规则测试
+"& first: second: not", 标题中有 first 和任一 second, 且没有 not 时匹配, 没有 second 时只需要 first
+检查匹配结果, 与普通关键词一起匹配, 从文件读取, 保存后重新读取以及规则的增删比较, 文件写入临时文件夹,
+随机的重叠关键词和标题与逐个关键词查找 (in) 的结果比较
+在仓库根目录运行: PYTHONPATH=. python test/rule_test.py
+"""
+import os
+import tempfile
+from random import choice, randint, seed
+
+from module.judge_content import BidTitleTrie, check_rule, rule_file, title_trie_diff
+
+RULES = """
+# 普通关键词
+显: 示 : 屏
+& 降噪: 耳机 耳罩: 招聘 培训
+& 声呐
+& ＬＥＤ: 路灯 面板
+"""
+
+CASES = [
+    ("哈尔滨音乐学院降噪耳机采购项目", ["降噪&耳机"]),
+    ("降噪耳罩和耳机", ["降噪&耳机/耳罩"]),
+    ("耳机降噪改造", ["降噪&耳机"]),  # second 在 first 之前也匹配
+    ("降噪材料采购", []),  # 只有 first
+    ("耳机采购", []),  # 只有 second
+    ("降噪耳机维修人员招聘", []),  # 有 not 关键词
+    ("声呐设备", ["声呐"]),  # 没有 second 的规则
+    ("led路灯改造", ["LED&路灯"]),  # 规则和标题都由 normalize_match 转换
+    ("LED显示屏", ["显示屏"]),  # 普通关键词, 规则缺少 second 时不匹配
+]
+
+
+def check_match(trie: BidTitleTrie):
+    for title, expect in CASES:
+        assert trie.search_all(title) == expect, (title, trie.search_all(title), expect)
+        assert trie.match(title) == expect
+        assert trie.search_rule(title) == [word for word in expect if word != "显示屏"]
+    spans = trie.search_span("降噪耳罩和耳机")
+    assert spans == [("降噪", 0, 2), ("耳机", 5, 7), ("耳罩", 2, 4)], spans
+    print("match rules: ok")
+
+
+def check_file(folder: str) -> BidTitleTrie:
+    file = os.path.join(folder, "rule.txt")
+    with open(file, "w", encoding="utf-8") as f:
+        f.write(RULES + "& ：全角冒号\n&  : 耳机\n")
+    trie = BidTitleTrie()
+    assert trie.insert_from_file(file) == 2, "两行不符合规则"
+    assert check_rule("& 降噪: 耳机: 招聘") == ""
+    assert check_rule("& 降 噪: 耳机") == "first keyword has space"
+    assert len(trie.rules) == 3
+    # 与 insert_from_str 相同, insert_from_str 不跳过注释行
+    same = BidTitleTrie()
+    same.insert_from_str("\n".join(line for line in RULES.split("\n") if not line.startswith("#")), "\n")
+    assert same.rules == trie.rules and same.child == trie.child
+    print("rules from file: ok")
+    return trie
+
+
+def check_save(folder: str, trie: BidTitleTrie):
+    file = os.path.join(folder, "title_trie.json")
+    trie.save_local(file)
+    assert os.path.exists(rule_file(file))
+    loaded = BidTitleTrie(file)
+    assert loaded.rules == trie.rules
+    check_match(loaded)
+    # 增删规则
+    new = BidTitleTrie(file)
+    new.rules = [r for r in new.rules if r["first"] != "声呐"]
+    new.insert_rule(["吊舱", "声纳", ""])
+    added, removed = title_trie_diff(new, loaded)
+    assert added == ["& 吊舱: 声纳"] and removed == ["& 声呐"], (added, removed)
+    assert new.search_all("吊舱声纳系统") == ["吊舱&声纳"]
+    print("save and diff rules: ok")
+
+
+def check_random(rules=300, titles=2000):
+    """ 关键词互相重叠 (如 甲乙, 甲乙丙, 乙丙甲), 检查失配链上的关键词也能找到 """
+    seed(0)
+    chars = "甲乙丙丁"
+    word = lambda: "".join(choice(chars) for _ in range(randint(1, 4)))
+    trie = BidTitleTrie()
+    for _ in range(rules):
+        trie.insert_rule([word(), " ".join(word() for _ in range(randint(0, 2))),
+                          " ".join(word() for _ in range(randint(0, 1)))])
+    for _ in range(titles):
+        title = "".join(choice(chars) for _ in range(randint(0, 30)))
+        expect = []
+        for rule in trie.rules:
+            second = [w for w in rule["second"] if w in title]
+            if rule["first"] not in title or any(w in title for w in rule["not"]) or (rule["second"] and not second):
+                continue
+            expect.append(f"{rule['first']}&{'/'.join(second)}" if second else rule["first"])
+        assert sorted(trie.search_rule(title)) == sorted(expect), title
+    print("random overlapping rules: ok")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        trie = check_file(folder)
+        check_match(trie)
+        check_save(folder, trie)
+    check_random()
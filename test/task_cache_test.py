@@ -0,0 +1,64 @@
+"""
+TASK_CACHE 测试
+检查 module/web 只导入一次, 每个网站的 Task 只创建一次, close_all_task 关闭并清空缓存
+数据文件夹设置为临时文件夹, 不写入 ./data
+在仓库根目录运行: PYTHONPATH=. python test/task_cache_test.py
+"""
+import tempfile
+import time
+
+from module.config import CONFIG
+
+FOLDER = tempfile.TemporaryDirectory()
+CONFIG.DATA_FOLDER = FOLDER.name  # 在导入 BID_FILE 等之前设置
+
+from module import task_manager
+from module.task import Task
+from module.task_manager import TASK_CACHE, WEB_CLASS, TaskNode, close_all_task, get_task_class, task_init
+
+
+def check_class():
+    assert get_task_class("zzlh").__name__ == "Zzlh"
+    assert WEB_CLASS and all(issubclass(cls, Task) for cls in WEB_CLASS.values())
+    # WEB_CLASS 已填充, 之后不再导入 module/web
+    imported = task_manager.import_web_module
+    task_manager.import_web_module = lambda: (_ for _ in ()).throw(AssertionError("重复导入 module/web"))
+    try:
+        assert get_task_class("qjc") is WEB_CLASS["qjc"]
+        assert get_task_class("not_a_site") is Task
+    finally:
+        task_manager.import_web_module = imported
+    print(f"web class {sorted(WEB_CLASS)}: ok")
+
+
+def check_cache():
+    sites = [name for name in CONFIG.taskList if name in WEB_CLASS]
+    start = time.time()
+    first = {name: task_init(TaskNode(name)) for name in sites}
+    create = time.time() - start
+    start = time.time()
+    for _ in range(10):
+        for name in sites:
+            assert task_init(TaskNode(name)) is first[name], name
+    reuse = (time.time() - start) / 10
+    assert set(TASK_CACHE) == set(sites)
+    assert all(type(task) is WEB_CLASS[name] for name, task in first.items())
+    assert CONFIG.name == sites[-1], "task_init 应切换 CONFIG.task"
+    print(f"{len(sites)} sites, create: {create * 1000:.1f} ms, reuse: {reuse * 1000:.3f} ms")
+
+    closed = []
+    for task in first.values():
+        task.close = lambda task=task: closed.append(task.name)
+    close_all_task()
+    assert sorted(closed) == sorted(sites) and not TASK_CACHE
+    assert task_init(TaskNode(sites[0])) is not first[sites[0]], "关闭后重新创建"
+    close_all_task()
+    print("task cache: ok")
+
+
+if __name__ == "__main__":
+    try:
+        check_class()
+        check_cache()
+    finally:
+        FOLDER.cleanup()
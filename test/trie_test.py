@@ -0,0 +1,87 @@
+"""
+前缀树生成和匹配速度测试
+在临时文件夹中随机生成 100000 行 "first: first_aft: second" 规则, 测试生成前缀树和与上次生成的前缀树比较关键词的耗时,
+修改一行后不复用和复用上次生成的前缀树分别重新生成, 两者的关键词应相同
+用 ./data/bid_list_*.txt 中的标题测试 normalize_match 和 search_all 的耗时, 没有数据文件时随机生成标题
+在仓库根目录运行: PYTHONPATH=. python test/trie_test.py
+"""
+import os
+import tempfile
+import time
+from glob import glob
+from random import choice, choices, randint, seed
+
+from module.judge_content import BidTitleTrie, compile_trie, titleTrie
+from module.utils import normalize_match
+
+RULES = 100000
+CHARS = [chr(c) for c in range(0x4e00, 0x4e00 + 3000)]
+
+
+def make_rule_file(file, rules=RULES):
+    seed(0)
+    with open(file, "w", encoding="utf-8") as f:
+        for _ in range(rules):
+            first_aft = " ".join(choice(CHARS) for _ in range(randint(0, 3)))
+            second = " ".join("".join(choices(CHARS, k=2)) for _ in range(randint(0, 2)))
+            f.write(f"{choice(CHARS)}: {first_aft} : {second}\n")
+
+
+def read_titles() -> list:
+    titles = []
+    for file in glob("./data/bid_list_*.txt"):
+        with open(file, "r", encoding="utf-8") as f:
+            titles += [line.split("; ")[0] for line in f if "; " in line]
+    if not titles:
+        seed(0)
+        words = "哈尔滨音乐学院食堂大宗食品ＬＥＤ面板led采购项目（二次）降噪耳机语音识别显示屏\u200b"
+        titles = ["".join(choices(words, k=randint(12, 40))) for _ in range(100000)]
+    return titles
+
+
+def bench_search(titles):
+    start = time.time()
+    for title in titles:
+        normalize_match(title)
+    print(f"normalize {len(titles)} titles: {time.time() - start:.2f} s")
+    start = time.time()
+    match = sum(1 for title in titles if titleTrie.search_all(title))
+    print(f"search_all {len(titles)} titles: {time.time() - start:.2f} s, {match} match")
+
+
+if __name__ == "__main__":
+    bench_search(read_titles())
+
+    with tempfile.TemporaryDirectory() as folder:
+        trie_file = os.path.join(folder, "trie_test.txt")
+        make_rule_file(trie_file)
+
+        start = time.time()
+        trie = BidTitleTrie()
+        trie.insert_from_file(trie_file)
+        print(f"insert {RULES} rules: {time.time() - start:.2f} s, version {trie.version}")
+
+        # 修改一行后重新生成, 只输出变化的关键词
+        with open(trie_file, "r", encoding="utf-8") as f:
+            rules = f.read()
+        with open(trie_file, "a", encoding="utf-8") as f:
+            f.write("降: 噪 : 耳机\n")
+        start = time.time()
+        full = BidTitleTrie()
+        full.insert_from_file(trie_file)
+        print(f"insert without previous: {time.time() - start:.2f} s")
+        start = time.time()
+        new, added, removed = compile_trie(trie_file, trie)
+        print(f"compile and diff: {time.time() - start:.2f} s, added {added}, removed {removed}")
+        assert new.child == full.child and added == ["降噪", "降噪耳机"] and not removed
+
+        # 删除这一行后再次生成
+        with open(trie_file, "w", encoding="utf-8") as f:
+            f.write(rules)
+        again, added, removed = compile_trie(trie_file, new)
+        assert again.child == trie.child and not added and removed == ["降噪", "降噪耳机"]
+
+        # 共用的子树修改前复制, 不影响上次生成的前缀树
+        key = next(iter(new._shared))
+        new.insert_from_list([key, "", "测试"])
+        assert new.child[key] != full.child[key] == trie.child[key]